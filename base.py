@@ -4,26 +4,141 @@ https://github.com/moderngl/moderngl-window/blob/master/examples/base.py
 
 """
 
+import logging
+
 import moderngl_window as mglw
-from camera import WorldCoordinateCamera, CameraAxesWorldCenterCamera, CameraCoordinateCamera, Orbit4DCamera
+from camera import WorldCoordinateCamera, CameraAxesWorldCenterCamera, CameraCoordinateCamera, Orbit4DCamera, load_keymap
+from profiler import FrameProfiler
+from replay import InputRecorder, InputReplay
+from bookmarks import Bookmarks
+from camera_path import CameraPath, PathCamera
+
+logger = logging.getLogger(__name__)
+
+# cameras of the window (F1-F4), created on first use
+CAMERAS = {
+    # rotation around camera coordinate axes and camera coord sys center
+    "CamCam": CameraCoordinateCamera,
+    # rotation around world coordinate system axes and world coord sys center
+    "WorldCam": WorldCoordinateCamera,
+    # rotation around camera cooridinate axes and world coord sys center
+    "MixCam": CameraAxesWorldCenterCamera,
+    # real orbit controls (3 angles), around center of world coord sys
+    "OrbitCam": Orbit4DCamera,
+}
+
+# printed (log level info) when a camera is chosen
+CAMERA_HELP = {
+    "CamCam": """
+Camera Coordinate Camera
+rotation axes: \t\t camera coord sys
+center of rotation: \t camera coord sys
+rotations:\t left mouse xz, yz
+rotations:\t right mouse xw, yw
+rotations:\t scroll mouse zw
+rotations:\t x,y keys xy
+""",
+    "WorldCam": """
+Pseudo Orbit/World Coordinate Camera:
+rotation axes: \t\t world coord sys
+center of rotation: \t world coord sys
+rotations:\t left mouse xz, yz
+rotations:\t right mouse xw, yw
+rotations:\t scroll mouse zw
+rotations:\t x,y keys xy
+""",
+    "MixCam": """
+Mix of World and Camera Coordinate system Camera
+rotation axes: \t\t camera coord sys
+center of rotation: \t world coord sys
+rotations:\t left mouse xz, yz
+rotations:\t right mouse xw, yw
+rotations:\t scroll mouse zw
+rotations:\t x,y keys xy
+""",
+    "OrbitCam": """
+Orbit Control Camera
+rotation: \t\t camera directions from angles
+center of rotation: \t world coord sys
+rotations:\t left mouse for yaw, pitch 3D Camera
+rotations:\t right mouse + scroll for yaw, pitch, roll 4D Camera
+""",
+}
 
 
 class CameraWindow(mglw.WindowConfig):
     """
     base class for switching cameras and dealing with keyboard and mouse input
     """
+    # only redraw when the camera or the scene changed, otherwise the previous
+    # frame (kept in an offscreen framebuffer) is shown again
+    render_on_demand = False
+    # time the stages of every frame (input, camera, uniforms, draw),
+    # F5 shows the overlay, results are written to profile_output(.csv/.json) on exit
+    profile = False
+    profile_output = None
+    # store the 4D camera orientations as rotors (pairs of unit quaternions)
+    # instead of matrices, no drift in long sessions
+    rotor_orientation = False
+    # sum up the mouse movement of a frame and rotate once when the camera is read
+    # instead of rotating on every mouse event (high rate mice)
+    coalesce_mouse = False
+    # write all input to this file (--record) / replay the input of this file (--replay)
+    record_input = None
+    replay_input = None
+    # json file {key name: action} that changes the camera key bindings (--keymap)
+    keymap = None
+    # file of the camera bookmarks (ctrl + 1-9 saves, 1-9 restores), None: not stored (--bookmarks)
+    bookmarks_file = None
+    # a camera chosen with F1-F4 continues from the pose of the previous one
+    transfer_pose = True
+    # tour through the bookmarks (t): seconds from one bookmark to the next, poses per second
+    tour_seconds = 3.0
+    tour_rate = 60.0
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument("--record", default=None, help="record keyboard and mouse input to this file")
+        parser.add_argument("--replay", default=None, help="replay the input recorded in this file")
+        parser.add_argument("--keymap", default=None, help="json file with camera key bindings")
+        parser.add_argument("--bookmarks", default=None, help="file to keep the camera bookmarks in")
+        parser.add_argument("--log-level", default=None, choices=("debug", "info", "warning"),
+                            help="level of the app messages (camera help, toggles), default info")
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        print(self.ctx)
-        # rotation around camera cooridinate axes and world coord sys center
-        self.MixCam = CameraAxesWorldCenterCamera(self.wnd.keys, aspect_ratio=self.wnd.aspect_ratio) # 0
-        # rotation around world coordinate system axes and world coord sys center
-        self.WorldCam = WorldCoordinateCamera(self.wnd.keys, aspect_ratio=self.wnd.aspect_ratio) # 1
-        # real orbit controls (3 angles), around center of world coord sys
-        self.OrbitCam = Orbit4DCamera(self.wnd.keys, aspect_ratio=self.wnd.aspect_ratio) # 2
-        # rotation around camera coordinate axes and camera coord sys center
-        self.CamCam = CameraCoordinateCamera(self.wnd.keys, aspect_ratio=self.wnd.aspect_ratio) # 3
+        log_level = getattr(self.argv, "log_level", None)
+        if log_level:
+            logging.getLogger().setLevel(log_level.upper())
+        logger.debug("%s", self.ctx)
+        self.profiler = FrameProfiler(enabled=self.profile)
+        self.show_profile = False
+        # cameras are created on first use (get_camera), with these settings
+        keymap_path = getattr(self.argv, "keymap", None) or self.keymap
+        self._keymap = load_keymap(keymap_path) if keymap_path else None
+        self._cameras = {}
+        # clock of the created cameras, replaced by the clock of a recording / replay
+        self.camera_clock = None
+        # render 3D cube
+        self.render3D = False
+        # input recording / replay, live input is ignored during a replay
+        record = getattr(self.argv, "record", None) or self.record_input
+        replay = getattr(self.argv, "replay", None) or self.replay_input
+        self.recorder = None
+        self.replay = None
+        if replay:
+            self.replay = InputReplay(replay)
+            self.replay.attach(self)
+        elif record:
+            self.recorder = InputRecorder(record, self.wnd.keys, self.wnd.size)
+            self.recorder.attach(self)
+        # camera bookmarks on the number keys
+        self.bookmarks = Bookmarks(getattr(self.argv, "bookmarks", None) or self.bookmarks_file)
+        self._bookmark_keys = {getattr(self.wnd.keys, "NUMBER_{}".format(n)): str(n) for n in range(1, 10)}
+        # camera path played with t (PathCamera) and the camera it replaces meanwhile
+        self.tour = None
+        self._tour_camera = None
+        self._tour_end = None
         self.camera_enabled = True
         self.mouse_enabled = True
         self.mouseKey = 0
@@ -34,92 +149,259 @@ class CameraWindow(mglw.WindowConfig):
         
         # show coordinate system axes
         self.showAxes = False
-        # render 3D cube
-        self.render3D = False
+        # draw the cross-section of the 4D scene instead of its projection
+        self.cross_section = False
+        
+        # render on demand: last drawn frame and state it was drawn with
+        self._frame_fbo = None
+        self._frame_state = None
         
+    def get_camera(self, name):
+        """the camera of a name of CAMERAS, created when it is used the first time"""
+        camera = self._cameras.get(name)
+        if camera is None:
+            camera = CAMERAS[name](self.wnd.keys, aspect_ratio=self.wnd.aspect_ratio)
+            if self._keymap:
+                camera.set_keymap(self._keymap)
+            camera.use_rotor = self.rotor_orientation
+            camera.coalesce_mouse = self.coalesce_mouse
+            camera.keyboard_3d = self.render3D
+            if self.camera_clock is not None:
+                camera.clock = self.camera_clock
+            self._cameras[name] = camera
+        return camera
+
+    @property
+    def cameras(self) -> tuple:
+        """the cameras created so far"""
+        return tuple(self._cameras.values())
+
+    @property
+    def CamCam(self):
+        return self.get_camera("CamCam")
+
+    @property
+    def WorldCam(self):
+        return self.get_camera("WorldCam")
+
+    @property
+    def MixCam(self):
+        return self.get_camera("MixCam")
+
+    @property
+    def OrbitCam(self):
+        return self.get_camera("OrbitCam")
+
+    def select_camera(self, camera) -> None:
+        """activates a camera, which takes over the pose of the previous one if transfer_pose"""
+        if self.tour is not None:
+            self.stop_tour()
+        if camera is not self.camera:
+            if self.transfer_pose:
+                camera.take_pose(self.camera)
+            self.camera = camera
+
+    def start_tour(self) -> bool:
+        """
+        plays a camera path through the bookmarks (in the order of their names),
+        tour_seconds from one to the next. afterwards the camera continues from the last one
+
+        Returns:
+            bool: False if there are less than two bookmarks
+        """
+        names = self.bookmarks.names()
+        if len(names) < 2:
+            logger.info("a tour needs at least two bookmarks")
+            return False
+        path = CameraPath.from_snapshots([self.bookmarks.snapshots[name] for name in names], self.tour_seconds, ease=True)
+        self.tour = PathCamera(path.sample(rate=self.tour_rate), rate=self.tour_rate,
+                               projection=self.camera.projection, fov4=self.camera.fov4)
+        # the clock of a recording / replay
+        self.tour.clock = self.camera.clock
+        self.tour.start()
+        self._tour_camera = self.camera
+        self._tour_end = names[-1]
+        self.camera = self.tour
+        logger.info("tour: %s", " ".join(names))
+        return True
+
+    def stop_tour(self) -> None:
+        """ends the tour, the previous camera continues from the last bookmark if the tour is finished"""
+        if self.tour is None:
+            return
+        if self.tour.finished:
+            self.bookmarks.restore(self._tour_end, self._tour_camera)
+        self.camera = self._tour_camera
+        self.tour = None
+        self._tour_camera = None
+
+    def _live_input(self) -> bool:
+        """False for events of the window during a replay"""
+        return self.replay is None or self.replay.feeding
+
+    def begin_frame(self, time: float, frametime: float):
+        """
+        call at the start of render(). records the frame, or during a replay feeds
+        the input of the next recorded frame (and closes the window at the end)
+        Returns:
+            (time, frametime) to render with, the recorded ones during a replay
+        """
+        if self.replay is not None:
+            if self.replay.finished:
+                self.wnd.close()
+                return time, frametime
+            time, frametime = self.replay.feed(self)
+        elif self.recorder is not None:
+            self.recorder.frame(frametime)
+        if self.tour is not None and self.tour.finished:
+            self.stop_tour()
+        return time, frametime
+
     def key_event(self, key, action, modifiers):
         keys = self.wnd.keys
+        if not self._live_input():
+            return
+        if self.recorder is not None:
+            self.recorder.key(key, action, modifiers)
 
         if self.camera_enabled:
-            self.camera.key_input(key, action, modifiers)
+            with self.profiler.stage("input"):
+                self.camera.key_input(key, action, modifiers)
 
         if action == keys.ACTION_PRESS:
             if key == keys.Z:
                 self.showAxes = not self.showAxes
+            if key == keys.C:
+                self.cross_section = not self.cross_section
+                logger.info("cross-section: %s", self.cross_section)
+            if key == keys.F5 and self.profile:
+                self.show_profile = not self.show_profile
+            if key == keys.O:
+                self.render_on_demand = not self.render_on_demand
+                logger.info("render on demand: %s", self.render_on_demand)
+            if key == keys.T:
+                if self.tour is None:
+                    self.start_tour()
+                else:
+                    self.stop_tour()
             if key == keys.H:
                 self.render3D = not self.render3D
-                self.MixCam.keyboard_3d = self.render3D
-                self.WorldCam.keyboard_3d = self.render3D
-                self.OrbitCam.keyboard_3d = self.render3D
-                self.CamCam.keyboard_3d = self.render3D
-                print("render")
-            # choose camera (maybe give position and orientation of previously used camera when changing?)
+                for camera in self.cameras:
+                    camera.keyboard_3d = self.render3D
+                logger.info("render 3D: %s", self.render3D)
+            # choose camera
             if key == keys.F1:
-                print()
-                print("Camera Coordinate Camera")
-                print("rotation axes: \t\t camera coord sys")
-                print("center of rotation: \t camera coord sys")
-                print("rotations:\t left mouse xz, yz")
-                print("rotations:\t right mouse xw, yw")
-                print("rotations:\t scroll mouse zw")
-                print("rotations:\t x,y keys xy")
-                print()
-                self.camera = self.CamCam
+                logger.info(CAMERA_HELP["CamCam"])
+                self.select_camera(self.CamCam)
             if key == keys.F2:
-                print()
-                print("Pseudo Orbit/World Coordinate Camera:")
-                print("rotation axes: \t\t world coord sys")
-                print("center of rotation: \t world coord sys")
-                print("rotations:\t left mouse xz, yz")
-                print("rotations:\t right mouse xw, yw")
-                print("rotations:\t scroll mouse zw")
-                print("rotations:\t x,y keys xy")
-                print()
-                self.camera = self.WorldCam
+                logger.info(CAMERA_HELP["WorldCam"])
+                self.select_camera(self.WorldCam)
             if key == keys.F3:
-                print()
-                print("Mix of World and Camera Coordinate system Camera")
-                print("rotation axes: \t\t camera coord sys")
-                print("center of rotation: \t world coord sys")
-                print("rotations:\t left mouse xz, yz")
-                print("rotations:\t right mouse xw, yw")
-                print("rotations:\t scroll mouse zw")
-                print("rotations:\t x,y keys xy")
-                print()
-                self.camera = self.MixCam
+                logger.info(CAMERA_HELP["MixCam"])
+                self.select_camera(self.MixCam)
             if key == keys.F4:
-                print()
-                print("Orbit Control Camera")
-                print("rotation: \t\t camera directions from angles")
-                print("center of rotation: \t world coord sys")
-                print("rotations:\t left mouse for yaw, pitch 3D Camera")
-                print("rotations:\t right mouse + scroll for yaw, pitch, roll 4D Camera")
-                print()
-                self.camera = self.OrbitCam
+                logger.info(CAMERA_HELP["OrbitCam"])
+                self.select_camera(self.OrbitCam)
+            # bookmarks: ctrl + number saves, number restores
+            name = self._bookmark_keys.get(key)
+            if name is not None:
+                self.stop_tour()
+                if getattr(modifiers, "ctrl", False):
+                    self.bookmarks.save(name, self.camera)
+                    logger.info("bookmark %s saved", name)
+                elif self.bookmarks.restore(name, self.camera):
+                    logger.info("bookmark %s", name)
         if key == keys.ESCAPE:
             self.ctx.release()
                 
     # no mouse button clicked
     def mouse_position_event(self, x: int, y: int, dx: int, dy: int):
+        if not self._live_input():
+            return
+        if self.recorder is not None:
+            self.recorder.mouse_position(x, y, dx, dy)
         if self.camera_enabled and self.mouse_enabled:
-            self.camera.rot_state(-dx, -dy, 0, 0)
+            with self.profiler.stage("input"):
+                self.camera.rot_state(-dx, -dy, 0, 0)
                 
     # left mouse key clicked -> xz, yz planes
     # right mouse key clicked -> xw, yw planes
     def mouse_drag_event(self, x: int, y: int, dx: int, dy: int):
+        if not self._live_input():
+            return
+        if self.recorder is not None:
+            self.recorder.mouse_drag(x, y, dx, dy)
         if self.camera_enabled and self.mouse_enabled:
-            self.camera.rot_state(-dx, -dy, 0, self.mouseKey)
+            with self.profiler.stage("input"):
+                self.camera.rot_state(-dx, -dy, 0, self.mouseKey)
     
     # scrolling = rotate in zw plane
     def mouse_scroll_event(self, x_offset: float, y_offset: float):
-        self.camera.rot_state(0, 0, -y_offset, 3)
+        if not self._live_input():
+            return
+        if self.recorder is not None:
+            self.recorder.mouse_scroll(x_offset, y_offset)
+        with self.profiler.stage("input"):
+            self.camera.rot_state(0, 0, -y_offset, 3)
         
     def mouse_release_event(self, x: int, y: int, button: int):
+        if not self._live_input():
+            return
+        if self.recorder is not None:
+            self.recorder.mouse_release(x, y, button)
         self.mouseKey = 0
             
     def mouse_press_event(self, x: int, y: int, button: int):
+        if not self._live_input():
+            return
+        if self.recorder is not None:
+            self.recorder.mouse_press(x, y, button)
         self.mouseKey = button
         
     def resize(self, width: int, height: int):
         self.camera.projection.update(aspect_ratio=self.wnd.aspect_ratio)
+        self.camera.changed()
+        self._release_frame()
+
+    def close(self):
+        """window is closed: write the recording and the profile"""
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.profile and self.profile_output:
+            self.profiler.to_csv(self.profile_output + ".csv")
+            self.profiler.to_json(self.profile_output + ".json")
+        
+    def redraw_needed(self, *state) -> bool:
+        """for render on demand: True if the frame has to be drawn again.
+        state is everything the frame depends on besides the active camera
+        (e.g. toggles like showAxes), call it after reading the camera (matrix/matrix4d).
+        If a redraw is needed the offscreen framebuffer is bound, draw into it and
+        call present() afterwards.
+        """
+        state = (id(self.camera), self.camera.version, self.camera.interpolation) + state
+        if self._frame_fbo is None:
+            size = self.wnd.buffer_size
+            self._frame_fbo = self.ctx.framebuffer(
+                color_attachments=self.ctx.renderbuffer(size, samples=self.wnd.samples),
+                depth_attachment=self.ctx.depth_renderbuffer(size, samples=self.wnd.samples),
+            )
+            self._frame_state = None
+        if state == self._frame_state:
+            return False
+        self._frame_state = state
+        self._frame_fbo.use()
+        return True
+
+    def present(self) -> None:
+        """for render on demand: copies the last drawn frame to the window"""
+        self.ctx.copy_framebuffer(self.wnd.fbo, self._frame_fbo)
+        self.wnd.fbo.use()
+
+    def _release_frame(self) -> None:
+        if self._frame_fbo is not None:
+            for attachment in self._frame_fbo.color_attachments:
+                attachment.release()
+            self._frame_fbo.depth_attachment.release()
+            self._frame_fbo.release()
+            self._frame_fbo = None
 
@@ -0,0 +1,92 @@
+"""
+microbenchmark of the camera math: cost of one mouse event (update_orientation4D,
+matrix and rotor backend) and of one frame while moving (matrix4d with a movement key held).
+the "legacy" numbers replay the previous implementation (six rotate_plane
+matrices, np.linalg.inv for every basis vector and position update) for comparison.
+the look at of many viewpoints on the 3-sphere compares one look at per viewpoint
+with utils.look_at4d_batch
+
+    python bench_camera.py --repeat 20000
+
+"""
+import argparse
+import timeit
+from math import radians
+
+import numpy as np
+from pyrr import Vector4
+from moderngl_window.context.base.keys import BaseKeys
+
+from camera import CameraCoordinateCamera, POSITIVE, TIMESTEP
+from camera_core import OrbitCore
+from utils import look_at4d_batch, rotate_plane
+
+
+def legacy_update_orientation4D(camera, d_xz, d_yz, d_xw, d_yw, d_zw, d_xy=0):
+    """update_orientation4D (camera coordinates) as it was before the transpose fast path"""
+    xy_rot = rotate_plane(radians(d_xy), np.array([1, 1, 0, 0]))
+    yz_rot = rotate_plane(radians(d_yz), np.array([0, 1, 1, 0]))
+    xz_rot = rotate_plane(radians(d_xz), np.array([1, 0, 1, 0]))
+    xw_rot = rotate_plane(radians(d_xw), np.array([1, 0, 0, 1]))
+    yw_rot = rotate_plane(radians(d_yw), np.array([0, 1, 0, 1]))
+    zw_rot = rotate_plane(radians(d_zw), np.array([0, 0, 1, 1]))
+    rot_matrix = np.dot(xz_rot, yz_rot)
+    rot_matrix = np.dot(rot_matrix, xy_rot)
+    rot_matrix = np.dot(rot_matrix, xw_rot)
+    rot_matrix = np.dot(rot_matrix, yw_rot)
+    rot_matrix = np.dot(rot_matrix, zw_rot)
+    camera.dir4 = np.dot(np.linalg.inv(camera.orientation4), np.dot(rot_matrix, np.array([0, 0, 0, 1])))
+    camera.right4 = np.dot(np.linalg.inv(camera.orientation4), np.dot(rot_matrix, np.array([0, 0, 1, 0])))
+    camera.up4 = np.dot(np.linalg.inv(camera.orientation4), np.dot(rot_matrix, np.array([0, 1, 0, 0])))
+    camera.in4 = np.dot(np.linalg.inv(camera.orientation4), np.dot(rot_matrix, np.array([1, 0, 0, 0])))
+    camera.orientation4 = np.dot(rot_matrix, camera.orientation4)
+    camera.changed()
+
+
+def legacy_update_position4D(camera, t=TIMESTEP, velocity=20):
+    """update_position_from_keys4D (camera center, moving in z) before the transpose fast path"""
+    position4 = Vector4(np.dot(camera.orientation4, camera.position4))
+    position4.z += velocity * t
+    camera.position4 = Vector4(np.dot(np.linalg.inv(camera.orientation4), position4))
+    camera.changed()
+
+
+def measure(statement, repeat) -> float:
+    """microseconds per call, best of 5 runs"""
+    return min(timeit.repeat(statement, number=repeat, repeat=5)) / repeat * 1e6
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="camera update microbenchmark")
+    parser.add_argument("--repeat", type=int, default=20000, help="calls per measurement")
+    parser.add_argument("--viewpoints", type=int, default=10000, help="viewpoints of the look at measurement")
+    args = parser.parse_args()
+
+    camera = CameraCoordinateCamera(BaseKeys)
+    # typical mouse event: right mouse key dragged -> xw and yw plane
+    event = (0.0, 0.0, 0.5, -0.25, 0.0)
+
+    print("per event (update_orientation4D)")
+    print("  legacy  {:8.2f} us".format(measure(lambda: legacy_update_orientation4D(camera, *event), args.repeat)))
+    print("  current {:8.2f} us".format(measure(lambda: camera.update_orientation4D(*event), args.repeat)))
+    rotor_camera = CameraCoordinateCamera(BaseKeys)
+    rotor_camera.use_rotor = True
+    print("  rotor   {:8.2f} us".format(measure(lambda: rotor_camera.update_orientation4D(*event), args.repeat)))
+    print("  rotor + matrix expansion {:8.2f} us".format(
+        measure(lambda: (rotor_camera.update_orientation4D(*event), rotor_camera.orientation4), args.repeat)))
+
+    print("per frame (position update while moving)")
+    print("  legacy  {:8.2f} us".format(measure(lambda: legacy_update_position4D(camera), args.repeat)))
+    camera._zdir = POSITIVE
+    print("  current {:8.2f} us".format(measure(lambda: camera.update_position_from_keys4D(TIMESTEP), args.repeat)))
+
+    # viewpoints on the 3-sphere of radius 3 looking at the origin
+    positions = np.random.default_rng(0).normal(size=(args.viewpoints, 4))
+    positions *= 3.0 / np.linalg.norm(positions, axis=1, keepdims=True)
+    orbit = OrbitCore()
+    up, right = np.array([0.0, 1.0, 0.0, 0.0]), np.array([0.0, 0.0, 1.0, 0.0])
+    print("look at ({} viewpoints)".format(args.viewpoints))
+    print("  single  {:8.2f} ms".format(min(timeit.repeat(
+        lambda: [orbit._gl_look_at4d(p, np.zeros(4), up, right) for p in positions], number=1, repeat=3)) * 1e3))
+    print("  batch   {:8.2f} ms".format(min(timeit.repeat(
+        lambda: look_at4d_batch(positions, np.zeros(4), up, right), number=1, repeat=3)) * 1e3))
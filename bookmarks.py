@@ -0,0 +1,84 @@
+"""
+named camera bookmarks stored on disk. a bookmark is a Camera.snapshot, it can be
+restored into every camera (the pose is converted between the navigation systems)
+
+    bookmarks = Bookmarks("views.cam") # reads the file if it exists
+    bookmarks.save("front", camera) # also writes the file
+    bookmarks.restore("front", camera)
+
+file format (little endian):
+    header: magic b"CG4DCAM\\0", version (u4)
+    bookmarks: BOOKMARK_DTYPE records until the end of the file
+               (name utf-8, zero padded to 32 bytes, camera_core.SNAPSHOT_DTYPE)
+"""
+import os
+import struct
+
+import numpy as np
+
+from camera_core import SNAPSHOT_DTYPE
+
+MAGIC = b"CG4DCAM\0"
+VERSION = 1
+
+NAME_LENGTH = 32
+BOOKMARK_DTYPE = np.dtype([("name", "S{}".format(NAME_LENGTH)), ("snapshot", SNAPSHOT_DTYPE)])
+
+
+class Bookmarks:
+    """name -> camera snapshot, written to path on every change (kept in memory if path is None)"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.snapshots = {}
+        if path is not None and os.path.exists(path):
+            self.read()
+
+    def __contains__(self, name) -> bool:
+        return name in self.snapshots
+
+    def __len__(self) -> int:
+        return len(self.snapshots)
+
+    def names(self) -> list:
+        return sorted(self.snapshots)
+
+    def save(self, name, camera) -> None:
+        """stores the current state of the camera under name"""
+        if len(name.encode("utf-8")) > NAME_LENGTH:
+            raise ValueError("bookmark name longer than {} bytes: {!r}".format(NAME_LENGTH, name))
+        self.snapshots[name] = camera.snapshot()
+        self.write()
+
+    def restore(self, name, camera) -> bool:
+        """sets the camera to the bookmark, False if there is no bookmark with this name"""
+        snapshot = self.snapshots.get(name)
+        if snapshot is None:
+            return False
+        camera.restore(snapshot)
+        return True
+
+    def remove(self, name) -> None:
+        if self.snapshots.pop(name, None) is not None:
+            self.write()
+
+    def read(self) -> None:
+        with open(self.path, "rb") as f:
+            data = f.read()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("{} is not a bookmark file".format(self.path))
+        version, = struct.unpack_from("<I", data, len(MAGIC))
+        if version != VERSION:
+            raise ValueError("unsupported bookmark file version {}".format(version))
+        records = np.frombuffer(data, dtype=BOOKMARK_DTYPE, offset=len(MAGIC) + 4)
+        self.snapshots = {record["name"].decode("utf-8"): record["snapshot"].tobytes() for record in records}
+
+    def write(self) -> None:
+        if self.path is None:
+            return
+        items = sorted(self.snapshots.items())
+        records = np.zeros(len(items), dtype=BOOKMARK_DTYPE)
+        records["name"] = [name.encode("utf-8") for name, _ in items]
+        records["snapshot"] = np.frombuffer(b"".join(snapshot for _, snapshot in items), dtype=SNAPSHOT_DTYPE)
+        with open(self.path, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", VERSION) + records.tobytes())
@@ -2,42 +2,130 @@
 based on an example 3D camera from the moderngl-window library:
 https://github.com/moderngl/moderngl-window/blob/master/moderngl_window/scene/camera.py
 
+keyboard and mouse navigation on top of the navigation models of camera_core.py:
+key map, fixed timestep of the key navigation, mouse rotation and the 3D projection
+
 """
 
+import json
+import logging
 import time
-from math import cos, radians, sin
 
 import numpy as np
-from pyrr import Vector3, vector, vector3, Vector4, Matrix44
-from utils import cross, rotate_plane
+from camera_core import (CameraCore, CameraCoordinateCore, WorldCoordinateCore,
+                         CameraAxesWorldCenterCore, OrbitCore, POSE_NAVIGATION)
 
 from moderngl_window.opengl.projection import Projection3D
 from moderngl_window.context.base.keys import BaseKeys
 
-# Direction Definitions
-RIGHT = 1
-LEFT = 2
-FORWARD = 3
-BACKWARD = 4
-UP = 5
-DOWN = 6
-IN = 7
-OUT = 8
-RED = 9
-GREEN = 10
-BLUE = 11
-ORANGE = 12
-YELLOW = 13
-VIOLET = 14
+logger = logging.getLogger(__name__)
 
+# fixed timestep (seconds) of the key navigation, independent of the frame rate
+TIMESTEP = 1.0 / 120.0
+# longer frames are cut to this (seconds), so a stalled frame does not move the
+# camera far away or trigger hundreds of steps
+MAX_FRAME_TIME = 0.25
+# key movement in axis units per second and key rotation in degrees per second
+KEY_VELOCITY = 20.0
+KEY_ROTATION_SPEED = 60.0
 
 # Movement Definitions
 STILL = 0
 POSITIVE = 1
 NEGATIVE = 2
 
-
-class Camera:
+# key actions that hold a movement/rotation while the key is pressed:
+# name -> (state slot of the 4D camera, state slot of the 3D camera, value while pressed)
+ACTIONS = {
+    "move_right": ("_xdir", "_xdir", POSITIVE),
+    "move_left": ("_xdir", "_xdir", NEGATIVE),
+    "move_forward": ("_zdir", "_zdir", NEGATIVE),
+    "move_backward": ("_zdir", "_zdir", POSITIVE),
+    "move_up": ("_ydir", "_ydir", POSITIVE),
+    "move_down": ("_ydir", "_ydir", NEGATIVE),
+    # fourth dimension in/out
+    "move_in": ("_wdir", "_wdir", POSITIVE),
+    "move_out": ("_wdir", "_wdir", NEGATIVE),
+    # xw (4D) / xz (3D)
+    "rotate_right": ("_xwrot", "_xzrot", POSITIVE),
+    "rotate_left": ("_xwrot", "_xzrot", NEGATIVE),
+    # yw (4D) / yz (3D)
+    "rotate_up": ("_ywrot", "_yzrot", POSITIVE),
+    "rotate_down": ("_ywrot", "_yzrot", NEGATIVE),
+    # zw (4D) / xy (3D)
+    "rotate_in": ("_zwrot", "_xyrot", POSITIVE),
+    "rotate_out": ("_zwrot", "_xyrot", NEGATIVE),
+    # planes of the 3D camera space, 4D only
+    "rotate_xz_positive": ("_xzrot4", None, POSITIVE),
+    "rotate_xz_negative": ("_xzrot4", None, NEGATIVE),
+    "rotate_yz_positive": ("_yzrot4", None, POSITIVE),
+    "rotate_yz_negative": ("_yzrot4", None, NEGATIVE),
+    "rotate_xy_positive": ("_xyrot4", None, POSITIVE),
+    "rotate_xy_negative": ("_xyrot4", None, NEGATIVE),
+}
+
+# key actions on key press: name -> method of the camera
+COMMANDS = {
+    "toggle_3d": "toggle_keyboard_3d",
+    "reset": "reset",
+    "video_pose": "video_pose",
+}
+
+# key name (attribute of the keys class) or key code -> action
+DEFAULT_KEYMAP = {
+    "D": "move_right",
+    "A": "move_left",
+    "W": "move_forward",
+    "S": "move_backward",
+    "SPACE": "move_up",
+    "LEFT_SHIFT": "move_down",
+    "Q": "move_in",
+    "E": "move_out",
+    "RIGHT": "rotate_right",
+    "LEFT": "rotate_left",
+    "UP": "rotate_up",
+    "DOWN": "rotate_down",
+    "PAGE_UP": "rotate_in",
+    "PAGE_DOWN": "rotate_out",
+    "J": "rotate_xz_positive",
+    "L": "rotate_xz_negative",
+    "K": "rotate_yz_positive",
+    "I": "rotate_yz_negative",
+    "X": "rotate_xy_positive",
+    "Y": "rotate_xy_negative",
+    "P": "toggle_3d",
+    "R": "reset",
+    "V": "video_pose",
+}
+
+
+def resolve_key(keys, key):
+    """key code of a key name of the keys class or of a (numeric string) code, None if unknown"""
+    if isinstance(key, int):
+        return key
+    if key.isdigit():
+        return int(key)
+    code = getattr(keys, key.upper(), None)
+    # keys that do not exist in a window backend are "undefined" in moderngl_window
+    return None if code in (None, "undefined") else code
+
+
+def load_keymap(path) -> dict:
+    """key map {key name or code: action} from a json file"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def _key_distance(state, distance) -> float:
+    """distance moved/rotated in a direction while its key state is POSITIVE/NEGATIVE"""
+    if state == POSITIVE:
+        return distance
+    if state == NEGATIVE:
+        return -distance
+    return 0.0
+
+
+class Camera(CameraCore):
     """Simple camera class containing projection.
 
     .. code:: python
@@ -50,7 +138,19 @@ class Camera:
 
         # Get projection matrix as numpy array
         print(camera.projection.matrix)
+
+    keys, mouse and the fixed timestep of the key navigation, the pose and how it
+    changes is in camera_core.CameraCore
     """
+    __slots__ = (
+        "keyboard_3d",
+        "_xdir", "_zdir", "_ydir", "_wdir", "_xwrot", "_ywrot", "_zwrot",
+        "_xyrot4", "_yzrot4", "_xzrot4", "_xzrot", "_yzrot", "_xyrot",
+        "clock", "timestep", "_last_time", "_accumulator", "_step_version", "_last_rot_time",
+        "_move3", "_move4",
+        "_velocity", "_mouse_sensitivity", "coalesce_mouse", "_mouse_pending",
+        "keys", "_key_table",
+    )
 
     def __init__(self, keys: BaseKeys, fov=45.0, aspect_ratio=1.0, near=1.0, far=100.0):
         """Initialize camera using a specific projection
@@ -61,48 +161,15 @@ class Camera:
             near (float): Near plane
             far (float): Far plane
         """
-        # position and orientation of 3D camera
-        self.position = Vector3([0.0, 0.0, 2.0])
-        self.up = Vector3([0.0, 1.0, 0.0])
-        self.right = Vector3([1.0, 0.0, 0.0])
-        self.dir = Vector3([0.0, 0.0, 1.0])
-        self.orientation = np.array([self.right, self.up, self.dir], dtype="f4")
-        
+        super().__init__()
+
         # if true move 3d camera, else 4d camera
         # usually set to false bc 3D camera is supposed to be fixed
         self.keyboard_3d = False
-        # if true rotation around camera coordinate system axes, else world coordinate sys axes)
-        self.cameraCoordinates = True
-        # if true rotate around center of camera coordinate system, else of world coordinate system
-        self.cameraCenter = True
-        
-        # position and orientation of 4D camera
-        self.position4 = Vector4([0.0, 0.0, 0.0, -3.0])
-        self.dir4 = Vector4([0.0, 0.0, 0.0, 1.0]) # w
-        self.up4 = Vector4([0.0, 1.0, 0.0, 0.0]) # y
-        self.right4 = Vector4([0.0, 0.0, 1.0, 0.0]) # z
-        self.in4 = Vector4([1.0, 0.0, 0.0, 0.0]) # x
-        self.orientation4 = np.array([self.in4, self.up4, self.right4, self.dir4], dtype="f4")
-        
-        # Yaw and Pitch (rotation in 3d with mouse)
-        self._yaw3D = 90.0
-        self._pitch3D = 90.0
-
-        # yaw and pitch in 4D, for orbit controls in 4D
-        self._yaw = 90.0
-        self._pitch = 90.0
-        # + roll for 4D mouse control (scrolling)
-        self._roll = 90.0
-
-        # World up vector of 3D world
-        self._up = Vector3([0.0, 1.0, 0.0])
-        # 4D world up and right vector
-        self._up4 = Vector4([0.0, 1.0, 0.0, 0.0]) # y
-        self._right4 = Vector4([0.0, 0.0, 1.0, 0.0]) # z
 
         # Projection for 3D->2D of 3D camera
-        self._projection = Projection3D(aspect_ratio, fov, near, far)
-        
+        self.projection = Projection3D(aspect_ratio, fov, near, far)
+
         # NAVIGATION ATTRIBUTES:
         # 2 keys for each direction 
         # (direction = rotation in plane in POSITIVE/NEGATIVE dir (changing orientation), 
@@ -125,215 +192,58 @@ class Camera:
         self._yzrot = STILL
         self._xyrot = STILL
 
-        self._last_time = 0
+        # fixed timestep simulation of the key navigation:
+        # clock() returns seconds (can be replaced, e.g. by a virtual clock for replays),
+        # time not yet simulated, state before the last step for interpolation
+        self.clock = time.perf_counter
+        self.timestep = TIMESTEP
+        self._last_time = None
+        self._accumulator = 0.0
+        self._step_version = -1
         self._last_rot_time = 0
+        # movement of one step, passed to translate/translate3D
+        self._move3 = np.zeros(3, dtype="f4")
+        self._move4 = np.zeros(4, dtype="f4")
         
         # Velocity in axis units per second
         self._velocity = 3.0
         self._mouse_sensitivity = 0.5
+        
+        # if true mouse movement is summed up per mouse key and applied as one
+        # rotation when the camera is read (matrix/matrix4d), else on every event
+        self.coalesce_mouse = False
+        # mouse key -> summed (dx, dy, dz) since the last read
+        self._mouse_pending = {}
 
         # For using keys to navigate:
         self.keys = keys
-
-    @property
-    def projection(self):
-        """
-        :py:class:`~moderngl_window.opengl.projection.Projection3D`: The 3D projection
-        projection matrix for 3D camera (3D->2D perspective projection)
-        """
-        return self._projection
-
-    """
-    @property
-    def matrix(self) -> np.ndarray:
-        np.ndarray: The current view matrix for the camera
-        overwritten for each specific camera navigation system
-        self._update_yaw_and_pitch()
-        return self._gl_look_at(self.position, self.position + self.dir, self._up)
-    
-    @property
-    def matrix4d(self) -> np.ndarray:
-        np.ndarray: The current view matrix for the camera
-        overwritten for each specific camera navigation system
-        
-        self._update_yaw_and_pitch_4d()
-        return self._gl_look_at4d(self.position4, self.position4 + self.dir4, self._up4, self._right4)
-    """
-    def _update_yaw_and_pitch_3d(self) -> None:
-        """
-        Updates the 3D camera direction based on the current yaw and pitch.
-        direction corresponds to z-axis of camera coordinate system, 
-        = axis along which is projected.
-        used only for orbit camera
-        Orientation matrix of camera is updated based on dir and global up vector self._up in "matrix()"
-        """
-        front = Vector3([0.0, 0.0, 0.0])
-        front.x = sin(radians(self._pitch3D)) * cos(radians(self._yaw3D))
-        front.y = cos(radians(self._pitch3D))
-        front.z = sin(radians(self._pitch3D)) * sin(radians(self._yaw3D))
-        self.dir = vector.normalise(front)
-    
-    def update_orientation3D(self, d_xz, d_yz, d_xy = 0):
-        """
-        rotates camera orientation (dir, right, up vectors) around each axis by the
-        given delta angles
-        """
-        xy_rot = rotate_plane(radians(d_xy), np.array([1,1,0,0]))
-        xz_rot = rotate_plane(radians(d_xz), np.array([1,0,1,0]))
-        yz_rot = rotate_plane(radians(d_yz), np.array([0,1,1,0]))
-        
-        rot_matrix = np.dot(xz_rot, yz_rot)
-        rot_matrix = np.dot(rot_matrix, xy_rot)[:3,:3]
-        
-        
-        # rotate around camera coordinates system axes
-        if self.cameraCoordinates:
-            self.dir = np.dot(rot_matrix, np.array([0, 0, 1])) #np.array([0, 0, 1, 0]))[:3] #z
-            self.dir = np.dot(np.linalg.inv(self.orientation), self.dir)
-            
-            self.right = np.dot(rot_matrix, np.array([1, 0, 0])) #np.array([0, 0, 1, 0]))[:3] #z
-            self.right = np.dot(np.linalg.inv(self.orientation), self.right) #np.array([0, 0, 1, 0]))[:3] #z
-            
-            self.up = np.dot(rot_matrix, np.array([0, 1, 0]))
-            self.up = np.dot(np.linalg.inv(self.orientation), self.up)
-            
-            self.orientation = np.array([self.right, self.up, self.dir], dtype="f4")
-        # rotate around world coordinates system axes
-        else:
-            self.dir = np.dot(rot_matrix, self.dir) #z
-            self.right = np.dot(rot_matrix, self.right) #x
-            self.up = np.dot(rot_matrix, self.up) #y
-            self.orientation = np.array([self.right, self.up, self.dir], dtype="f4")
-        
-    
-    def update_orientation4D(self, d_xz, d_yz, d_xw, d_yw, d_zw, d_xy = 0):
-        """
-        receives delta of angle in each rotation plane and updates
-        the orientation and coordinate system axes of camera accordingly
-        """
-        xy_rot = rotate_plane(radians(d_xy), np.array([1,1,0,0]))
-        yz_rot = rotate_plane(radians(d_yz), np.array([0,1,1,0]))
-        xz_rot = rotate_plane(radians(d_xz), np.array([1,0,1,0]))
-        xw_rot = rotate_plane(radians(d_xw), np.array([1,0,0,1]))
-        yw_rot = rotate_plane(radians(d_yw), np.array([0,1,0,1]))
-        zw_rot = rotate_plane(radians(d_zw), np.array([0,0,1,1]))
-        
-        rot_matrix = np.dot(xz_rot, yz_rot)
-        rot_matrix = np.dot(rot_matrix, xy_rot)
-        rot_matrix = np.dot(rot_matrix, xw_rot)
-        rot_matrix = np.dot(rot_matrix, yw_rot)
-        rot_matrix = np.dot(rot_matrix, zw_rot)
-        
-        # rotate around axes of camera coordinate system
-        if self.cameraCoordinates:
-            self.dir4 = np.dot(rot_matrix, np.array([0, 0, 0, 1])) #w
-            self.dir4 = np.dot(np.linalg.inv(self.orientation4), self.dir4)
-        
-            self.right4 = np.dot(rot_matrix, np.array([0, 0, 1, 0])) #z
-            self.right4 = np.dot(np.linalg.inv(self.orientation4), self.right4)
-            
-            self.up4 = np.dot(rot_matrix, np.array([0, 1, 0, 0])) #y
-            self.up4 = np.dot(np.linalg.inv(self.orientation4), self.up4)
-            
-            self.in4 = np.dot(rot_matrix, np.array([1, 0, 0, 0])) #x
-            self.in4 = np.dot(np.linalg.inv(self.orientation4), self.in4)
-            
-            self.orientation4 = np.dot(rot_matrix, self.orientation4)
-            #self.orientation4 = np.array([self.in4, self.up4, self.right4, self.dir4], dtype="f4")
-        # rotate around axes of world coordinate system    
-        else:
-            self.dir4 = np.dot(rot_matrix, self.dir4) #w
-            self.right4 = np.dot(rot_matrix, self.right4) #z
-            self.up4 = np.dot(rot_matrix, self.up4) #y
-            self.in4 = np.dot(rot_matrix, self.in4) #x
-            self.orientation4 = np.dot(self.orientation4, rot_matrix)
-            #self.orientation4 = np.array([self.in4, self.up4, self.right4, self.dir4], dtype="f4")
-        
-    def _update_yaw_and_pitch_4d(self) -> None:
-        """
-        Updates the camera direction based on the current yaw [0,2pi], pitch[0,pi] and roll[0,pi]
-        -> orbit controls
-        in 4D w-axis = axis of projection
-        camera orientation can then be calculated with the look at method
-        """
-        front = np.array([0.0, 0.0, 0.0, 0.0])
-        front[0] = sin(radians(self._pitch)) * sin(radians(self._roll)) * cos(radians(self._yaw))
-        front[1] = sin(radians(self._roll)) * cos(radians(self._pitch)) # up
-        front[2] = cos(radians(self._roll)) # right
-        front[3] = sin(radians(self._pitch)) * sin(radians(self._roll)) * sin(radians(self._yaw))
-        self.dir4 = vector.normalise(front)
-        
-    def _gl_look_at(self, pos, target, up) -> (np.ndarray, np.ndarray):
-        """The standard lookAt method.
-        returns orientation and position ready to pass to shader
-
-        Args:
-            pos: current position
-            target: target position to look at
-            up: direction up
-        Returns:
-            np.ndarray: orientation (3x3)
-            np.ndarray: position (3)
-        """
-        z = vector.normalise(target - pos) # dir
-        x = vector.normalise(vector3.cross(vector.normalise(up), z)) # orthogonal to dir and up
-        y = vector.normalise(vector3.cross(z, x)) # camera up
-        
-        orientation = np.zeros((3,3), dtype="f4")
-        orientation[0][0] = x[0]  # -- X
-        orientation[0][1] = x[1]
-        orientation[0][2] = x[2]
-        orientation[1][0] = y[0]  # -- Y
-        orientation[1][1] = y[1]
-        orientation[1][2] = y[2]
-        orientation[2][0] = z[0]  # -- Z
-        orientation[2][1] = z[1]
-        orientation[2][2] = z[2]
-        
-        position = -np.array(pos, dtype="f4")
-        
-        return orientation, position
-    
-    def _gl_look_at4d(self, pos, target, up, right) -> np.ndarray:
-        """The standard lookAt method extended for 4D.
-        returns camera orientation and position ready to pass to shader
-
-        Args:
-            pos: current position
-            target: target position to look at (pos + dir)
-            up: direction up (world y axis)
-            right: fixed direction that points to the "right" (world z axis)
-        Returns:
-            np.ndarray: orientation (4x4)
-            np.ndarray: position (4)
-        """
-        
-        w = vector.normalize(target - pos) # front/dir
-        x = vector.normalize(cross(vector.normalize(up), vector.normalize(right), w)) # in
-        y = vector.normalize(cross(vector.normalize(right), x, w)) # up
-        z = vector.normalize(cross(w, x, y)) # right
-        
-        orientation = Matrix44.identity(dtype="f4")
-        orientation[0][0] = x[0]  # -- X
-        orientation[0][1] = x[1]
-        orientation[0][2] = x[2]
-        orientation[0][3] = x[3]
-        orientation[1][0] = y[0]  # -- Y
-        orientation[1][1] = y[1]
-        orientation[1][2] = y[2]
-        orientation[1][3] = y[3]
-        orientation[2][0] = z[0]  # -- Z
-        orientation[2][1] = z[1]
-        orientation[2][2] = z[2]
-        orientation[2][3] = z[3]
-        orientation[3][0] = w[0]  # -- W
-        orientation[3][1] = w[1]
-        orientation[3][2] = w[2]
-        orientation[3][3] = w[3]
-        
-        # 
-        position = -np.array(pos, dtype="f4")
-        return orientation, position
+        self.set_keymap()
+
+    def set_keymap(self, keymap=None) -> None:
+        """
+        builds the dispatch table (key, action) -> state slot update from a key map
+        {key name or code: action name} (see DEFAULT_KEYMAP and ACTIONS),
+        entries of keymap replace the default binding of the key
+        """
+        mapping = dict(DEFAULT_KEYMAP)
+        if keymap:
+            mapping.update(keymap)
+        self._key_table = {}
+        for key, name in mapping.items():
+            code = resolve_key(self.keys, key)
+            if code is None:
+                # keys the window backend does not define are skipped silently
+                if isinstance(key, str) and not hasattr(self.keys, key.upper()):
+                    logger.warning("key map: unknown key %r", key)
+                continue
+            if name in ACTIONS:
+                slot4, slot3, value = ACTIONS[name]
+                self._key_table[code, self.keys.ACTION_PRESS] = (name, slot4, slot3, value)
+                self._key_table[code, self.keys.ACTION_RELEASE] = (name, slot4, slot3, STILL)
+            elif name in COMMANDS:
+                self._key_table[code, self.keys.ACTION_PRESS] = getattr(self, COMMANDS[name])
+            else:
+                logger.warning("key map: unknown action %r for key %r", name, key)
 
     def key_input(self, key, action, modifiers) -> None:
         """Process key inputs and move camera
@@ -343,597 +253,125 @@ class Camera:
             action: key action release/press
             modifiers: key modifier states such as ctrl or shift
         """
-        # Right
-        if key == self.keys.D:
-            if action == self.keys.ACTION_PRESS:
-                self.move_right(True)
-            elif action == self.keys.ACTION_RELEASE:
-                self.move_right(False)
-        # Left
-        elif key == self.keys.A:
-            if action == self.keys.ACTION_PRESS:
-                self.move_left(True)
-            elif action == self.keys.ACTION_RELEASE:
-                self.move_left(False)
-        # Forward
-        elif key == self.keys.W:
-            if action == self.keys.ACTION_PRESS:
-                self.move_forward(True)
-            if action == self.keys.ACTION_RELEASE:
-                self.move_forward(False)
-        # Backwards
-        elif key == self.keys.S:
-            if action == self.keys.ACTION_PRESS:
-                self.move_backward(True)
-            if action == self.keys.ACTION_RELEASE:
-                self.move_backward(False)
-
-        # Down
-        elif key == 65505: #shift
-            if action == self.keys.ACTION_PRESS:
-                self.move_down(True)
-            if action == self.keys.ACTION_RELEASE:
-                self.move_down(False)
-        # Up
-        elif key == self.keys.SPACE:
-            if action == self.keys.ACTION_PRESS:
-                self.move_up(True)
-            if action == self.keys.ACTION_RELEASE:
-                self.move_up(False)
-                
-        # IN
-        elif key == self.keys.Q:
-            if action == self.keys.ACTION_PRESS:
-                self.move_in(True)
-            if action == self.keys.ACTION_RELEASE:
-                self.move_in(False)
-        # OUT
-        elif key == self.keys.E:
-            if action == self.keys.ACTION_PRESS:
-                self.move_out(True)
-            if action == self.keys.ACTION_RELEASE:
-                self.move_out(False)
-        
-        
-        # rotation depending on which camera is activated (3D/4D)
-        # rotate xw(4D)/xz(3D) 
-        elif key == self.keys.LEFT:
-            if action == self.keys.ACTION_PRESS:
-                self.rotate_left(True)
-            if action == self.keys.ACTION_RELEASE:
-                self.rotate_left(False)
-        elif key == self.keys.RIGHT:
-            if action == self.keys.ACTION_PRESS:
-                self.rotate_right(True)
-            if action == self.keys.ACTION_RELEASE:
-                self.rotate_right(False)
-        
-        # rotate yw(4D)/yz(3D)
-        elif key == self.keys.UP:
-            if action == self.keys.ACTION_PRESS:
-                self.rotate_up(True)
-            if action == self.keys.ACTION_RELEASE:
-                self.rotate_up(False)
-        elif key == self.keys.DOWN:
-            if action == self.keys.ACTION_PRESS:
-                self.rotate_down(True)
-            if action == self.keys.ACTION_RELEASE:
-                self.rotate_down(False)
-                
-        # rotate zw(4D)/xy(3D)
-        elif key == self.keys.PAGE_UP:
-            if action == self.keys.ACTION_PRESS:
-                self.rotate_in(True)
-            if action == self.keys.ACTION_RELEASE:
-                self.rotate_in(False)
-        elif key == self.keys.PAGE_DOWN:
-            if action == self.keys.ACTION_PRESS:
-                self.rotate_out(True)
-            if action == self.keys.ACTION_RELEASE:
-                self.rotate_out(False)
-                
-                
-        # rotate xz(4D)
-        elif key == self.keys.J:
-            if action == self.keys.ACTION_PRESS:
-                self.rotate_red(True)
-            if action == self.keys.ACTION_RELEASE:
-                self.rotate_red(False)
-        elif key == self.keys.L:
-            if action == self.keys.ACTION_PRESS:
-                self.rotate_green(True)
-            if action == self.keys.ACTION_RELEASE:
-                self.rotate_green(False)
-                
-        # rotate yz(4D)
-        elif key == self.keys.I:
-            if action == self.keys.ACTION_PRESS:
-                self.rotate_orange(True)
-            if action == self.keys.ACTION_RELEASE:
-                self.rotate_orange(False)
-        elif key == self.keys.K:
-            if action == self.keys.ACTION_PRESS:
-                self.rotate_blue(True)
-            if action == self.keys.ACTION_RELEASE:
-                self.rotate_blue(False)
-                
-        # rotate xy(4D)
-        elif key == self.keys.X:
-            if action == self.keys.ACTION_PRESS:
-                self.rotate_yellow(True)
-            if action == self.keys.ACTION_RELEASE:
-                self.rotate_yellow(False)
-        elif key == self.keys.Y:
-            if action == self.keys.ACTION_PRESS:
-                self.rotate_violet(True)
-            if action == self.keys.ACTION_RELEASE:
-                self.rotate_violet(False)
-        
-        elif action == self.keys.ACTION_PRESS and key == self.keys.P:
-            self.keyboard_3d = not self.keyboard_3d
-            print("camera 3d:", self.keyboard_3d)
-        
-        # reset angles, orientation & position
-        elif key == self.keys.R and action == self.keys.ACTION_PRESS:
-            print("reset all")
-            self._yaw3D = 90.0
-            self._pitch3D = 90.0
-            self._yaw = 90.0
-            self._pitch = 90.0
-            self._roll = 90.0
-            self.in4 = np.array([1,0,0,0])
-            self.up4 = np.array([0,1,0,0])
-            self.right4 = np.array([0,0,1,0])
-            self.dir4 = np.array([0,0,0,1])
-            self.position4 = Vector4([0.0, 0.0, 0.0, -3.0])
-            self.orientation4 = np.array([self.in4, self.up4, self.right4, self.dir4], dtype="f4")
-        
-            self.dir = np.array([0,0,1])
-            self.right = np.array([1,0,0])
-            self.up = np.array([0,1,0])
-            self.position = Vector3([0.0, 0.0, 2.0])
-            self.orientation = np.array([self.right, self.up, self.dir], dtype="f4")
-        # reproduce the same position to make video for documentation
-        if key == self.keys.V and action == self.keys.ACTION_PRESS:
-            cc = self.cameraCoordinates
-            self.cameraCoordinates = True
-            self.update_orientation4D(-20, 0, 0, 0, 0)
-            self.update_orientation4D(0, 25, 0, 0, 0)
-            self.cameraCoordinates = cc
-            
-    def move_left(self, activate) -> None:
-        """The camera should be continiously moving to the left.
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.move_state(LEFT, activate)
-
-    def move_right(self, activate) -> None:
-        """The camera should be continiously moving to the right.
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.move_state(RIGHT, activate)
-
-    def move_forward(self, activate) -> None:
-        """The camera should be continiously moving forward.
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.move_state(FORWARD, activate)
-
-    def move_backward(self, activate) -> None:
-        """The camera should be continiously moving backwards.
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.move_state(BACKWARD, activate)
-
-    def move_up(self, activate) -> None:
-        """The camera should be continiously moving up.
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.move_state(UP, activate)
-
-    def move_down(self, activate):
-        """The camera should be continiously moving down.
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.move_state(DOWN, activate)
-    
-    # for fourth dimension in/out
-    def move_in(self, activate):
-        """The camera should be continiously moving inwards.
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.move_state(IN, activate)
-        
-    def move_out(self, activate):
-        """The camera should be continiously moving outwards.
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.move_state(OUT, activate)        
-    
-    def rotate_left(self, activate) -> None: # <-
-        """camera rotation either in xw (4d scene) or xz (3d scene)
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.rot_state_from_keys(LEFT, activate)
-
-    def rotate_right(self, activate) -> None: # ->
-        """camera rotation either in xw (4d scene) or xz (3d scene)
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.rot_state_from_keys(RIGHT, activate)
-    
-    def rotate_up(self, activate) -> None: # arrow up
-        """camera rotation either in yw (4d scene) or yz (3d scene)
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.rot_state_from_keys(UP, activate)
-
-    def rotate_down(self, activate) -> None: # arrowdown
-        """camera rotation either in yw (4d scene) or yz (3d scene)
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.rot_state_from_keys(DOWN, activate)
-    
-    def rotate_in(self, activate) -> None: # pagedown
-        """camera rotation either in zw (4d scene) or xy (3d scene)
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.rot_state_from_keys(IN, activate)
-
-    def rotate_out(self, activate) -> None: # pageup
-        """camera rotation either in zw (4d scene) or xy (3d scene)
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.rot_state_from_keys(OUT, activate)
-        
-    def rotate_red(self, activate) -> None: # l
-        """camera rotation in xz (4d scene)
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.rot_state_from_keys(RED, activate)
-        
-    def rotate_green(self, activate) -> None: # j
-        """camera rotation in xz (4d scene)
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.rot_state_from_keys(GREEN, activate)
-        
-    def rotate_blue(self, activate) -> None: # k
-        """camera rotation in yz (4d scene)
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.rot_state_from_keys(BLUE, activate)
-        
-    def rotate_orange(self, activate) -> None: # i
-        """camera rotation in yz (4d scene)
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.rot_state_from_keys(ORANGE, activate)
-
-    def rotate_yellow(self, activate) -> None: # x
-        """camera rotation in xy (4d scene)
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.rot_state_from_keys(YELLOW, activate) 
-    
-    def rotate_violet(self, activate) -> None: # y
-        """camera rotation in xy (4d scene)
-
-        Args:
-            activate (bool): Activate or deactivate this state
-        """
-        self.rot_state_from_keys(VIOLET, activate)
+        entry = self._key_table.get((key, action))
+        if entry is None:
+            return
+        if callable(entry):
+            entry()
+            return
+        name, slot4, slot3, value = entry
+        # rotation keys change the 3D or 4D camera depending on which one is activated
+        slot = slot3 if self.keyboard_3d else slot4
+        if slot is not None:
+            setattr(self, slot, value)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s %s", name, "start" if value != STILL else "stop")
+
+    def toggle_keyboard_3d(self) -> None:
+        """switch the keys between the 3D and the 4D camera"""
+        self.keyboard_3d = not self.keyboard_3d
+        logger.info("camera 3d: %s", self.keyboard_3d)
+
+    def reset(self) -> None:
+        """reset angles, orientation & position"""
+        logger.info("reset all")
+        super().reset()
+
+    def snapshot(self) -> bytes:
+        """as CameraCore.snapshot, with the collected mouse movement applied"""
+        self.apply_mouse_input()
+        return super().snapshot()
+
+    def restore(self, snapshot) -> None:
+        """as CameraCore.restore, mouse movement of the old pose is dropped"""
+        super().restore(snapshot)
+        self._mouse_pending = {}
     
-        
-    def move_state(self, direction, activate) -> None:
-        """Set the camera position move state.
-
-        Args:
-            direction: What direction to update
-            activate: Start or stop moving in the direction
-        """
-        if direction == RIGHT:
-            self._xdir = POSITIVE if activate else STILL
-        elif direction == LEFT:
-            self._xdir = NEGATIVE if activate else STILL
-            
-        elif direction == FORWARD:
-            self._zdir = NEGATIVE if activate else STILL
-        elif direction == BACKWARD:
-            self._zdir = POSITIVE if activate else STILL
-            
-        elif direction == UP:
-            self._ydir = POSITIVE if activate else STILL
-        elif direction == DOWN:
-            self._ydir = NEGATIVE if activate else STILL
-        
-        elif direction == IN:
-            self._wdir = POSITIVE  if activate else STILL
-        elif direction == OUT:
-            self._wdir = NEGATIVE if activate else STILL
+    @property
+    def moving3D(self) -> bool:
+        """True if a key for moving the camera in x, y or z direction is held"""
+        return self._xdir != STILL or self._ydir != STILL or self._zdir != STILL
 
-    def rot_state_from_keys(self, direction, activate) -> None:
-        """Set the camera orientation change state.
+    @property
+    def moving4D(self) -> bool:
+        """True if a key for moving the camera in x, y, z or w direction is held"""
+        return self.moving3D or self._wdir != STILL
 
-        Args:
-            direction: What direction (rotation plane) to update
-            activate: Start or stop rotating in the plane
-        """
-        # 4D camera is activated (4D scene is rendered)
-        if not self.keyboard_3d:
-            if direction == RIGHT:
-                print("rotate xw 4D")
-                self._xwrot = POSITIVE if activate else STILL
-            elif direction == LEFT:
-                print("rotate xw 4D")
-                self._xwrot = NEGATIVE if activate else STILL
-                
-            if direction == UP:
-                print("rotate yw 4D")
-                self._ywrot = POSITIVE if activate else STILL
-            elif direction == DOWN:
-                print("rotate yw 4D")
-                self._ywrot = NEGATIVE if activate else STILL
-                
-            if direction == IN:
-                self._zwrot = POSITIVE if activate else STILL
-                print("rotate zw 4D")
-            elif direction == OUT:
-                self._zwrot = NEGATIVE if activate else STILL
-                print("rotate zw 4D")
-            
-            # for camera in 3D space
-            if direction == RED: # j, xz
-                self._xzrot4 = POSITIVE if activate else STILL
-                print("rotate xz 4D")
-            elif direction == GREEN: # l
-                self._xzrot4 = NEGATIVE if activate else STILL
-                print("rotate xz 4D")
-                
-            if direction == BLUE: # k, yz
-                self._yzrot4 = POSITIVE if activate else STILL
-                print("rotate yz 4D")
-            elif direction == ORANGE: # i
-                self._yzrot4 = NEGATIVE if activate else STILL
-                print("rotate yz 4D")
-            
-            if direction == YELLOW: # x, xy-plane
-                self._xyrot4 = POSITIVE if activate else STILL
-                print("rotate xy 4D")
-            elif direction == VIOLET: # y, xy-plane
-                self._xyrot4 = NEGATIVE if activate else STILL
-                print("rotate xy 4D")
-                
-        # 3D camera is activated (3D scene is rendered)
-        else:
-            if direction == RIGHT:
-                self._xzrot = POSITIVE if activate else STILL
-                print("rotate xz 3D")
-            elif direction == LEFT:
-                self._xzrot = NEGATIVE if activate else STILL
-                print("rotate xz 3D")
-                
-            if direction == UP:
-                self._yzrot = POSITIVE if activate else STILL
-                print("rotate yz 3D")
-            elif direction == DOWN:
-                self._yzrot = NEGATIVE if activate else STILL
-                print("rotate yz 3D")
-                
-            if direction == IN:
-                self._xyrot = POSITIVE if activate else STILL
-                print("rotate xy 3D")
-            elif direction == OUT:
-                self._xyrot = NEGATIVE if activate else STILL
-                print("rotate xy 3D")
-    
-    def update_position_from_keys3D(self):
+    def update_position_from_keys3D(self, t):
         """
         change the position by moving in the 3 direction by using the keyboard
         movement can be along the axes of the camera coordinate system or on an orbit around the 
         world coordinate system origin ("pseudo orbit control" bc up-direction not considered)
-        """
-        # Use separate time in camera so we can move it when the demo is paused
-        now = time.time()
-        # If the camera has been inactive for a while, a large time delta
-        # can suddenly move the camera far away from the scene
-        t = max(now - self._last_time, 0)
-        self._last_time = now
-        velocity = 20
-        
-        if self.keyboard_3d:
-            # only when rotating around center of camera coordinate system
-            if self.cameraCenter:
-                self.position = Vector3(np.dot(self.orientation, self.position))
-            # X Movement
-            if self._xdir == POSITIVE:
-                self.position.x += velocity * t
-            elif self._xdir == NEGATIVE:
-                self.position.x -= velocity * t
-        
-            # Z Movement
-            if self._zdir == POSITIVE:
-                self.position.z += velocity * t
-            elif self._zdir == NEGATIVE:
-                self.position.z -= velocity * t
-        
-            # Y Movement
-            if self._ydir == POSITIVE:
-                self.position.y += velocity * t
-            elif self._ydir == NEGATIVE:
-                self.position.y -= velocity * t
-                
-            # only when rotating around center of camera coord. sys.
-            if self.cameraCenter:
-                self.position = Vector3(np.dot(np.linalg.inv(self.orientation), self.position))
-        
+        t: simulated time in seconds
+        """
+        if self.keyboard_3d and self.moving3D:
+            distance = KEY_VELOCITY * t
+            move = self._move3
+            move[0] = _key_distance(self._xdir, distance)
+            move[1] = _key_distance(self._ydir, distance)
+            move[2] = _key_distance(self._zdir, distance)
+            self.translate3D(move)
     
-    def update_orientation_from_keys3D(self):
+    def update_orientation_from_keys3D(self, t):
         """
         change the orientation by rotating in the 3 planes by using the keyboard
+        t: simulated time in seconds
         """
-        diff = 1.0
-        _xz = 0
-        _yz = 0
-        _xy = 0
-        # XZ Rotation
-        if self._xzrot == POSITIVE:
-            _xz = -diff
-        elif self._xzrot == NEGATIVE:
-            _xz = diff
-        
-        # XZ Rotation
-        if self._yzrot == POSITIVE:
-            _yz = diff
-        elif self._yzrot == NEGATIVE:
-            _yz = -diff
-            
-        # XY Rotation
-        if self._xyrot == POSITIVE:
-            _xy += -diff
-        elif self._xyrot == NEGATIVE:
-            _xy += diff
-            
-        if self.keyboard_3d:
+        diff = KEY_ROTATION_SPEED * t
+        _xz = -_key_distance(self._xzrot, diff)
+        _yz = _key_distance(self._yzrot, diff)
+        _xy = -_key_distance(self._xyrot, diff)
+        if self.keyboard_3d and (_xz or _yz or _xy):
             self.update_orientation3D(_xz, _yz, _xy)
     
-    def update_position_from_keys4D(self):
+    def update_position_from_keys4D(self, t):
         """
         change the position by moving in the 4 directions by using the keyboard
         movement can be along the axes of the camera coordinate system or on an orbit around the 
         world coordinate system origin ("pseudo orbit control" bc up-direction not considered)
-        """
-        # Use separate time in camera so we can move it when the demo is paused
-        now = time.time()
-        # If the camera has been inactive for a while, a large time delta
-        # can suddenly move the camera far away from the scene
-        t = max(now - self._last_time, 0)
-        self._last_time = now
-        
-        velocity = 20
-        
-        if not self.keyboard_3d:
-            # for rotating around axes of camera coordinate system
-            if self.cameraCenter:
-                self.position4 = Vector4(np.dot(self.orientation4, self.position4))
-            
-            # X Movement
-            if self._xdir == POSITIVE:
-                self.position4.x += velocity * t
-            elif self._xdir == NEGATIVE:
-                self.position4.x -= velocity * t
-        
-            # Z Movement
-            if self._zdir == POSITIVE:
-                self.position4.z += velocity * t
-            elif self._zdir == NEGATIVE:
-                self.position4.z -= velocity * t
-        
-            # Y Movement
-            if self._ydir == POSITIVE:
-                self.position4.y += velocity * t
-            elif self._ydir == NEGATIVE:
-                self.position4.y -= velocity * t
-            
-            # W Movement
-            if self._wdir == POSITIVE:
-                self.position4.w += velocity * t
-            elif self._wdir == NEGATIVE:
-                self.position4.w -= velocity * t
-            
-            # for rotating around axes of camera coordinate system
-            if self.cameraCenter:
-                self.position4 = Vector4(np.dot(np.linalg.inv(self.orientation4), self.position4))
-            
+        t: simulated time in seconds
+        """
+        if not self.keyboard_3d and self.moving4D:
+            distance = KEY_VELOCITY * t
+            move = self._move4
+            move[0] = _key_distance(self._xdir, distance)
+            move[1] = _key_distance(self._ydir, distance)
+            move[2] = _key_distance(self._zdir, distance)
+            move[3] = _key_distance(self._wdir, distance)
+            self.translate(move)
     
-    def update_orientation_from_keys4D(self):
+    def update_orientation_from_keys4D(self, t):
         """
         change the orientation by rotating in the 6 planes by using the keyboard
-        """
-        diff = 1.0
-        _xz, _yz, _xw, _yw, _zw, _xy = (0,0,0,0,0,0)
-        
-        # XW Rotation
-        if self._xwrot == POSITIVE:
-            _xw = -diff
-        elif self._xwrot == NEGATIVE:
-            _xw = diff
-        
-        # YW Rotation
-        if self._ywrot == POSITIVE:
-            _yw = -diff
-        elif self._ywrot == NEGATIVE:
-            _yw = diff
-            
-        # ZW Rotation
-        if self._zwrot == POSITIVE:
-            _zw = -diff
-        elif self._zwrot == NEGATIVE:
-            _zw = diff
-        
-        # XZ Rotation
-        if self._xzrot4 == POSITIVE:
-            _xz = -diff
-        elif self._xzrot4 == NEGATIVE:
-            _xz = diff
-            
-        # YZ Rotation
-        if self._yzrot4 == POSITIVE:
-            _yz = diff
-        elif self._yzrot4 == NEGATIVE:
-            _yz = -diff
-        
-        # XY Rotation
-        if self._xyrot4 == POSITIVE:
-            _xy = diff
-        elif self._xyrot4 == NEGATIVE:
-            _xy = -diff
-            
-        if not self.keyboard_3d:
+        t: simulated time in seconds
+        """
+        diff = KEY_ROTATION_SPEED * t
+        _xw = -_key_distance(self._xwrot, diff)
+        _yw = -_key_distance(self._ywrot, diff)
+        _zw = -_key_distance(self._zwrot, diff)
+        _xz = -_key_distance(self._xzrot4, diff)
+        _yz = _key_distance(self._yzrot4, diff)
+        _xy = _key_distance(self._xyrot4, diff)
+        if not self.keyboard_3d and (_xz or _yz or _xw or _yw or _zw or _xy):
             self.update_orientation4D(_xz, _yz, _xw, _yw, _zw, _xy)
 
     """
     camera specific functions that might depend on the navigation system
     """
     
+    def _mouse_delta(self, dx, dy):
+        """
+        mouse movement scaled by the sensitivity, None if the event is dropped:
+        greatly decrease the chance of camera popping. This can happen when the
+        mouse enters and leaves the window or when getting focus again.
+        """
+        now = self.clock()
+        delta = now - self._last_rot_time
+        self._last_rot_time = now
+        if delta > 0.1 and max(abs(dx), abs(dy)) > 2:
+            return None
+        return dx * self._mouse_sensitivity, dy * self._mouse_sensitivity
+    
     # the same for all cameras except orbit controls
     def rot_state(self, dx: int, dy: int, dz: int, mouseKey: int, cam_3d = False) -> None:
         """Update the rotation of the camera from mouse movement
@@ -948,19 +386,22 @@ class Camera:
             dz: Relative scrolling position change
             mouseKey: 1 = left mouse key, 2 = right mouse key, 3 = scrolling
         """
-        now = time.time()
-        delta = now - self._last_rot_time
-        self._last_rot_time = now
-
-        # Greatly decrease the chance of camera popping.
-        # This can happen when the mouse enters and leaves the window
-        # or when getting focus again.
-        if delta > 0.1 and max(abs(dx), abs(dy)) > 2:
+        scaled = self._mouse_delta(dx, dy)
+        if scaled is None:
             return
-
-        dx *= self._mouse_sensitivity
-        dy *= self._mouse_sensitivity
+        dx, dy = scaled
         
+        if self.coalesce_mouse:
+            pending = self._mouse_pending.get(mouseKey, (0, 0, 0))
+            self._mouse_pending[mouseKey] = (pending[0] + dx, pending[1] + dy, pending[2] + dz)
+        else:
+            self._rotate_from_mouse(dx, dy, dz, mouseKey)
+    
+    def _rotate_from_mouse(self, dx, dy, dz, mouseKey, simultaneous=False) -> None:
+        """rotation of the (scaled) mouse movement dx, dy, dz with the given mouse key"""
+        # mouseKey 0: moved without key pressed, no rotation
+        if mouseKey not in (1, 2, 3) or not (dx or dy or dz):
+            return
         d_xz, d_yz, d_xw, d_yw, d_zw = (0, 0, 0, 0, 0)
         if mouseKey == 1: # left mouse key is clicked -> rotate xz, yz
             d_xz = -dx
@@ -973,31 +414,74 @@ class Camera:
             
         # orientation updated by rotation matrices of delta angles
         if not self.keyboard_3d:
-            self.update_orientation4D(d_xz, d_yz, d_xw, d_yw, d_zw)
+            self.update_orientation4D(d_xz, d_yz, d_xw, d_yw, d_zw, simultaneous=simultaneous)
         else:
-            self.update_orientation3D(d_xz, d_yz)
-            
+            self.update_orientation3D(d_xz, d_yz, simultaneous=simultaneous)
+    
+    def apply_mouse_input(self) -> None:
+        """applies the mouse movement collected since the last call (coalesce_mouse),
+        one rotation per mouse key. the summed angles are rotated simultaneously,
+        the limit of the many small rotations of the single events"""
+        if self._mouse_pending:
+            pending = self._mouse_pending
+            self._mouse_pending = {}
+            for mouseKey, (dx, dy, dz) in pending.items():
+                self._rotate_from_mouse(dx, dy, dz, mouseKey, simultaneous=True)
+    
+    def step(self, t) -> None:
+        """one fixed timestep (t seconds) of the key navigation"""
+        # position and orientation of the 3D camera (if activated)
+        self.update_position_from_keys3D(t)
+        self.update_orientation_from_keys3D(t)
+        # position and orientation of the 4D camera
+        self.update_position_from_keys4D(t)
+        self.update_orientation_from_keys4D(t)
+    
+    def advance(self) -> None:
+        """
+        runs the key navigation in fixed timesteps up to the current time of self.clock,
+        so the speed does not depend on the frame rate. the time left over (less than
+        one step) is used to interpolate the rendered pose
+        """
+        now = self.clock()
+        if self._last_time is None:
+            self._last_time = now
+        self._accumulator += min(max(now - self._last_time, 0.0), MAX_FRAME_TIME)
+        self._last_time = now
+        while self._accumulator >= self.timestep:
+            version = self.version
+            self._expand_rotor()
+            self._previous_pose[POSE_NAVIGATION] = self.pose[POSE_NAVIGATION]
+            self.step(self.timestep)
+            self._accumulator -= self.timestep
+            # nothing to interpolate if the step did not move the camera
+            self._previous = self._previous_views if self.version != version else None
+            self._step_version = self.version
+    
+    @property
+    def interpolation(self):
+        """
+        fraction of the next step for interpolating between the state before and after
+        the last step. None if the last step did not move the camera or the camera was
+        changed since (mouse, reset), then the current state is rendered
+        """
+        if self._previous is None or self._step_version != self.version:
+            return None
+        return self._accumulator / self.timestep
     
     @property
     def matrix(self):
         """
         updates orientation and position of 3D camera (if activated) based on key input
         and returns orientation matrix and position vector that are put to shader.
-        input from the mouse is already in self.orientation at this point
+        input from the mouse is already in self.orientation at this point (or applied
+        here if coalesce_mouse)
         """
-        # update position of camera 
-        self.update_position_from_keys3D()
-            
-        # option of using keys to change orientation in addition to mouse
-        self.update_orientation_from_keys3D()    
-
-        if not self.cameraCenter:
-            # rotate around center of world coordinates
-            pos = -np.array(self.position, dtype = "f4") 
-        else:
-            # rotate around center of camera coordinates
-            pos = np.array(-np.dot(self.orientation, self.position), dtype="f4") 
-        return self.orientation, pos
+        self.apply_mouse_input()
+        
+        # key navigation in fixed timesteps
+        self.advance()
+        return self.pose3(self.interpolation)
 
         
     @property
@@ -1005,24 +489,19 @@ class Camera:
         """
         updates orientation and position of camera based on key input
         and returns orientation matrix and position vector that are put to shader.
-        input from the mouse is already in self.orientation4 at this point
+        input from the mouse is already in self.orientation4 at this point (or applied
+        here if coalesce_mouse)
         """
-        # update position of camera
-        self.update_position_from_keys4D()
+        self.apply_mouse_input()
         
-        # allowing rotating from keys
-        self.update_orientation_from_keys4D()
-        
-        if not self.cameraCenter:  
-            pos = -np.array(self.position4, dtype="f4")
-        else:
-            pos = np.array(-np.dot(self.orientation4, self.position4), dtype="f4")
-        return self.orientation4, pos
+        # key navigation (position and rotation) in fixed timesteps
+        self.advance()
+        return self.pose4(self.interpolation)
 
 
 ## Cameras ##
 
-class CameraCoordinateCamera(Camera):
+class CameraCoordinateCamera(Camera, CameraCoordinateCore):
     """
     4D Camera rotates around the coordinate system axes of the camera coordinate system
     3D Camera fixed
@@ -1032,16 +511,13 @@ class CameraCoordinateCamera(Camera):
     use x,y keys to rotate xy-plane
     move 4D cam in kamera coord. with ws (3d zoom), ad, shift-space, qe (4d zoom)
     """
+    __slots__ = ()
     
     def __init__(self, keys: BaseKeys, fov=90.0, aspect_ratio=1.0, near=1.0, far=100.0):
-        # For using keys to navigate:
-        self.keys = keys
         super().__init__(keys=keys, fov=fov, aspect_ratio=aspect_ratio, near=near, far=far)
-        self.cameraCoordinates = True
-        self.cameraCenter = True
     
     
-class WorldCoordinateCamera(Camera):
+class WorldCoordinateCamera(Camera, WorldCoordinateCore):
     """
     4D Camera rotates around axes of 4D world coordinate system
     3D camera fixed
@@ -1050,16 +526,13 @@ class WorldCoordinateCamera(Camera):
     use scrolling to rotate zw plane
     move 4D cam in kamera coord. with ws (3d zoom), ad, shift-space, qe (4d zoom)
     """
+    __slots__ = ()
+
     def __init__(self, keys: BaseKeys, fov=90.0, aspect_ratio=1.0, near=1.0, far=100.0):
-        # For using keys to navigate:
-        self.keys = keys
         super().__init__(keys=keys, fov=fov, aspect_ratio=aspect_ratio, near=near, far=far)
-        
-        self.cameraCoordinates = False
-        self.cameraCenter = False
 
 
-class CameraAxesWorldCenterCamera(Camera):
+class CameraAxesWorldCenterCamera(Camera, CameraAxesWorldCenterCore):
     """
     4D Camera rotates around axes of 4D camera coordinate system but center of world coordinates
     3D camera fixed
@@ -1068,33 +541,28 @@ class CameraAxesWorldCenterCamera(Camera):
     use scrolling to rotate zw plane
     move 4D cam in kamera coord. with ws, ad, shift-space, qe (4d zoom)
     """
+    __slots__ = ()
+
     def __init__(self, keys: BaseKeys, fov=90.0, aspect_ratio=1.0, near=1.0, far=100.0):
-        # For using keys to navigate:
         super().__init__(keys=keys, fov=fov, aspect_ratio=aspect_ratio, near=near, far=far)
-        self.cameraCoordinates = True
-        self.cameraCenter = False
     
-class Orbit4DCamera(Camera):
+class Orbit4DCamera(Camera, OrbitCore):
     """
     orbit controls for 4D cam using mouse only for rotation
     direction in which camera points (self.dir4) is calculated from 3 angles
     yaw [0,pi], pitch [0,pi], roll [0,2*pi]
     orientation from camera calculated from world up- and right-direction with look at function
     """
+    __slots__ = ()
+
     def __init__(self, keys: BaseKeys, fov=90.0, aspect_ratio=1.0, near=1.0, far=100.0):
-        # For using keys to navigate:
-        self.keys = keys
         super().__init__(keys=keys, fov=fov, aspect_ratio=aspect_ratio, near=near, far=far)
-        # rotate around center of world cooridinates
-        self.cameraCenter = False
-        # self.cameraCoordinates not relevant here bc no rotation around axes but looking direction from angles instead 
         
-    # different rot_state method because direction directly from angles and not from multiplication with rotation matrices
-    def rot_state(self, dx: int, dy: int, dz: int, mouseKey: int) -> None:
-        """Update the rotation of the camera.
-
-        This is done by passing in the relative
-        mouse movement change on x and y (delta x, delta y).
+    # different rotation from the mouse because direction directly from angles and not from multiplication with rotation matrices
+    def _rotate_from_mouse(self, dx, dy, dz, mouseKey, simultaneous=False) -> None:
+        """orbit angles of the (scaled) mouse movement dx, dy, dz with the given mouse key.
+        rot_state and apply_mouse_input are the ones of Camera, so coalesce_mouse also
+        sums the events of the orbit camera (the angles add up, simultaneous does not matter)
 
         Args:
             dx: Relative mouse position change on x
@@ -1102,75 +570,24 @@ class Orbit4DCamera(Camera):
             dz: Relative scrolling position change
             mouseKey: 1 = left mouse key, 2 = right mouse key, 3 = scrolling
         """
-        now = time.time()
-        delta = now - self._last_rot_time
-        self._last_rot_time = now
-
-        # Greatly decrease the chance of camera popping.
-        # This can happen when the mouse enters and leaves the window
-        # or when getting focus again.
-        if delta > 0.1 and max(abs(dx), abs(dy)) > 2:
-            return
-
-        dx *= self._mouse_sensitivity
-        dy *= self._mouse_sensitivity
-        
         # if 3D camera is used, the yaw (0,360) is not on scroll but on mouse
         if self.keyboard_3d:
-            self._yaw3D -= dx # (0,360) -> x,z plane
-            self._pitch3D += dy # (0,180) -> y-axis
+            self.set_orbit_angles(yaw3D=self._yaw3D - dx, # (0,360) -> x,z plane
+                                  pitch3D=self._pitch3D + dy) # (0,180) -> y-axis
+        # left mouse key -> 3D camera
+        elif mouseKey == 1:
+            self.set_orbit_angles(yaw3D=self._yaw3D - dx, pitch3D=self._pitch3D + dy,
+                                  yaw=self._yaw + dz*3) # scroll: (0,360) -> x,w plane
+        # right mouse key -> 4D camera
+        elif mouseKey == 2:
+            self.set_orbit_angles(roll=self._roll - dx, # (0,180) -> z-axis
+                                  pitch=self._pitch + dy, # (0,180) -> y-axis
+                                  yaw=self._yaw + dz*3)
         else:
-            # left mouse key -> 3D camera
-            if mouseKey == 1:
-                self._yaw3D -= dx # (0,360) -> x,z plane
-                self._pitch3D += dy # (0,180) -> y-axis
-            # right mouse key -> 4D camera
-            elif mouseKey == 2:
-                self._roll -= dx # (0,180) -> z-axis
-                self._pitch += dy # (0,180) -> y-axis
-            # scroll
-            self._yaw += dz*3 # (0,360) -> x,w plane
-        
-        if self._pitch > 179:
-            self._pitch = 179
-        if self._pitch < 1:
-            self._pitch = 1
-        if self._roll > 179: 
-            self._roll = 179
-        if self._roll < 1:
-            self._roll = 1
-        if self._yaw > 360:
-            self._yaw = 360
-        if self._yaw < 0:
-            self._yaw = 0
-            
-        if self._yaw3D > 360:
-            self._yaw3D = 360
-        if self._yaw3D < 0:
-            self._yaw3D = 0
-        if self._pitch3D > 179:
-            self._pitch3D = 179
-        if self._pitch3D < 1:
-            self._pitch3D = 1
-        
-        self._update_yaw_and_pitch_3d()
-        self._update_yaw_and_pitch_4d()
-        
-    @property
-    def matrix(self):
-        """np.ndarray: The current view matrix for the camera"""
-        
-        self.update_position_from_keys3D()
-        
-        # use look at function to calculate orientation for orbit control
-        self.orientation, pos = self._gl_look_at(self.position, self.position + self.dir, self.up)
-        return self.orientation, pos
+            self.set_orbit_angles(yaw=self._yaw + dz*3)
     
-    @property
-    def matrix4d(self):
-        """np.ndarray: The current view matrix for the camera"""
-        self.update_position_from_keys4D()
-        
-        self.orientation4, pos = self._gl_look_at4d(self.position4, self.position4 + self.dir4, self._up4, self._right4)
-        return self.orientation4, pos
-        
+    def step(self, t) -> None:
+        """one fixed timestep of the key navigation, orientation comes from the angles,
+        keys only move the camera"""
+        self.update_position_from_keys3D(t)
+        self.update_position_from_keys4D(t)
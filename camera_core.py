@@ -0,0 +1,826 @@
+"""
+navigation models of the 4D (and 3D) camera without any window or input code:
+pose buffer, orientation and position updates and a small command API. only numpy
+is needed, so cameras can be driven from batch jobs and worker processes without
+a display. camera.py puts keys, mouse, the fixed timestep and the projection on top.
+
+    camera = CameraCoordinateCore()
+    camera.rotate("xw", 15.0) # degrees, in a plane of the camera (or world) axes
+    camera.translate((0.0, 0.0, -1.0, 0.0))
+    orientation4, position4 = camera.pose4() # ready to pass to the shader
+    block = camera.uniform_block # uniforms.CameraBlock layout
+
+    orbit = OrbitCore()
+    orbit.set_orbit_angles(yaw=120.0, pitch=60.0)
+
+"""
+from math import acos, atan2, cos, degrees, radians, sin, tan
+
+import numpy as np
+
+from utils import compose_rotation, look_at4d_batch, PLANES
+from rotor import Rotor4
+from uniforms import CameraBlock
+
+# order in which update_orientation3D/4D compose the plane rotations
+PLANES3 = (PLANES["xz"], PLANES["yz"], PLANES["xy"])
+PLANES4 = (PLANES["xz"], PLANES["yz"], PLANES["xy"], PLANES["xw"], PLANES["yw"], PLANES["zw"])
+# number of orientation updates after which the orientation is re-orthonormalized
+ORTHONORMALIZE_INTERVAL = 64
+
+# rotate/rotate3D: plane name -> argument of update_orientation4D/3D
+ROTATION_PLANES4 = ("xz", "yz", "xw", "yw", "zw", "xy")
+ROTATION_PLANES3 = ("xz", "yz", "xy")
+
+# layout of CameraCore.pose (float32): the uniform block exactly as the shader reads it
+# (uniforms.CameraBlock, written by pose3/pose4), followed by the navigation state
+POSE_POSITION4 = slice(52, 56)
+POSE_AXES4 = slice(56, 72) # rows in4, up4, right4, dir4
+POSE_ORIENTATION4 = slice(72, 88)
+POSE_POSITION3 = slice(88, 91)
+POSE_AXES3 = slice(91, 100) # rows right, up, dir
+POSE_ORIENTATION3 = slice(100, 109)
+POSE_NAVIGATION = slice(52, 109)
+POSE_SIZE = 112
+
+# CameraCore.snapshot: navigation part of the pose, orbit angles (yaw3D, pitch3D, yaw,
+# pitch, roll), fov4 and flags, 273 bytes
+SNAPSHOT_DTYPE = np.dtype([("pose", "<f4", POSE_NAVIGATION.stop - POSE_NAVIGATION.start),
+                           ("angles", "<f8", 5), ("fov4", "<f4"), ("flags", "u1")])
+# position relative to the center of the camera coordinate system (cameraCenter)
+SNAPSHOT_CENTER = 1
+# orientation given by the orbit angles (OrbitCore)
+SNAPSHOT_ORBIT = 2
+
+
+def pose_views(pose) -> dict:
+    """named views into a pose buffer (see POSE_SIZE)"""
+    axes4 = pose[POSE_AXES4].reshape(4, 4)
+    axes3 = pose[POSE_AXES3].reshape(3, 3)
+    return {
+        "position4": pose[POSE_POSITION4],
+        "axes4": axes4, "in4": axes4[0], "up4": axes4[1], "right4": axes4[2], "dir4": axes4[3],
+        "orientation4": pose[POSE_ORIENTATION4].reshape(4, 4),
+        "position": pose[POSE_POSITION3],
+        "axes3": axes3, "right": axes3[0], "up": axes3[1], "dir": axes3[2],
+        "orientation": pose[POSE_ORIENTATION3].reshape(3, 3),
+        # the block stores matrices column by column (mat3 columns padded to vec4),
+        # a row major matrix assigned to these transposed views is stored as GLSL reads it
+        "shader_orientation4": pose[CameraBlock.ORIENTATION4].reshape(4, 4).T,
+        "shader_position4": pose[CameraBlock.POSITION4],
+        "shader_orientation3": pose[CameraBlock.ORIENTATION3].reshape(3, 4)[:, :3].T,
+        "shader_position3": pose[CameraBlock.POSITION3],
+    }
+
+
+def read_snapshot(snapshot) -> np.void:
+    """SNAPSHOT_DTYPE record of a CameraCore.snapshot"""
+    if len(snapshot) != SNAPSHOT_DTYPE.itemsize:
+        raise ValueError("camera snapshot has {} bytes, expected {}".format(len(snapshot), SNAPSHOT_DTYPE.itemsize))
+    return np.frombuffer(snapshot, dtype=SNAPSHOT_DTYPE)[0]
+
+
+def _lerp(a, b, alpha, out) -> np.ndarray:
+    """a + alpha * (b - a), computed in out"""
+    np.subtract(b, a, out=out)
+    out *= alpha
+    out += a
+    return out
+
+
+def _normalise(vec) -> np.ndarray:
+    """vec scaled to unit length (as pyrr.vector.normalise)"""
+    vec = np.asarray(vec)
+    return vec / np.sqrt(np.sum(vec ** 2))
+
+
+def _plane_index(plane, planes) -> int:
+    try:
+        return planes.index(plane)
+    except ValueError:
+        raise ValueError("unknown rotation plane {!r}, expected one of {}".format(plane, ", ".join(planes))) from None
+
+
+class _PoseField:
+    """camera attribute stored in CameraCore.pose: reading gives the view into the
+    buffer, assigning copies the value into it (in place)"""
+    __slots__ = ("name",)
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, camera, owner=None):
+        if camera is None:
+            return self
+        return camera._views[self.name]
+
+    def __set__(self, camera, value):
+        camera._views[self.name][...] = value
+
+
+class _Axes4Field(_PoseField):
+    """axis of the 4D camera (in4, up4, right4, dir4), expanded from the rotor of the
+    axes before it is read or written (see CameraCore.use_rotor)"""
+    __slots__ = ()
+
+    def __get__(self, camera, owner=None):
+        if camera is not None and camera._axes4_stale:
+            camera._expand_rotor()
+        return super().__get__(camera, owner)
+
+    def __set__(self, camera, value):
+        if camera._axes4_stale:
+            camera._expand_rotor()
+        super().__set__(camera, value)
+        camera._axes4_rotor = None
+
+
+class CameraCore:
+    """
+    pose of the 4D camera and the 3D camera and how it changes, without input or window.
+
+    the whole pose lives in one float32 buffer (self.pose, layout see POSE_SIZE):
+    position, orientation and axes of both cameras are views into it and are
+    updated in place, pose3/pose4 write the uniform block at its start, which
+    is uploaded as it is (self.uniform_block, uniforms.CameraBlock.write)
+
+    commands: rotate/rotate3D (plane, degrees), translate/translate3D, reset,
+    snapshot/restore. the navigation models below only differ in the axes
+    (cameraCoordinates) and the center (cameraCenter) of the rotations
+    """
+    __slots__ = (
+        "pose", "_views", "_block", "_block_projection", "_projection",
+        "_previous_pose", "_previous_views", "_previous", "_lerp_views", "_work3", "_work4",
+        "cameraCoordinates", "cameraCenter",
+        "_use_rotor", "rotor4", "_orientation4", "_orientation4_stale", "_axes4_rotor", "_axes4_stale",
+        "_yaw3D", "_pitch3D", "_yaw", "_pitch", "_roll", "_up", "_up4", "_right4", "_fov4",
+        "_rot3", "_rot4", "_basis3", "_basis4", "_orientation_updates", "version",
+    )
+
+    # orientation from the orbit angles instead of rotations (see OrbitCore)
+    orbit_controls = False
+
+    # views into self.pose
+    position = _PoseField()
+    up = _PoseField()
+    right = _PoseField()
+    dir = _PoseField()
+    orientation = _PoseField()
+    position4 = _PoseField()
+    in4 = _Axes4Field()
+    up4 = _Axes4Field()
+    right4 = _Axes4Field()
+    dir4 = _Axes4Field()
+
+    def __init__(self):
+        self.pose = np.zeros(POSE_SIZE, dtype="f4")
+        self._views = pose_views(self.pose)
+        self._block = self.pose[:CameraBlock.SIZE]
+        # object with the 3D->2D projection matrix (.matrix, e.g. Projection3D) and
+        # the matrix last written to the block
+        self._projection = None
+        self._block_projection = None
+        # state before the last step and the interpolated pose (see pose3/pose4)
+        self._previous_pose = np.zeros(POSE_SIZE, dtype="f4")
+        self._previous_views = pose_views(self._previous_pose)
+        self._previous = None
+        self._lerp_views = pose_views(np.zeros(POSE_SIZE, dtype="f4"))
+        self._work3 = np.empty(3, dtype="f4")
+        self._work4 = np.empty(4, dtype="f4")
+
+        # position and orientation of 3D camera
+        self.position = (0.0, 0.0, 2.0)
+        self.up = (0.0, 1.0, 0.0)
+        self.right = (1.0, 0.0, 0.0)
+        self.dir = (0.0, 0.0, 1.0)
+        self.orientation = np.array([self.right, self.up, self.dir], dtype="f4")
+
+        # if true rotation around camera coordinate system axes, else world coordinate sys axes)
+        self.cameraCoordinates = True
+        # if true rotate around center of camera coordinate system, else of world coordinate system
+        self.cameraCenter = True
+
+        # 4D orientation as matrix, or as rotor (pair of unit quaternions) if use_rotor
+        # is set, then the matrix is only expanded when it is read
+        self._use_rotor = False
+        self.rotor4 = Rotor4()
+        self._orientation4 = self._views["orientation4"]
+        self._orientation4_stale = False
+        # the axes too: rotor whose matrix is axes4 transposed, None if it is not known
+        # (the axes were assigned), expanded like the orientation
+        self._axes4_rotor = None
+        self._axes4_stale = False
+
+        # position and orientation of 4D camera
+        self.position4 = (0.0, 0.0, 0.0, -3.0)
+        self.dir4 = (0.0, 0.0, 0.0, 1.0) # w
+        self.up4 = (0.0, 1.0, 0.0, 0.0) # y
+        self.right4 = (0.0, 0.0, 1.0, 0.0) # z
+        self.in4 = (1.0, 0.0, 0.0, 0.0) # x
+        self.orientation4 = np.array([self.in4, self.up4, self.right4, self.dir4], dtype="f4")
+
+        # Yaw and Pitch (rotation in 3d with mouse)
+        self._yaw3D = 90.0
+        self._pitch3D = 90.0
+
+        # yaw and pitch in 4D, for orbit controls in 4D
+        self._yaw = 90.0
+        self._pitch = 90.0
+        # + roll for 4D mouse control (scrolling)
+        self._roll = 90.0
+
+        # World up vector of 3D world
+        self._up = np.array([0.0, 1.0, 0.0])
+        # 4D world up and right vector
+        self._up4 = np.array([0.0, 1.0, 0.0, 0.0]) # y
+        self._right4 = np.array([0.0, 0.0, 1.0, 0.0]) # z
+
+        # field of view of the 4D->3D perspective devide
+        self.fov4 = 90.0
+
+        # preallocated work matrices of the orientation updates
+        self._rot3 = np.empty((4, 4), dtype="f4")
+        self._rot4 = np.empty((4, 4), dtype="f4")
+        self._basis3 = np.empty((3, 3), dtype="f4")
+        self._basis4 = np.empty((4, 4), dtype="f4")
+        self._orientation_updates = 0
+
+        # incremented on every change of position/orientation/projection,
+        # renderers compare it to skip uniform uploads and redraws
+        self.version = 0
+
+    @property
+    def use_rotor(self) -> bool:
+        """store the 4D orientation as rotor instead of matrix (no drift, cheaper updates)"""
+        return self._use_rotor
+
+    @use_rotor.setter
+    def use_rotor(self, value: bool) -> None:
+        if value and not self._use_rotor:
+            self.rotor4 = Rotor4.from_matrix(self.orientation4)
+        elif not value and self._use_rotor:
+            self._expand_rotor()
+            self._axes4_rotor = None
+        self._use_rotor = value
+
+    @property
+    def orientation4(self) -> np.ndarray:
+        """4x4 orientation of the 4D camera (view into self.pose), expanded from the rotor if use_rotor"""
+        if self._orientation4_stale:
+            self._orientation4[...] = self.rotor4.matrix()
+            self._orientation4_stale = False
+        return self._orientation4
+
+    @orientation4.setter
+    def orientation4(self, value) -> None:
+        self._orientation4[...] = value
+        self._orientation4_stale = False
+        if self._use_rotor:
+            self.rotor4 = Rotor4.from_matrix(value)
+
+    def _expand_rotor(self) -> None:
+        """writes the orientation and axes of the 4D camera kept as rotors into the pose"""
+        self.orientation4
+        if self._axes4_stale:
+            self._views["axes4"][...] = self._axes4_rotor.matrix().T
+            self._axes4_stale = False
+
+    @property
+    def fov4(self) -> float:
+        """field of view (degrees) of the 4D->3D perspective devide"""
+        return self._fov4
+
+    @fov4.setter
+    def fov4(self, value) -> None:
+        self._fov4 = value
+        self.pose[CameraBlock.FOV4] = 1.0 / tan(radians(value) / 2.0)
+
+    @property
+    def projection(self):
+        """3D->2D projection of the 3D camera, any object with a `matrix` (e.g.
+        Projection3D), None leaves the projection part of the uniform block as it is"""
+        return self._projection
+
+    @projection.setter
+    def projection(self, value) -> None:
+        self._projection = value
+        self._block_projection = None
+
+    @property
+    def uniform_block(self) -> np.ndarray:
+        """the uniform block part of self.pose (uniforms.CameraBlock layout) with the
+        pose of the last pose3/pose4"""
+        return self._block
+
+    @property
+    def orbit_angles(self) -> tuple:
+        """(yaw3D, pitch3D, yaw, pitch, roll) in degrees"""
+        return (self._yaw3D, self._pitch3D, self._yaw, self._pitch, self._roll)
+
+    def changed(self) -> None:
+        """marks the camera as changed (bumps self.version)"""
+        self.version += 1
+
+    # commands
+
+    def rotate(self, plane, angle) -> None:
+        """
+        rotates the 4D camera by angle (degrees) in a plane "xy", "xz", "yz", "xw",
+        "yw" or "zw" of the camera axes (cameraCoordinates) or of the world axes
+        """
+        angles = [0.0] * 6
+        angles[_plane_index(plane, ROTATION_PLANES4)] = angle
+        self.update_orientation4D(*angles)
+
+    def rotate3D(self, plane, angle) -> None:
+        """as rotate for the 3D camera, planes "xz", "yz" and "xy" """
+        angles = [0.0] * 3
+        angles[_plane_index(plane, ROTATION_PLANES3)] = angle
+        self.update_orientation3D(*angles)
+
+    def translate(self, delta) -> None:
+        """
+        moves the 4D camera by delta (x, y, z, w): along the camera axes when rotating
+        around the camera center, else in world coordinates ("pseudo orbit control")
+        """
+        delta = np.asarray(delta, dtype="f4")
+        if self.cameraCenter:
+            position4 = np.dot(self.orientation4, self.position4, out=self._work4)
+            position4 += delta
+            np.dot(self.orientation4.T, position4, out=self.position4)
+        else:
+            self._views["position4"] += delta
+        self.changed()
+
+    def translate3D(self, delta) -> None:
+        """as translate for the 3D camera, delta (x, y, z)"""
+        delta = np.asarray(delta, dtype="f4")
+        if self.cameraCenter:
+            position = np.dot(self.orientation, self.position, out=self._work3)
+            position += delta
+            np.dot(self.orientation.T, position, out=self.position)
+        else:
+            self._views["position"] += delta
+        self.changed()
+
+    def reset(self) -> None:
+        """reset angles, orientation & position"""
+        self._yaw3D = 90.0
+        self._pitch3D = 90.0
+        self._yaw = 90.0
+        self._pitch = 90.0
+        self._roll = 90.0
+        self.in4 = np.array([1,0,0,0])
+        self.up4 = np.array([0,1,0,0])
+        self.right4 = np.array([0,0,1,0])
+        self.dir4 = np.array([0,0,0,1])
+        self.position4 = (0.0, 0.0, 0.0, -3.0)
+        self.orientation4 = np.array([self.in4, self.up4, self.right4, self.dir4], dtype="f4")
+
+        self.dir = np.array([0,0,1])
+        self.right = np.array([1,0,0])
+        self.up = np.array([0,1,0])
+        self.position = (0.0, 0.0, 2.0)
+        self.orientation = np.array([self.right, self.up, self.dir], dtype="f4")
+        self.changed()
+
+    def video_pose(self) -> None:
+        """reproduce the same position to make video for documentation"""
+        cc = self.cameraCoordinates
+        self.cameraCoordinates = True
+        self.update_orientation4D(-20, 0, 0, 0, 0)
+        self.update_orientation4D(0, 25, 0, 0, 0)
+        self.cameraCoordinates = cc
+
+    def snapshot(self) -> bytes:
+        """position, orientation and axes of the 3D and 4D camera, orbit angles and fov4
+        as compact binary record (SNAPSHOT_DTYPE), see restore"""
+        record = np.zeros((), dtype=SNAPSHOT_DTYPE)
+        self._expand_rotor()
+        record["pose"] = self.pose[POSE_NAVIGATION]
+        record["angles"] = self.orbit_angles
+        record["fov4"] = self.fov4
+        record["flags"] = (SNAPSHOT_CENTER if self.cameraCenter else 0) | (SNAPSHOT_ORBIT if self.orbit_controls else 0)
+        return record.tobytes()
+
+    def restore(self, snapshot) -> None:
+        """
+        sets the state of a snapshot, which can also come from a camera of another
+        navigation system: the position is converted between rotating around the
+        camera and the world center, so the rendered view stays the same
+        """
+        record = read_snapshot(snapshot)
+        self._axes4_rotor = None
+        self._axes4_stale = False
+        self.pose[POSE_NAVIGATION] = record["pose"]
+        self._yaw3D, self._pitch3D, self._yaw, self._pitch, self._roll = (float(a) for a in record["angles"])
+        self.fov4 = float(record["fov4"])
+        # converts to the rotor if use_rotor
+        self.orientation4 = self._orientation4
+        center = bool(record["flags"] & SNAPSHOT_CENTER)
+        # the shader position is O p around the camera center and p around the world center
+        if center and not self.cameraCenter:
+            self.position4 = np.dot(self.orientation4, self.position4, out=self._work4)
+            self.position = np.dot(self.orientation, self.position, out=self._work3)
+        elif not center and self.cameraCenter:
+            # solved instead of multiplied with the transpose, so orientations that
+            # are not exactly orthonormal (e.g. interpolated) are converted exactly too
+            self.position4 = np.linalg.solve(self.orientation4, self.position4)
+            self.position = np.linalg.solve(self.orientation, self.position)
+        # nothing to interpolate from
+        self._previous = None
+        self.changed()
+
+    def take_pose(self, camera) -> None:
+        """continue from the pose of another camera (e.g. when switching cameras)"""
+        self.restore(camera.snapshot())
+
+    # orientation updates
+
+    def _update_yaw_and_pitch_3d(self) -> None:
+        """
+        Updates the 3D camera direction based on the current yaw and pitch.
+        direction corresponds to z-axis of camera coordinate system,
+        = axis along which is projected.
+        used only for orbit camera
+        Orientation matrix of camera is updated based on dir and global up vector self._up in pose3
+        """
+        front = np.array([0.0, 0.0, 0.0])
+        front[0] = sin(radians(self._pitch3D)) * cos(radians(self._yaw3D))
+        front[1] = cos(radians(self._pitch3D))
+        front[2] = sin(radians(self._pitch3D)) * sin(radians(self._yaw3D))
+        self.dir = _normalise(front)
+
+    def update_orientation3D(self, d_xz, d_yz, d_xy = 0, simultaneous = False):
+        """
+        rotates camera orientation (dir, right, up vectors) around each axis by the
+        given delta angles
+        simultaneous: rotate in all planes at once instead of one after the other
+        (for summed up mouse movement)
+        """
+        angles = (radians(d_xz), radians(d_yz), radians(d_xy))
+        if simultaneous:
+            rot_matrix = Rotor4.from_bivector(angles, PLANES3).matrix()[:3,:3]
+        else:
+            rot_matrix = compose_rotation(angles, PLANES3, self._rot3)[:3,:3]
+
+        # rotate around camera coordinates system axes
+        if self.cameraCoordinates:
+            # the orientation is orthonormal, its inverse is the transpose.
+            # new axes are the columns of O^T R, i.e. the rows of R^T O
+            np.matmul(rot_matrix.T, self.orientation, out=self._basis3)
+        # rotate around world coordinates system axes
+        else:
+            # rows right, up, dir rotated by R: rows of O R^T
+            np.matmul(self.orientation, rot_matrix.T, out=self._basis3)
+        self._orthonormalize(self._basis3)
+        self.orientation = self._basis3
+        self._views["axes3"][...] = self._basis3
+        self.changed()
+
+
+    def update_orientation4D(self, d_xz, d_yz, d_xw, d_yw, d_zw, d_xy = 0, simultaneous = False):
+        """
+        receives delta of angle in each rotation plane and updates
+        the orientation and coordinate system axes of camera accordingly
+        simultaneous: rotate in all planes at once instead of one after the other
+        (for summed up mouse movement)
+        """
+        angles = (radians(d_xz), radians(d_yz), radians(d_xy), radians(d_xw), radians(d_yw), radians(d_zw))
+        if self._use_rotor:
+            self._update_rotor4D(angles, simultaneous)
+            return
+        if simultaneous:
+            rot_matrix = Rotor4.from_bivector(angles, PLANES4).matrix()
+        else:
+            rot_matrix = compose_rotation(angles, PLANES4, self._rot4)
+
+        axes = self._views["axes4"]
+        # rotate around axes of camera coordinate system
+        if self.cameraCoordinates:
+            # the orientation is orthonormal, its inverse is the transpose.
+            # the axes R e_i mapped back by O^T are the columns of O^T R, all four
+            # in one product (rows of R^T O)
+            np.matmul(rot_matrix.T, self.orientation4, out=axes)
+            np.matmul(rot_matrix, self.orientation4, out=self._basis4)
+        # rotate around axes of world coordinate system
+        else:
+            # in, up, right, dir rotated by R: rows of B R^T
+            np.matmul(axes, rot_matrix.T, out=self._basis4)
+            axes[...] = self._basis4
+            np.matmul(self.orientation4, rot_matrix, out=self._basis4)
+        self._orthonormalize(self._basis4)
+        self.orientation4 = self._basis4
+        self.changed()
+
+    def _update_rotor4D(self, angles, simultaneous=False) -> None:
+        """update_orientation4D for the rotor backend, orientation and axes are only
+        composed as rotors, their matrices are expanded when they are read"""
+        if simultaneous:
+            rot = Rotor4.from_bivector(angles, PLANES4)
+        else:
+            rot = Rotor4.from_angles(angles, PLANES4)
+        if self.cameraCoordinates:
+            # axes are the columns of O^T R
+            self._axes4_rotor = self.rotor4.inverse() @ rot
+            self.rotor4 = rot @ self.rotor4
+        else:
+            # in, up, right, dir rotated by R: rows of B R^T, columns of R B^T
+            if self._axes4_rotor is None:
+                self._axes4_rotor = Rotor4.from_matrix(self._views["axes4"].T)
+            self._axes4_rotor = rot @ self._axes4_rotor
+            self.rotor4 = self.rotor4 @ rot
+        self._axes4_rotor.normalize()
+        self.rotor4.normalize()
+        self._orientation4_stale = True
+        self._axes4_stale = True
+        self.changed()
+
+    def _orthonormalize(self, orientation) -> None:
+        """
+        every ORTHONORMALIZE_INTERVAL updates one newton step towards the closest
+        orthonormal matrix (O = 1.5 O - 0.5 O O^T O, in place) removes the drift of
+        float32 products, so the transpose stays the inverse
+        """
+        self._orientation_updates += 1
+        if self._orientation_updates % ORTHONORMALIZE_INTERVAL == 0:
+            orientation[...] = 1.5 * orientation - 0.5 * (orientation @ orientation.T @ orientation)
+
+    def _update_yaw_and_pitch_4d(self) -> None:
+        """
+        Updates the camera direction based on the current yaw [0,2pi], pitch[0,pi] and roll[0,pi]
+        -> orbit controls
+        in 4D w-axis = axis of projection
+        camera orientation can then be calculated with the look at method
+        """
+        front = np.array([0.0, 0.0, 0.0, 0.0])
+        front[0] = sin(radians(self._pitch)) * sin(radians(self._roll)) * cos(radians(self._yaw))
+        front[1] = sin(radians(self._roll)) * cos(radians(self._pitch)) # up
+        front[2] = cos(radians(self._roll)) # right
+        front[3] = sin(radians(self._pitch)) * sin(radians(self._roll)) * sin(radians(self._yaw))
+        self.dir4 = _normalise(front)
+
+    def _gl_look_at(self, pos, target, up) -> (np.ndarray, np.ndarray):
+        """The standard lookAt method.
+        returns orientation and position ready to pass to shader
+
+        Args:
+            pos: current position
+            target: target position to look at
+            up: direction up
+        Returns:
+            np.ndarray: orientation (3x3)
+            np.ndarray: position (3)
+        """
+        z = _normalise(target - pos) # dir
+        x = _normalise(np.cross(_normalise(up), z)) # orthogonal to dir and up
+        y = _normalise(np.cross(z, x)) # camera up
+
+        orientation = np.zeros((3,3), dtype="f4")
+        orientation[0] = x  # -- X
+        orientation[1] = y  # -- Y
+        orientation[2] = z  # -- Z
+
+        position = -np.array(pos, dtype="f4")
+
+        return orientation, position
+
+    def _gl_look_at4d(self, pos, target, up, right) -> np.ndarray:
+        """The standard lookAt method extended for 4D.
+        returns camera orientation and position ready to pass to shader
+
+        Args:
+            pos: current position
+            target: target position to look at (pos + dir)
+            up: direction up (world y axis)
+            right: fixed direction that points to the "right" (world z axis)
+        Returns:
+            np.ndarray: orientation (4x4)
+            np.ndarray: position (4)
+        """
+
+        orientation = look_at4d_batch(pos, target, up, right).astype("f4")
+
+        position = -np.array(pos, dtype="f4")
+        return orientation, position
+
+    # pose to render
+
+    def _render_pose3(self, alpha=None):
+        """orientation and position of the 3D camera to render, interpolated by alpha
+        between the previous state and the current one"""
+        if alpha is None or self._previous is None:
+            return self.orientation, self.position
+        previous, lerp = self._previous, self._lerp_views
+        return (_lerp(previous["orientation"], self.orientation, alpha, lerp["orientation"]),
+                _lerp(previous["position"], self.position, alpha, lerp["position"]))
+
+    def _render_pose4(self, alpha=None):
+        """orientation and position of the 4D camera to render, the rotation of one
+        step is small, so interpolating the matrices linearly keeps them orthonormal
+        up to ~1e-5"""
+        if alpha is None or self._previous is None:
+            return self.orientation4, self.position4
+        previous, lerp = self._previous, self._lerp_views
+        return (_lerp(previous["orientation4"], self.orientation4, alpha, lerp["orientation4"]),
+                _lerp(previous["position4"], self.position4, alpha, lerp["position4"]))
+
+    def _write_projection(self) -> None:
+        """copies the projection matrix into the uniform block when it was replaced (resize)"""
+        if self._projection is None:
+            return
+        matrix = self._projection.matrix
+        if matrix is not self._block_projection:
+            self._block_projection = matrix
+            # memory order: glm matrices are column-major like the block
+            self.pose[CameraBlock.PROJ] = np.asarray(matrix, dtype="f4").ravel(order="K")
+
+    def _write_pose3(self, orientation, position):
+        """
+        writes orientation and position (world to camera) of the 3D camera to render
+        into the uniform block, returns them ready to pass to the shader
+        (views into self.pose, valid until the next pose3)
+        """
+        views = self._views
+        pos = views["shader_position3"]
+        if not self.cameraCenter:
+            # rotate around center of world coordinates
+            np.negative(position, out=pos)
+        else:
+            # rotate around center of camera coordinates
+            np.dot(orientation, position, out=pos)
+            np.negative(pos, out=pos)
+        views["shader_orientation3"][...] = orientation
+        self._write_projection()
+        return orientation, pos
+
+    def _write_pose4(self, orientation4, position4):
+        """as _write_pose3 for the 4D camera"""
+        views = self._views
+        pos = views["shader_position4"]
+        if not self.cameraCenter:
+            np.negative(position4, out=pos)
+        else:
+            np.dot(orientation4, position4, out=pos)
+            np.negative(pos, out=pos)
+        views["shader_orientation4"][...] = orientation4
+        self._write_projection()
+        return orientation4, pos
+
+    def pose3(self, alpha=None):
+        """
+        orientation matrix and position vector of the 3D camera that are put to shader,
+        also written to the uniform block. alpha: fraction between the previous state
+        and the current one to render (None: current state)
+        """
+        return self._write_pose3(*self._render_pose3(alpha))
+
+    def pose4(self, alpha=None):
+        """as pose3 for the 4D camera"""
+        return self._write_pose4(*self._render_pose4(alpha))
+
+
+## Navigation models ##
+
+class CameraCoordinateCore(CameraCore):
+    """rotation around the axes and the center of the camera coordinate system"""
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__()
+        self.cameraCoordinates = True
+        self.cameraCenter = True
+
+
+class WorldCoordinateCore(CameraCore):
+    """rotation around the axes and the center of the world coordinate system"""
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__()
+        self.cameraCoordinates = False
+        self.cameraCenter = False
+
+
+class CameraAxesWorldCenterCore(CameraCore):
+    """rotation around the axes of the camera coordinate system but the center of world coordinates"""
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__()
+        self.cameraCoordinates = True
+        self.cameraCenter = False
+
+
+class OrbitCore(CameraCore):
+    """
+    orbit controls: direction in which camera points (self.dir4) is calculated from 3 angles
+    yaw [0,2*pi], pitch [0,pi], roll [0,pi] (self.dir from yaw3D and pitch3D),
+    orientation calculated from world up- and right-direction with look at function
+    """
+    __slots__ = ()
+    orbit_controls = True
+
+    def __init__(self):
+        super().__init__()
+        # rotate around center of world cooridinates
+        self.cameraCenter = False
+        # self.cameraCoordinates not relevant here bc no rotation around axes but looking direction from angles instead
+
+    def set_orbit_angles(self, yaw=None, pitch=None, roll=None, yaw3D=None, pitch3D=None) -> None:
+        """sets the given angles (degrees, clamped to their range) and the looking directions.
+        the camera only counts as changed if one of the clamped angles differs"""
+        before = (self._yaw, self._pitch, self._roll, self._yaw3D, self._pitch3D)
+        if yaw is not None:
+            self._yaw = yaw
+        if pitch is not None:
+            self._pitch = pitch
+        if roll is not None:
+            self._roll = roll
+        if yaw3D is not None:
+            self._yaw3D = yaw3D
+        if pitch3D is not None:
+            self._pitch3D = pitch3D
+
+        if self._pitch > 179:
+            self._pitch = 179
+        if self._pitch < 1:
+            self._pitch = 1
+        if self._roll > 179:
+            self._roll = 179
+        if self._roll < 1:
+            self._roll = 1
+        if self._yaw > 360:
+            self._yaw = 360
+        if self._yaw < 0:
+            self._yaw = 0
+
+        if self._yaw3D > 360:
+            self._yaw3D = 360
+        if self._yaw3D < 0:
+            self._yaw3D = 0
+        if self._pitch3D > 179:
+            self._pitch3D = 179
+        if self._pitch3D < 1:
+            self._pitch3D = 1
+
+        # e.g. mouse moved without a key pressed, or an angle at its limit
+        if (self._yaw, self._pitch, self._roll, self._yaw3D, self._pitch3D) == before:
+            return
+        self._update_yaw_and_pitch_3d()
+        self._update_yaw_and_pitch_4d()
+        self.changed()
+
+    def rotate(self, plane, angle) -> None:
+        raise TypeError("the orbit camera is oriented by set_orbit_angles, not by plane rotations")
+
+    def rotate3D(self, plane, angle) -> None:
+        raise TypeError("the orbit camera is oriented by set_orbit_angles, not by plane rotations")
+
+    def restore(self, snapshot) -> None:
+        """
+        as CameraCore.restore. the angles of a snapshot of another camera are computed
+        from its looking directions, the rotation around them is not kept (the orbit
+        camera is always oriented by the world up and right direction)
+        """
+        super().restore(snapshot)
+        if not read_snapshot(snapshot)["flags"] & SNAPSHOT_ORBIT:
+            self._angles_from_orientation()
+
+    def _angles_from_orientation(self) -> None:
+        """yaw, pitch and roll (3D and 4D) for the w-row of orientation4 and the z-row of orientation"""
+        f = self.orientation4[3] / np.linalg.norm(self.orientation4[3])
+        self._roll = min(max(degrees(acos(min(max(float(f[2]), -1.0), 1.0))), 1), 179)
+        sin_roll = sin(radians(self._roll))
+        self._pitch = min(max(degrees(acos(min(max(float(f[1]) / sin_roll, -1.0), 1.0))), 1), 179)
+        self._yaw = degrees(atan2(float(f[3]), float(f[0]))) % 360
+
+        z = self.orientation[2] / np.linalg.norm(self.orientation[2])
+        self._pitch3D = min(max(degrees(acos(min(max(float(z[1]), -1.0), 1.0))), 1), 179)
+        self._yaw3D = degrees(atan2(float(z[2]), float(z[0]))) % 360
+        # look at with the world up direction
+        self.up = self._up
+        self._update_yaw_and_pitch_3d()
+        self._update_yaw_and_pitch_4d()
+
+    def snapshot(self) -> bytes:
+        """as CameraCore.snapshot, the orientations are the look at of the current
+        directions first (otherwise only updated when the pose is rendered)"""
+        self.orientation, _ = self._gl_look_at(self.position, self.position + self.dir, self.up)
+        self.orientation4, _ = self._gl_look_at4d(self.position4, self.position4 + self.dir4, self._up4, self._right4)
+        return super().snapshot()
+
+    def pose3(self, alpha=None):
+        """orientation from the look at of the current direction"""
+        _, position = self._render_pose3(alpha)
+
+        # use look at function to calculate orientation for orbit control
+        self.orientation, _ = self._gl_look_at(position, position + self.dir, self.up)
+        return self._write_pose3(self.orientation, position)
+
+    def pose4(self, alpha=None):
+        """orientation from the look at of the current direction"""
+        _, position4 = self._render_pose4(alpha)
+
+        self.orientation4, _ = self._gl_look_at4d(position4, position4 + self.dir4, self._up4, self._right4)
+        return self._write_pose4(self.orientation4, position4)
@@ -0,0 +1,260 @@
+"""
+keyframed camera paths: a tour is a list of keyframes (pose of the 4D and 3D camera
+at a time), the orientations are interpolated along geodesics of SO(4) (slerp of
+both quaternions of the rotors, see rotor.py), the camera positions linearly.
+
+all poses of a path are computed in one vectorized pass and stored as rows in the
+layout of the Camera uniform block (uniforms.CameraBlock), playback only picks a row
+and uploads it as it is.
+
+    path = CameraPath([Keyframe.from_camera(camera, 0.0),
+                       Keyframe(4.0, angles=(0, 0, 0, 0.5, 0, 0), position4=(0, 0, 0, -5))])
+    player = PathCamera(path.sample(rate=60), rate=60) # window: plays in real time (start())
+    renderer.frames(PathCamera(path.sample(frames=600))) # headless: one frame per row
+
+"""
+import time
+
+import numpy as np
+
+from camera_core import POSE_NAVIGATION, POSE_SIZE, SNAPSHOT_CENTER, pose_views, read_snapshot
+from rotor import Rotor4, matrices, slerp
+from uniforms import CameraBlock
+from utils import rotate
+
+
+class Keyframe:
+    """
+    pose at a time: orientation (rows = camera axes) and position of the camera in
+    world coordinates, for the 4D and the 3D camera
+    """
+    __slots__ = ("time", "orientation4", "position4", "orientation3", "position3")
+
+    def __init__(self, time, orientation4=None, position4=(0.0, 0.0, 0.0, -3.0),
+                 orientation3=None, position3=(0.0, 0.0, 2.0), angles=None):
+        """
+        Args:
+            time (float): seconds
+        Keyword Args:
+            orientation4: 4x4 orientation as Camera.orientation4, identity if None
+            angles: instead of orientation4, angles (radians) in the planes
+                xy, xz, yz, xw, yw, zw as in utils.rotate
+        """
+        self.time = float(time)
+        if angles is not None:
+            orientation4 = rotate(np.asarray(angles, dtype="f8"))
+        self.orientation4 = np.eye(4) if orientation4 is None else np.array(orientation4, dtype="f8")
+        self.position4 = np.array(position4, dtype="f8")
+        self.orientation3 = np.eye(3) if orientation3 is None else np.array(orientation3, dtype="f8")
+        self.position3 = np.array(position3, dtype="f8")
+
+    @classmethod
+    def from_snapshot(cls, snapshot, time) -> "Keyframe":
+        """keyframe of a Camera.snapshot (e.g. a bookmark)"""
+        record = read_snapshot(snapshot)
+        pose = np.zeros(POSE_SIZE, dtype="f4")
+        pose[POSE_NAVIGATION] = record["pose"]
+        views = pose_views(pose)
+        orientation4 = views["orientation4"].astype("f8")
+        orientation3 = views["orientation"].astype("f8")
+        position4 = views["position4"].astype("f8")
+        position3 = views["position"].astype("f8")
+        # cameras rotating around the world center keep the position in camera coordinates
+        if not record["flags"] & SNAPSHOT_CENTER:
+            position4 = np.linalg.solve(orientation4, position4)
+            position3 = np.linalg.solve(orientation3, position3)
+        return cls(time, orientation4, position4, orientation3, position3)
+
+    @classmethod
+    def from_camera(cls, camera, time) -> "Keyframe":
+        """keyframe of the current pose of a camera (camera_core.CameraCore)"""
+        return cls.from_snapshot(camera.snapshot(), time)
+
+
+def _rotors(orientations) -> tuple:
+    """
+    left and right quaternions (k, 4) of the rotation matrices. the sign of each rotor
+    is chosen so the way to the previous one is the shortest, (-left, -right) is the
+    same rotation but slerp would take the long way round
+    """
+    rotors = [Rotor4.from_matrix(orientation) for orientation in orientations]
+    left = np.array([rotor.left for rotor in rotors])
+    right = np.array([rotor.right for rotor in rotors])
+    for k in range(1, len(rotors)):
+        dl = np.clip(left[k - 1] @ left[k], -1.0, 1.0)
+        dr = np.clip(right[k - 1] @ right[k], -1.0, 1.0)
+        if np.arccos(-dl) ** 2 + np.arccos(-dr) ** 2 < np.arccos(dl) ** 2 + np.arccos(dr) ** 2:
+            left[k] = -left[k]
+            right[k] = -right[k]
+    return left, right
+
+
+class CameraPath:
+    """keyframes sorted by time, sampled to uniform block rows"""
+
+    def __init__(self, keyframes, ease=False):
+        """
+        Args:
+            keyframes: Keyframe list (at least one)
+        Keyword Args:
+            ease (bool): slow down and stop at every keyframe (smoothstep)
+                instead of constant speed per segment
+        """
+        if not keyframes:
+            raise ValueError("a camera path needs at least one keyframe")
+        self.keyframes = sorted(keyframes, key=lambda keyframe: keyframe.time)
+        self.ease = ease
+        self.times = np.array([keyframe.time for keyframe in self.keyframes])
+        self.positions4 = np.array([keyframe.position4 for keyframe in self.keyframes])
+        self.positions3 = np.array([keyframe.position3 for keyframe in self.keyframes])
+        self.left4, self.right4 = _rotors([keyframe.orientation4 for keyframe in self.keyframes])
+        # the 3D orientations as rotors that do not touch w
+        orientations3 = np.tile(np.eye(4), (len(self.keyframes), 1, 1))
+        orientations3[:, :3, :3] = [keyframe.orientation3 for keyframe in self.keyframes]
+        self.left3, self.right3 = _rotors(orientations3)
+
+    @classmethod
+    def from_snapshots(cls, snapshots, seconds=1.0, ease=False) -> "CameraPath":
+        """path through Camera.snapshots (e.g. bookmarks), `seconds` from one to the next"""
+        return cls([Keyframe.from_snapshot(snapshot, index * seconds) for index, snapshot in enumerate(snapshots)], ease)
+
+    @property
+    def duration(self) -> float:
+        return float(self.times[-1] - self.times[0])
+
+    def sample(self, frames=None, rate=60.0) -> np.ndarray:
+        """
+        poses of the whole path, either `frames` evenly spaced ones (first and
+        last keyframe included) or `rate` per second
+
+        Returns:
+            np.ndarray: (frames, CameraBlock.SIZE) float32, see blocks
+        """
+        if frames is None:
+            frames = int(self.duration * rate) + 1
+            times = np.minimum(self.times[0] + np.arange(frames) / rate, self.times[-1])
+        else:
+            times = np.linspace(self.times[0], self.times[-1], frames)
+        return self.blocks(times)
+
+    def blocks(self, times) -> np.ndarray:
+        """
+        poses at the given times as rows in the layout of the Camera uniform block,
+        m_proj and m_fov4 are left 0 (filled by PathCamera)
+
+        Returns:
+            np.ndarray: (len(times), CameraBlock.SIZE) float32
+        """
+        times = np.asarray(times, dtype="f8")
+        count = len(times)
+        last = len(self.times) - 1
+        # segment [k, k + 1] of every time and the fraction u in it
+        k = np.clip(np.searchsorted(self.times, times, side="right") - 1, 0, max(last - 1, 0))
+        k1 = np.minimum(k + 1, last)
+        span = self.times[k1] - self.times[k]
+        u = np.clip((times - self.times[k]) / np.where(span > 0, span, 1.0), 0.0, 1.0)
+        if self.ease:
+            u = u * u * (3.0 - 2.0 * u)
+
+        orientation4 = matrices(slerp(self.left4[k], self.left4[k1], u), slerp(self.right4[k], self.right4[k1], u))
+        orientation3 = matrices(slerp(self.left3[k], self.left3[k1], u), slerp(self.right3[k], self.right3[k1], u))[:, :3, :3]
+        position4 = self.positions4[k] + u[:, None] * (self.positions4[k1] - self.positions4[k])
+        position3 = self.positions3[k] + u[:, None] * (self.positions3[k1] - self.positions3[k])
+
+        blocks = np.zeros((count, CameraBlock.SIZE), dtype="f4")
+        # column major matrices, mat3 columns padded to vec4
+        blocks[:, CameraBlock.ORIENTATION4] = orientation4.transpose(0, 2, 1).reshape(count, 16)
+        blocks[:, CameraBlock.POSITION4] = -np.einsum("nij,nj->ni", orientation4, position4)
+        padded = np.zeros((count, 3, 4), dtype="f4")
+        padded[:, :, :3] = orientation3.transpose(0, 2, 1)
+        blocks[:, CameraBlock.ORIENTATION3] = padded.reshape(count, 12)
+        blocks[:, CameraBlock.POSITION3] = -np.einsum("nij,nj->ni", orientation3, position3)
+        return blocks
+
+
+class PathCamera:
+    """
+    plays precomputed poses (rows of CameraPath.sample). headless rendering selects
+    the row with set_pose, in the window start() plays them in real time: row
+    (clock() - start) * rate. input is ignored
+    """
+
+    def __init__(self, poses, rate=60.0, projection=None, fov=90.0, aspect_ratio=16 / 9, near=1.0, far=100.0, fov4=90.0):
+        """
+        Args:
+            poses: (frames, CameraBlock.SIZE) float32 rows
+        Keyword Args:
+            rate (float): rows per second for start()
+            projection: Projection3D to use (e.g. the one of the window camera),
+                else one is created from fov, aspect_ratio, near and far
+        """
+        self.poses = poses
+        self.rate = rate
+        self.index = 0
+        self.version = 0
+        # rows are shown as they are, nothing is interpolated
+        self.interpolation = None
+        self.clock = time.perf_counter
+        self._start = None
+        if projection is None:
+            from moderngl_window.opengl.projection import Projection3D
+            projection = Projection3D(aspect_ratio, fov, near, far)
+        self._projection = projection
+        self._block_projection = None
+        self.fov4 = fov4
+        self.poses[:, CameraBlock.FOV4] = 1.0 / np.tan(np.radians(fov4) / 2.0)
+
+    @property
+    def projection(self):
+        return self._projection
+
+    def set_pose(self, index) -> None:
+        self.index = index
+        self.version += 1
+
+    def changed(self) -> None:
+        self.version += 1
+
+    def start(self) -> None:
+        """plays the poses from the first one, in real time of self.clock"""
+        self._start = self.clock()
+        self.set_pose(0)
+
+    @property
+    def finished(self) -> bool:
+        """True when start() played the last pose"""
+        return self._start is not None and (self.clock() - self._start) * self.rate >= len(self.poses) - 1
+
+    def _advance(self) -> None:
+        if self._start is not None:
+            index = min(int((self.clock() - self._start) * self.rate), len(self.poses) - 1)
+            if index != self.index:
+                self.set_pose(index)
+        matrix = self._projection.matrix
+        if matrix is not self._block_projection:
+            self._block_projection = matrix
+            # memory order: glm matrices are column-major like the block
+            self.poses[:, CameraBlock.PROJ] = np.asarray(matrix, dtype="f4").ravel(order="K")
+
+    @property
+    def uniform_block(self) -> np.ndarray:
+        return self.poses[self.index]
+
+    @property
+    def matrix4d(self):
+        self._advance()
+        block = self.poses[self.index]
+        return block[CameraBlock.ORIENTATION4].reshape(4, 4).T, block[CameraBlock.POSITION4]
+
+    @property
+    def matrix(self):
+        self._advance()
+        block = self.poses[self.index]
+        # the 3D shader program reads the orientation from contiguous memory
+        return np.ascontiguousarray(block[CameraBlock.ORIENTATION3].reshape(3, 4)[:, :3].T), block[CameraBlock.POSITION3]
+
+    def key_input(self, key, action, modifiers) -> None:
+        pass
+
+    def rot_state(self, dx, dy, dz, mouseKey) -> None:
+        pass
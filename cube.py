@@ -3,6 +3,8 @@ modified based on moderngl-window library: https://github.com/moderngl/moderngl-
 
 """
 
+from functools import lru_cache
+
 import numpy
 
 from moderngl_window.opengl.vao import VAO
@@ -159,32 +161,8 @@ def cube(
             ], dtype=numpy.float32)
         # fmt: on
     else:
-        pos = numpy.array([ center[0] + width, center[1] + height, center[2] + depth,
-                      center[0] - width, center[1] + height, center[2] + depth,
-                      center[0] + width, center[1] + height, center[2] + depth,
-                      center[0] + width, center[1] - height, center[2] + depth,
-                      center[0] + width, center[1] + height, center[2] + depth,
-                      center[0] + width, center[1] + height, center[2] - depth,
-                      center[0] - width, center[1] + height, center[2] + depth,
-                      center[0] - width, center[1] - height, center[2] + depth,
-                      center[0] - width, center[1] + height, center[2] + depth,
-                      center[0] - width, center[1] + height, center[2] - depth,
-                      center[0] + width, center[1] - height, center[2] + depth,
-                      center[0] - width, center[1] - height, center[2] + depth,
-                      center[0] + width, center[1] - height, center[2] + depth,
-                      center[0] + width, center[1] - height, center[2] - depth,
-                      center[0] + width, center[1] + height, center[2] - depth,
-                      center[0] + width, center[1] - height, center[2] - depth,
-                      center[0] + width, center[1] + height, center[2] - depth,
-                      center[0] - width, center[1] + height, center[2] - depth,
-                      center[0] + width, center[1] - height, center[2] - depth,
-                      center[0] - width, center[1] - height, center[2] - depth,
-                      center[0] - width, center[1] + height, center[2] - depth,
-                      center[0] - width, center[1] - height, center[2] - depth,
-                      center[0] - width, center[1] - height, center[2] + depth,
-                      center[0] - width, center[1] - height, center[2] - depth,
-        ], dtype=numpy.float32)
-        normals = False
+        # wireframe: 8 unique corners + index buffer for the 12 edges
+        return ncube(3, size=size, center=center, name=name or "geometry:cube", attr_names=attr_names)
     vao = VAO(name or "geometry:cube")
 
     # Add buffers
@@ -205,223 +183,186 @@ def hypercube(
     attr_names=AttributeNames,
     mode=moderngl.TRIANGLES
 ) -> VAO:
-    """Creates a cube VAO with normals and texture coordinates
+    """Creates a hypercube VAO, the 4D face mesh or the wireframe
 
     Keyword Args:
-        width (float): Width of the cube
-        height (float): Height of the cube
-        depth (float): Depth of the cube
-        center: center of the cube as a 3-component tuple
-        normals: (bool) Include normals
-        uvs: (bool) include uv coordinates
+        size: edge length along each axis (4-component tuple)
+        center: center of the hypercube as a 4-component tuple
+        normals: (bool) not supported for the face mesh
+        uvs: (bool) not supported for the face mesh
         name (str): Optional name for the VAO
         attr_names (AttributeNames): Attribute names
-        mode: triangles/lines
+        mode: triangles (the 24 square faces, see ncube_mesh_geometry)/lines
     Returns:
-        A :py:class:`moderngl_window.opengl.vao.VAO` instance
+        A :py:class:`moderngl_window.opengl.vao.VAO` instance, indexed
     """
-    width, height, depth, fourth = size
-    width, height, depth, fourth = width / 2.0, height / 2.0, depth / 2.0, fourth / 2.0
-    
     if mode == moderngl.TRIANGLES:
-        # fmt: off
-        pos = numpy.array([
-            center[0] + width, center[1] - height, center[2] + depth, 0.0,
-            center[0] + width, center[1] + height, center[2] + depth, 0.0,
-            center[0] - width, center[1] - height, center[2] + depth, 0.0,
-            center[0] + width, center[1] + height, center[2] + depth, 0.0,
-            center[0] - width, center[1] + height, center[2] + depth, 0.0,
-            center[0] - width, center[1] - height, center[2] + depth, 0.0,
-            center[0] + width, center[1] - height, center[2] - depth, 0.0,
-            center[0] + width, center[1] + height, center[2] - depth, 0.0,
-            center[0] + width, center[1] - height, center[2] + depth, 0.0,
-            center[0] + width, center[1] + height, center[2] - depth, 0.0,
-            center[0] + width, center[1] + height, center[2] + depth, 0.0,
-            center[0] + width, center[1] - height, center[2] + depth, 0.0,
-            center[0] + width, center[1] - height, center[2] - depth, 0.0,
-            center[0] + width, center[1] - height, center[2] + depth, 0.0,
-            center[0] - width, center[1] - height, center[2] + depth, 0.0,
-            center[0] + width, center[1] - height, center[2] - depth, 0.0,
-            center[0] - width, center[1] - height, center[2] + depth, 0.0,
-            center[0] - width, center[1] - height, center[2] - depth, 0.0,
-            center[0] - width, center[1] - height, center[2] + depth, 0.0,
-            center[0] - width, center[1] + height, center[2] + depth, 0.0,
-            center[0] - width, center[1] + height, center[2] - depth, 0.0,
-            center[0] - width, center[1] - height, center[2] + depth, 0.0,
-            center[0] - width, center[1] + height, center[2] - depth, 0.0,
-            center[0] - width, center[1] - height, center[2] - depth, 0.0,
-            center[0] + width, center[1] + height, center[2] - depth, 0.0,
-            center[0] + width, center[1] - height, center[2] - depth, 0.0,
-            center[0] - width, center[1] - height, center[2] - depth, 0.0,
-            center[0] + width, center[1] + height, center[2] - depth, 0.0,
-            center[0] - width, center[1] - height, center[2] - depth, 0.0,
-            center[0] - width, center[1] + height, center[2] - depth, 0.0,
-            center[0] + width, center[1] + height, center[2] - depth, 0.0,
-            center[0] - width, center[1] + height, center[2] - depth, 0.0,
-            center[0] + width, center[1] + height, center[2] + depth, 0.0,
-            center[0] - width, center[1] + height, center[2] - depth, 0.0,
-            center[0] - width, center[1] + height, center[2] + depth, 0.0,
-            center[0] + width, center[1] + height, center[2] + depth, 0.0,
-        ], dtype=numpy.float32)
-    
-        if normals:
-            normal_data = numpy.array([
-                -0, 0, 1,
-                -0, 0, 1,
-                -0, 0, 1,
-                0, 0, 1,
-                0, 0, 1,
-                0, 0, 1,
-                1, 0, 0,
-                1, 0, 0,
-                1, 0, 0,
-                1, 0, 0,
-                1, 0, 0,
-                1, 0, 0,
-                0, -1, 0,
-                0, -1, 0,
-                0, -1, 0,
-                0, -1, 0,
-                0, -1, 0,
-                0, -1, 0,
-                -1, -0, 0,
-                -1, -0, 0,
-                -1, -0, 0,
-                -1, -0, 0,
-                -1, -0, 0,
-                -1, -0, 0,
-                0, 0, -1,
-                0, 0, -1,
-                0, 0, -1,
-                0, 0, -1,
-                0, 0, -1,
-                0, 0, -1,
-                0, 1, 0,
-                0, 1, 0,
-                0, 1, 0,
-                0, 1, 0,
-                0, 1, 0,
-                0, 1, 0,
-            ], dtype=numpy.float32)
-    
-        if uvs:
-            uvs_data = numpy.array([
-                1, 0,
-                1, 1,
-                0, 0,
-                1, 1,
-                0, 1,
-                0, 0,
-                1, 0,
-                1, 1,
-                0, 0,
-                1, 1,
-                0, 1,
-                0, 0,
-                1, 1,
-                0, 1,
-                0, 0,
-                1, 1,
-                0, 0,
-                1, 0,
-                0, 1,
-                0, 0,
-                1, 0,
-                0, 1,
-                1, 0,
-                1, 1,
-                1, 0,
-                1, 1,
-                0, 1,
-                1, 0,
-                0, 1,
-                0, 0,
-                1, 1,
-                0, 1,
-                1, 0,
-                0, 1,
-                0, 0,
-                1, 0
-            ], dtype=numpy.float32)
-        # fmt: on
-    else:
-        pos = numpy.array([ 
-                      center[0] + width, center[1] + height, center[2] + depth, center[3] + fourth,
-                       center[0] - width, center[1] + height, center[2] + depth, center[3] + fourth,
-                      center[0] + width, center[1] + height, center[2] + depth, center[3] + fourth,
-                       center[0] + width, center[1] - height, center[2] + depth, center[3] + fourth,
-                      center[0] + width, center[1] + height, center[2] + depth, center[3] + fourth,
-                       center[0] + width, center[1] + height, center[2] - depth, center[3] + fourth,
-                      center[0] - width, center[1] + height, center[2] + depth, center[3] + fourth,
-                       center[0] - width, center[1] - height, center[2] + depth, center[3] + fourth,
-                      center[0] - width, center[1] + height, center[2] + depth, center[3] + fourth,
-                       center[0] - width, center[1] + height, center[2] - depth, center[3] + fourth,
-                      center[0] + width, center[1] - height, center[2] + depth, center[3] + fourth,
-                       center[0] - width, center[1] - height, center[2] + depth, center[3] + fourth,
-                      center[0] + width, center[1] - height, center[2] + depth, center[3] + fourth,
-                       center[0] + width, center[1] - height, center[2] - depth, center[3] + fourth,
-                      center[0] + width, center[1] + height, center[2] - depth, center[3] + fourth,
-                       center[0] + width, center[1] - height, center[2] - depth, center[3] + fourth,
-                      center[0] + width, center[1] + height, center[2] - depth, center[3] + fourth,
-                       center[0] - width, center[1] + height, center[2] - depth, center[3] + fourth,
-                      center[0] + width, center[1] - height, center[2] - depth, center[3] + fourth,
-                       center[0] - width, center[1] - height, center[2] - depth, center[3] + fourth,
-                      center[0] - width, center[1] + height, center[2] - depth, center[3] + fourth,
-                       center[0] - width, center[1] - height, center[2] - depth, center[3] + fourth,
-                      center[0] - width, center[1] - height, center[2] + depth, center[3] + fourth,
-                       center[0] - width, center[1] - height, center[2] - depth, center[3] + fourth,
-                      
-                      center[0] + width, center[1] + height, center[2] + depth, center[3] - fourth,
-                       center[0] - width, center[1] + height, center[2] + depth, center[3] - fourth,
-                      center[0] + width, center[1] + height, center[2] + depth, center[3] - fourth,
-                       center[0] + width, center[1] - height, center[2] + depth, center[3] - fourth,
-                      center[0] + width, center[1] + height, center[2] + depth, center[3] - fourth,
-                       center[0] + width, center[1] + height, center[2] - depth, center[3] - fourth,
-                      center[0] - width, center[1] + height, center[2] + depth, center[3] - fourth,
-                       center[0] - width, center[1] - height, center[2] + depth, center[3] - fourth,
-                      center[0] - width, center[1] + height, center[2] + depth, center[3] - fourth,
-                       center[0] - width, center[1] + height, center[2] - depth, center[3] - fourth,
-                      center[0] + width, center[1] - height, center[2] + depth, center[3] - fourth,
-                       center[0] - width, center[1] - height, center[2] + depth, center[3] - fourth,
-                      center[0] + width, center[1] - height, center[2] + depth, center[3] - fourth,
-                       center[0] + width, center[1] - height, center[2] - depth, center[3] - fourth,
-                      center[0] + width, center[1] + height, center[2] - depth, center[3] - fourth,
-                       center[0] + width, center[1] - height, center[2] - depth, center[3] - fourth,
-                      center[0] + width, center[1] + height, center[2] - depth, center[3] - fourth,
-                       center[0] - width, center[1] + height, center[2] - depth, center[3] - fourth,
-                      center[0] + width, center[1] - height, center[2] - depth, center[3] - fourth,
-                       center[0] - width, center[1] - height, center[2] - depth, center[3] - fourth,
-                      center[0] - width, center[1] + height, center[2] - depth, center[3] - fourth,
-                       center[0] - width, center[1] - height, center[2] - depth, center[3] - fourth,
-                      center[0] - width, center[1] - height, center[2] + depth, center[3] - fourth,
-                       center[0] - width, center[1] - height, center[2] - depth, center[3] - fourth,
-                      
-                      center[0] + width, center[1] + height, center[2] + depth, center[3] - fourth,
-                       center[0] + width, center[1] + height, center[2] + depth, center[3] + fourth,
-                      center[0] - width, center[1] + height, center[2] + depth, center[3] - fourth,
-                       center[0] - width, center[1] + height, center[2] + depth, center[3] + fourth,
-                      center[0] + width, center[1] - height, center[2] + depth, center[3] - fourth,
-                       center[0] + width, center[1] - height, center[2] + depth, center[3] + fourth,
-                      center[0] + width, center[1] + height, center[2] - depth, center[3] - fourth,
-                       center[0] + width, center[1] + height, center[2] - depth, center[3] + fourth,
-                      
-                        center[0] - width, center[1] + height, center[2] - depth, center[3] - fourth,
-                       center[0] - width, center[1] + height, center[2] - depth, center[3] + fourth,
-                      center[0] + width, center[1] - height, center[2] - depth, center[3] - fourth,
-                       center[0] + width, center[1] - height, center[2] - depth, center[3] + fourth,
-                      center[0] - width, center[1] - height, center[2] + depth, center[3] - fourth,
-                       center[0] - width, center[1] - height, center[2] + depth, center[3] + fourth,
-                      center[0] - width, center[1] - height, center[2] - depth, center[3] - fourth,
-                       center[0] - width, center[1] - height, center[2] - depth, center[3] + fourth,
-        ], dtype=numpy.float32)
-        normals = False
-    vao = VAO(name or "geometry:hypercube")
+        if normals or uvs:
+            # a square of a 4D mesh has a normal plane, not a normal vector
+            raise ValueError("the 4D face mesh of the hypercube has no normals or uvs")
+        # 24 squares, 2 triangles each, on the 16 unique corners
+        vertices, triangles, _ = ncube_mesh_geometry(4, size=size, center=center)
+        return indexed_vao(vertices, triangles, name or "geometry:hypercube:faces",
+                           attr_names=attr_names, mode=moderngl.TRIANGLES)
+    # wireframe: 16 unique corners + index buffer for the 32 edges
+    return ncube(4, size=size, center=center, name=name or "geometry:hypercube", attr_names=attr_names)
 
-    # Add buffers
-    vao.buffer(pos, "4f", [attr_names.POSITION])
-    if normals:
-        vao.buffer(normal_data, "3f", [attr_names.NORMAL])
-    if uvs:
-        vao.buffer(uvs_data, "2f", [attr_names.TEXCOORD_0])
+def ncube_geometry(dim=4, size=None, center=None):
+    """Vertices and edges of an n-dimensional cube
+
+    vertex i has bit k set if it lies on the positive side of axis k,
+    two vertices share an edge if their bit patterns differ in exactly one bit
+
+    Keyword Args:
+        dim (int): dimension of the cube
+        size: edge length along each axis (dim-component tuple), default 1.0
+        center: center of the cube (dim-component tuple), default origin
+    Returns:
+        numpy.ndarray: vertices (2^dim, dim) float32
+        numpy.ndarray: edges (dim * 2^(dim-1), 2) uint32 vertex indices
+    """
+    size = numpy.ones(dim) if size is None else numpy.asarray(size, dtype=numpy.float64)
+    center = numpy.zeros(dim) if center is None else numpy.asarray(center, dtype=numpy.float64)
+
+    ids = numpy.arange(2 ** dim, dtype=numpy.uint32)
+    bits = (ids[:, None] >> numpy.arange(dim, dtype=numpy.uint32)) & 1
+    vertices = (center + (bits - 0.5) * size).astype(numpy.float32)
+
+    # flip every bit of every vertex, keep each pair once (lower index first)
+    neighbours = ids[:, None] ^ (numpy.uint32(1) << numpy.arange(dim, dtype=numpy.uint32))
+    start, axis = numpy.nonzero(neighbours > ids[:, None])
+    edges = numpy.stack([ids[start], neighbours[start, axis]], axis=1)
+    return vertices, edges
+
+
+@lru_cache(maxsize=None)
+def ncube_faces(dim=4):
+    """Square faces of an n-dimensional cube (vertex ids as in ncube_geometry)
 
+    every pair of axes a < b and every corner with bits a and b cleared gives the
+    square corner, +a, +a+b, +b. built once per dimension (cached, read-only)
+
+    Returns:
+        numpy.ndarray: (dim * (dim - 1) / 2 * 2^(dim-2), 4) uint32, corners in cyclic order
+    """
+    ids = numpy.arange(2 ** dim, dtype=numpy.uint32)
+    faces = []
+    for a in range(dim):
+        for b in range(a + 1, dim):
+            bit_a, bit_b = numpy.uint32(1 << a), numpy.uint32(1 << b)
+            base = ids[(ids & (bit_a | bit_b)) == 0]
+            faces.append(numpy.stack([base, base | bit_a, base | bit_a | bit_b, base | bit_b], axis=1))
+    faces = numpy.concatenate(faces)
+    faces.flags.writeable = False
+    return faces
+
+
+def triangulate(polygons):
+    """Triangles of convex polygons (fan from the first corner)
+
+    Args:
+        polygons: list of (f, k) vertex index arrays, corners in cyclic order,
+            one array per polygon size
+    Returns:
+        numpy.ndarray: triangles (t, 3) uint32
+        numpy.ndarray: face ids (t,) uint32, index of the polygon of every
+            triangle (numbered through all arrays in order)
+    """
+    triangles = []
+    face_ids = []
+    first_id = 0
+    for faces in polygons:
+        faces = numpy.asarray(faces, dtype=numpy.uint32)
+        count, corners = faces.shape
+        # triangle (0, i, i + 1) for i = 1 .. corners - 2, all faces at once
+        fan = numpy.arange(1, corners - 1)
+        triangles.append(numpy.stack([numpy.repeat(faces[:, :1], corners - 2, axis=1),
+                                      faces[:, fan], faces[:, fan + 1]], axis=2).reshape(-1, 3))
+        face_ids.append(numpy.repeat(numpy.arange(first_id, first_id + count, dtype=numpy.uint32), corners - 2))
+        first_id += count
+    if not triangles:
+        return numpy.zeros((0, 3), dtype=numpy.uint32), numpy.zeros(0, dtype=numpy.uint32)
+    return numpy.concatenate(triangles), numpy.concatenate(face_ids)
+
+
+@lru_cache(maxsize=None)
+def _ncube_triangles(dim):
+    triangles, face_ids = triangulate([ncube_faces(dim)])
+    triangles.flags.writeable = False
+    face_ids.flags.writeable = False
+    return triangles, face_ids
+
+
+def ncube_mesh_geometry(dim=4, size=None, center=None):
+    """Vertices and triangulated square faces of an n-dimensional cube
+
+    the corners are shared by all faces (as the edges of the wireframe), the
+    triangulation depends on the dimension only and is cached
+
+    Keyword Args:
+        dim (int): dimension of the cube
+        size: edge length along each axis (dim-component tuple), default 1.0
+        center: center of the cube (dim-component tuple), default origin
+    Returns:
+        numpy.ndarray: vertices (2^dim, dim) float32
+        numpy.ndarray: triangles (t, 3) uint32 vertex indices, read-only
+        numpy.ndarray: face ids (t,) uint32, square of every triangle (see ncube_faces), read-only
+    """
+    vertices, _ = ncube_geometry(dim, size, center)
+    triangles, face_ids = _ncube_triangles(dim)
+    return vertices, triangles, face_ids
+
+
+def project_to_4d(vertices, distance=3.0):
+    """Perspective projection of n-dimensional points (n > 4) down to 4D
+
+    the last coordinate is removed by a perspective divide with the eye at
+    `distance` on that axis, repeated until 4 coordinates are left
+    """
+    vertices = numpy.asarray(vertices, dtype=numpy.float32)
+    while vertices.shape[1] > 4:
+        vertices = vertices[:, :-1] / (distance - vertices[:, -1:])
+    return vertices
+
+
+def indexed_vao(vertices, indices, name, attr_names=AttributeNames, mode=moderngl.LINES) -> VAO:
+    """VAO with one vertex buffer (positions) and one index buffer
+
+    Args:
+        vertices: (n, 3) or (n, 4) positions
+        indices: flat or (m, k) array of vertex indices
+        name (str): name of the VAO
+    """
+    vertices = numpy.ascontiguousarray(vertices, dtype=numpy.float32)
+    vao = VAO(name, mode=mode)
+    vao.buffer(vertices, "{}f".format(vertices.shape[1]), [attr_names.POSITION])
+    vao.index_buffer(numpy.ascontiguousarray(indices, dtype=numpy.uint32), index_element_size=4)
     return vao
+
+
+def ncube(
+    dim=4,
+    size=None,
+    center=None,
+    name=None,
+    attr_names=AttributeNames,
+) -> VAO:
+    """Creates an indexed wireframe VAO of an n-dimensional cube
+
+    every corner is stored once, the edges are drawn through the index buffer.
+    cubes with more than 4 dimensions are projected to 4D (see project_to_4d)
+    so they can be rendered with the 4D shaders.
+
+    Keyword Args:
+        dim (int): dimension of the cube
+        size: edge length along each axis (dim-component tuple)
+        center: center of the cube (dim-component tuple)
+        name (str): Optional name for the VAO
+        attr_names (AttributeNames): Attribute names
+    Returns:
+        A :py:class:`moderngl_window.opengl.vao.VAO` instance, mode LINES
+    """
+    vertices, edges = ncube_geometry(dim, size, center)
+    if dim > 4:
+        vertices = project_to_4d(vertices)
+    return indexed_vao(vertices, edges, name or "geometry:{}-cube".format(dim), attr_names=attr_names)
@@ -0,0 +1,179 @@
+"""
+headless rendering of the scene into an offscreen framebuffer, without window
+or input events. the camera follows a scripted list of poses, frames are returned
+as numpy arrays or written to disk.
+
+    python headless.py --frames 600 --size 640 360 --out frames
+
+runs on machines without GPU using Mesa llvmpipe (EGL is used if there is no X display)
+
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import moderngl
+import moderngl_window as mglw
+from moderngl_window.opengl.projection import Projection3D
+
+from camera_core import CameraCoordinateCore
+from camera_path import CameraPath, PathCamera
+from bookmarks import Bookmarks
+from scene import Scene
+
+
+def create_context(backend=None, require=450):
+    """standalone moderngl context. without backend the default (GLX) context is
+    tried first and EGL (no display needed) second"""
+    if backend is not None:
+        return moderngl.create_standalone_context(require=require, backend=backend)
+    try:
+        return moderngl.create_standalone_context(require=require)
+    except Exception:
+        return moderngl.create_standalone_context(require=require, backend="egl")
+
+
+class ScriptedCamera:
+    """
+    camera that replays a list of poses instead of reacting to input.
+    a pose is (orientation4, position4, orientation3, position3) as returned by
+    Camera.matrix4d and Camera.matrix
+    """
+
+    def __init__(self, poses, fov=90.0, aspect_ratio=16 / 9, near=1.0, far=100.0, fov4=90.0):
+        self.poses = list(poses)
+        self.index = 0
+        self.fov4 = fov4
+        self.version = 0
+        self._projection = Projection3D(aspect_ratio, fov, near, far)
+
+    @property
+    def projection(self):
+        return self._projection
+
+    def set_pose(self, index) -> None:
+        self.index = index
+        self.version += 1
+
+    @property
+    def matrix4d(self):
+        orientation4, position4, _, _ = self.poses[self.index]
+        return orientation4, position4
+
+    @property
+    def matrix(self):
+        _, _, orientation3, position3 = self.poses[self.index]
+        return orientation3, position3
+
+
+def orbit_poses(count, speed=1.0):
+    """example script: camera coordinate camera rotating in the xw and yw planes,
+    `speed` degrees per frame"""
+    camera = CameraCoordinateCore()
+    poses = []
+    for _ in range(count):
+        camera.update_orientation4D(0, 0, speed, speed / 2, 0)
+        orientation4, position4 = camera.pose4()
+        orientation3, position3 = camera.pose3()
+        poses.append((np.array(orientation4), np.array(position4), np.array(orientation3), np.array(position3)))
+    return poses
+
+
+class HeadlessRenderer:
+    """renders the Scene into an offscreen framebuffer of a standalone context"""
+
+    def __init__(self, size=(1280, 720), samples=0, backend=None, show_axes=False, section=False):
+        """
+        Keyword Args:
+            size: (width, height) of the frames
+            samples (int): multisampling, 0 = off
+            backend (str): moderngl context backend, e.g. "egl"
+            show_axes (bool): draw coordinate system axes
+            section (bool): draw the cross-section of the 4D scene (Scene.draw)
+        """
+        self.size = tuple(size)
+        self.show_axes = show_axes
+        self.section = section
+        self.ctx = create_context(backend)
+        # the VAOs of moderngl_window render with the active context
+        mglw.activate_context(ctx=self.ctx)
+        self.fbo = self.ctx.framebuffer(
+            color_attachments=self.ctx.renderbuffer(self.size, samples=samples),
+            depth_attachment=self.ctx.depth_renderbuffer(self.size, samples=samples),
+        )
+        # multisampled framebuffers can not be read, resolve into a plain one
+        self._resolve = None
+        if samples:
+            self._resolve = self.ctx.simple_framebuffer(self.size)
+        self.scene = Scene(self.ctx)
+
+    def render(self, camera, render3D=False) -> np.ndarray:
+        """draws one frame with the current pose of the camera
+
+        Returns:
+            np.ndarray: (height, width, 3) uint8 image, first row is the top
+        """
+        self.fbo.use()
+        if render3D:
+            self.scene.draw(camera, camera.matrix)
+        else:
+            self.scene.draw(camera, camera.matrix, camera.matrix4d, self.show_axes, self.section)
+        fbo = self.fbo
+        if self._resolve is not None:
+            self.ctx.copy_framebuffer(self._resolve, self.fbo)
+            fbo = self._resolve
+        image = np.frombuffer(fbo.read(components=3), dtype=np.uint8)
+        return image.reshape(self.size[1], self.size[0], 3)[::-1]
+
+    def frames(self, camera, render3D=False):
+        """generator over the frames of all poses of a ScriptedCamera or PathCamera"""
+        for index in range(len(camera.poses)):
+            camera.set_pose(index)
+            yield self.render(camera, render3D)
+
+    def write(self, camera, directory, render3D=False) -> int:
+        """renders all poses of a ScriptedCamera or PathCamera to directory/frame_00000.png, ...
+
+        Returns:
+            int: number of frames written
+        """
+        from PIL import Image
+
+        os.makedirs(directory, exist_ok=True)
+        count = 0
+        for count, image in enumerate(self.frames(camera, render3D), 1):
+            Image.fromarray(image).save(os.path.join(directory, "frame_{:05d}.png".format(count - 1)))
+        return count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="render the 4D scene offscreen")
+    parser.add_argument("--frames", type=int, default=300, help="number of frames")
+    parser.add_argument("--size", type=int, nargs=2, default=(1280, 720), metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--samples", type=int, default=0, help="multisampling")
+    parser.add_argument("--backend", default=None, help="moderngl backend, e.g. egl")
+    parser.add_argument("--out", default=None, help="directory for png frames, none = only measure")
+    parser.add_argument("--axes", action="store_true", help="show coordinate system axes")
+    parser.add_argument("--3d", dest="render3D", action="store_true", help="render the 3D scene")
+    parser.add_argument("--section", action="store_true", help="render the cross-section of the 4D scene")
+    parser.add_argument("--tour", default=None, metavar="BOOKMARKS",
+                        help="camera path through the bookmarks of this file (main.py --bookmarks) instead of the orbit")
+    args = parser.parse_args()
+
+    renderer = HeadlessRenderer(args.size, args.samples, args.backend, args.axes, args.section)
+    print(renderer.ctx.info["GL_RENDERER"])
+    if args.tour:
+        bookmarks = Bookmarks(args.tour)
+        path = CameraPath.from_snapshots([bookmarks.snapshots[name] for name in bookmarks.names()], ease=True)
+        camera = PathCamera(path.sample(frames=args.frames), aspect_ratio=args.size[0] / args.size[1])
+    else:
+        camera = ScriptedCamera(orbit_poses(args.frames), aspect_ratio=args.size[0] / args.size[1])
+
+    start = time.perf_counter()
+    if args.out:
+        count = renderer.write(camera, args.out, args.render3D)
+    else:
+        count = sum(1 for _ in renderer.frames(camera, args.render3D))
+    elapsed = time.perf_counter() - start
+    print("{} frames in {:.2f} s: {:.1f} fps".format(count, elapsed, count / elapsed))
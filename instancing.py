@@ -0,0 +1,92 @@
+"""
+instanced rendering of many copies of the same 4D mesh in one draw call.
+rotation (4x4) and translation (4D) of every copy live in one per-instance
+buffer that the vertex shader reads as attributes:
+
+    in mat4 in_model_r; // model rotation, applied as in_model_r * in_position
+    in vec4 in_model_t; // model translation
+
+"""
+import numpy as np
+import moderngl
+
+from moderngl_window.opengl.vao import VAO
+from moderngl_window.geometry import AttributeNames
+
+
+class InstancedMesh4D:
+    """
+    indexed 4D mesh (e.g. from cube.ncube_geometry) plus a per-instance buffer
+    with one rotation and translation per copy
+
+        cubes = InstancedMesh4D(*ncube_geometry(4, size=(0.5,) * 4), capacity=10000)
+        cubes.set(rotations, translations) # (n, 4, 4), (n, 4)
+        cubes.render(prog) # one upload (if changed) and one draw call
+    """
+    # attribute names of the per-instance data in the shader
+    ROTATION = "in_model_r"
+    TRANSLATION = "in_model_t"
+
+    def __init__(self, vertices, indices, capacity, mode=moderngl.LINES, name=None, attr_names=AttributeNames):
+        """
+        Args:
+            vertices: (n, 4) vertex positions
+            indices: vertex indices (e.g. (m, 2) edges for LINES)
+            capacity (int): maximum number of instances
+        Keyword Args:
+            mode: draw mode
+            name (str): Optional name for the VAO
+            attr_names (AttributeNames): Attribute names
+        """
+        self.capacity = capacity
+        self.count = 0
+        self.vao = VAO(name or "geometry:instanced4d", mode=mode)
+        self.vao.buffer(np.ascontiguousarray(vertices, dtype="f4"), "4f", [attr_names.POSITION])
+        self.vao.index_buffer(np.ascontiguousarray(indices, dtype="u4"), index_element_size=4)
+
+        # 16 floats rotation + 4 floats translation per instance, interleaved
+        self.data = np.zeros((capacity, 20), dtype="f4")
+        # GLSL reads matrices column by column, the stored block is the transpose
+        # of the rotation so the shader can use in_model_r without transposing
+        self.rotations = self.data[:, :16].reshape(capacity, 4, 4).transpose(0, 2, 1)
+        self.translations = self.data[:, 16:]
+        self.rotations[:] = np.eye(4, dtype="f4")
+
+        self.buffer = self.vao.ctx.buffer(reserve=self.data.nbytes, dynamic=True)
+        self.vao.buffer(self.buffer, "16f 4f/i", [self.ROTATION, self.TRANSLATION])
+        self._dirty = True
+
+    def set(self, rotations, translations) -> None:
+        """replaces all instances
+
+        Args:
+            rotations: (n, 4, 4) rotation matrices (e.g. from utils.rotate_batch)
+            translations: (n, 4) translations
+        """
+        n = len(translations)
+        if n > self.capacity:
+            raise ValueError("{} instances exceed capacity {}".format(n, self.capacity))
+        self.rotations[:n] = rotations
+        self.translations[:n] = translations
+        self.count = n
+        self._dirty = True
+
+    def changed(self) -> None:
+        """call after modifying self.rotations / self.translations in place"""
+        self._dirty = True
+
+    def upload(self) -> None:
+        """writes the instance data to the GPU in one call, only if it changed"""
+        if self._dirty:
+            self.buffer.write(self.data[:self.count])
+            self._dirty = False
+
+    def render(self, program, mode=None) -> None:
+        """draws all instances with one draw call"""
+        if self.count == 0:
+            return
+        self.upload()
+        self.vao.render(program, mode=mode, instances=self.count)
+
+    def release(self) -> None:
+        self.vao.release()
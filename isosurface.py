@@ -0,0 +1,378 @@
+"""
+isosurfaces of 4D scalar fields (e.g. 3D + time volumes in .npy files): the grid is
+memory mapped and cut into chunks, every chunk is read on its own and its cells are
+split into 24 pentatopes (4-simplices, Kuhn triangulation) that are cut at the level
+by marching pentatopes, vectorized over the chunk. the isosurface of a 4D field is a
+3-manifold, made of tetrahedra (a tetrahedron or a prism of 3 tetrahedra per
+pentatope).
+
+    volume = open_volume("flow.npy") # memory mapped, (nx, ny, nz, nt)
+    for vertices, tetrahedra in extract(volume, level=0.5, chunk=(32, 32, 32, 8)):
+        ... # one chunk at a time, (m, 4) float32 and (k, 4) uint32
+    stream = IsosurfaceStream(volume, 0.5).start() # extracts in a background thread
+    stream.render(prog4d) # every frame: uploads the chunks finished so far and draws
+
+memory: a chunk reads (chunk + 1) samples per axis, the work arrays only hold the
+cells of the chunk the surface passes through, and the stream keeps at most `queued`
+finished chunks waiting for the upload. the volume itself stays in the page cache of
+the memory map. sample [i, j, k, l] is at origin + spacing * (i, j, k, l), the
+defaults fit the volume into the cube [-1, 1]^4 of the scene.
+
+neighbouring chunks compute the points on their common boundary twice (once each),
+the tetrahedra still match: the points are identified by global sample ids and
+prisms are split by the order of those ids (Dompierre et al.), the same way in
+every chunk.
+"""
+import argparse
+import itertools
+import queue
+import threading
+import time
+
+import numpy as np
+
+from moderngl_window.geometry import AttributeNames
+from moderngl_window.opengl.vao import VAO
+import moderngl
+
+# corners of a 4D grid cell as bit masks (bit i = +1 along axis i), 24 pentatopes:
+# the chains 0 -> +a -> +a+b -> +a+b+c -> all of every axis order
+PENTATOPES = np.array([[0] + list(itertools.accumulate(1 << axis for axis in order))
+                       for order in itertools.permutations(range(4))], dtype=np.int64)
+# corners of the 10 edges of a pentatope, lower corner (subset mask) first
+PENTATOPE_EDGES = np.array(list(itertools.combinations(range(5), 2)), dtype=np.int64)
+
+
+def _case_table():
+    """
+    crossing edges per case (bit i = corner i above the level): one corner apart ->
+    tetrahedron of its 4 edges, two against three -> prism, the triangle of the
+    first corner's edges then the matching edges of the second corner
+    """
+    edge_of = {pair: index for index, pair in enumerate(map(tuple, PENTATOPE_EDGES.tolist()))}
+
+    def edge(a, b):
+        return edge_of[(min(a, b), max(a, b))]
+
+    edges = np.zeros((32, 6), dtype=np.int64)
+    kinds = np.zeros(32, dtype=np.int64)  # 0 nothing, 1 tetrahedron, 2 prism
+    for case in range(32):
+        above = [corner for corner in range(5) if case >> corner & 1]
+        below = [corner for corner in range(5) if not case >> corner & 1]
+        small, large = (above, below) if len(above) < len(below) else (below, above)
+        if len(small) == 1:
+            edges[case, :4] = [edge(small[0], other) for other in large]
+            kinds[case] = 1
+        elif len(small) == 2:
+            edges[case] = [edge(small[0], other) for other in large] + [edge(small[1], other) for other in large]
+            kinds[case] = 2
+    return edges, kinds
+
+
+# (32, 6) crossing edges (PENTATOPE_EDGES) per case, (32,) kind of the piece
+CASE_EDGES, CASE_KINDS = _case_table()
+
+# prism 0 1 2 / 3 4 5 (i above i + 3): vertex order that moves vertex i to 0
+_PRISM_ROTATIONS = np.array([
+    [0, 1, 2, 3, 4, 5],
+    [1, 2, 0, 4, 5, 3],
+    [2, 0, 1, 5, 3, 4],
+    [3, 5, 4, 0, 2, 1],
+    [4, 3, 5, 1, 0, 2],
+    [5, 4, 3, 2, 1, 0],
+], dtype=np.int64)
+# the 2 splits of the rotated prism into 3 tetrahedra, chosen by the diagonal of face 1 2 5 4
+_PRISM_SPLITS = np.array([
+    [[0, 1, 2, 5], [0, 1, 5, 4], [0, 4, 5, 3]],
+    [[0, 1, 2, 4], [0, 4, 2, 5], [0, 4, 5, 3]],
+], dtype=np.int64)
+
+
+def open_volume(path):
+    """4D scalar field of a .npy file, memory mapped (read only)"""
+    volume = np.load(path, mmap_mode="r")
+    if volume.ndim != 4:
+        raise ValueError("{} holds a {}-dimensional array, expected a 4D volume".format(path, volume.ndim))
+    return volume
+
+
+def default_placement(shape):
+    """spacing and origin that center a grid of this shape in [-1, 1]^4"""
+    spacing = 2.0 / max(max(shape) - 1, 1)
+    origin = -spacing * (np.asarray(shape, dtype=np.float64) - 1) / 2.0
+    return spacing, origin
+
+
+def chunk_ranges(shape, chunk):
+    """first and last + 1 cell of every chunk along every axis, C order"""
+    cells = [max(size - 1, 0) for size in shape]
+    starts = [range(0, count, size) for count, size in zip(cells, chunk)]
+    for start in itertools.product(*starts):
+        yield tuple(start), tuple(min(first + size, count) for first, size, count in zip(start, chunk, cells))
+
+
+def _split_prisms(prisms):
+    """(n, 6) point ids of prisms -> (3 n, 4) tetrahedra, diagonals by the smallest ids"""
+    rows = np.arange(len(prisms))[:, None]
+    prisms = prisms[rows, _PRISM_ROTATIONS[prisms.argmin(axis=1)]]
+    split = np.minimum(prisms[:, 1], prisms[:, 5]) >= np.minimum(prisms[:, 2], prisms[:, 4])
+    return prisms[rows[:, :, None], _PRISM_SPLITS[split.astype(np.int64)]].reshape(-1, 4)
+
+
+def extract_chunk(volume, level, start, stop, spacing=None, origin=None):
+    """
+    isosurface of the cells start .. stop (exclusive) of the volume
+
+    Returns:
+        numpy.ndarray: vertices (m, 4) float32
+        numpy.ndarray: tetrahedra (k, 4) uint32
+    """
+    if spacing is None or origin is None:
+        spacing, origin = default_placement(volume.shape)
+    start = np.asarray(start, dtype=np.int64)
+    # cells start .. stop need the samples start .. stop inclusive
+    block = np.asarray(volume[tuple(slice(first, last + 1) for first, last in zip(start, stop))], dtype=np.float32)
+    cells = tuple(size - 1 for size in block.shape)
+    if min(cells) < 1:
+        return np.zeros((0, 4), dtype=np.float32), np.zeros((0, 4), dtype=np.uint32)
+
+    # cells with corners on both sides of the level, 16 shifted views of the block
+    above = block > level
+    any_above = np.zeros(cells, dtype=bool)
+    all_above = np.ones(cells, dtype=bool)
+    for corner in range(16):
+        view = above[tuple(slice(corner >> axis & 1, (corner >> axis & 1) + cells[axis]) for axis in range(4))]
+        any_above |= view
+        all_above &= view
+    active = np.argwhere(any_above & ~all_above)
+    if not len(active):
+        return np.zeros((0, 4), dtype=np.float32), np.zeros((0, 4), dtype=np.uint32)
+
+    # samples of the 5 corners of all pentatopes of the active cells
+    bits = (np.arange(16)[:, None] >> np.arange(4)) & 1  # (16, 4) corner offsets
+    block_strides = np.array([np.prod(block.shape[axis + 1:]) for axis in range(4)], dtype=np.int64)
+    values = block.ravel()[(active @ block_strides)[:, None] + bits @ block_strides]  # (c, 16)
+    corners = values[:, PENTATOPES]  # (c, 24, 5)
+    cases = ((corners > level) @ (1 << np.arange(5))).ravel()
+    kinds = CASE_KINDS[cases]
+    pieces = np.nonzero(kinds)[0]
+    cell, pentatope = np.divmod(pieces, 24)
+    kinds, cases = kinds[pieces], cases[pieces]
+
+    # crossing points: key = global id of the lower corner * 16 + the bits of the edge
+    edges = PENTATOPE_EDGES[CASE_EDGES[cases]]  # (p, 6, 2) pentatope corners
+    masks = PENTATOPES[pentatope[:, None, None], edges]  # (p, 6, 2) cell corners
+    volume_strides = np.array([np.prod(volume.shape[axis + 1:]) for axis in range(4)], dtype=np.int64)
+    cell_ids = (active[cell] + start) @ volume_strides
+    keys = (cell_ids[:, None] + bits[masks[..., 0]] @ volume_strides) * 16 + (masks[..., 1] ^ masks[..., 0])
+    # the tetrahedra only use the first 4 edges, their other 2 repeat the first one
+    keys[kinds == 1, 4:] = keys[kinds == 1, :1]
+    unique, first, inverse = np.unique(keys.ravel(), return_index=True, return_inverse=True)
+    points = inverse.reshape(-1, 6)
+
+    # interpolated position of every unique point
+    piece, slot = np.divmod(first, 6)
+    lower, upper = masks[piece, slot, 0], masks[piece, slot, 1]
+    v0 = values[cell[piece], lower]
+    v1 = values[cell[piece], upper]
+    t = ((level - v0) / (v1 - v0))[:, None]
+    coordinates = (active[cell[piece]] + start) + bits[lower] + t * (bits[upper] - bits[lower])
+    vertices = (origin + spacing * coordinates).astype(np.float32)
+
+    tetrahedra = np.concatenate([points[kinds == 1, :4], _split_prisms(points[kinds == 2])])
+    return vertices, tetrahedra.astype(np.uint32)
+
+
+def extract(volume, level, chunk=(16, 16, 16, 16), spacing=None, origin=None):
+    """isosurface chunk by chunk, yields (vertices, tetrahedra) of every chunk the surface passes through"""
+    if spacing is None or origin is None:
+        spacing, origin = default_placement(volume.shape)
+    for start, stop in chunk_ranges(volume.shape, chunk):
+        vertices, tetrahedra = extract_chunk(volume, level, start, stop, spacing, origin)
+        if len(tetrahedra):
+            yield vertices, tetrahedra
+
+
+def tetrahedra_indices(tetrahedra, mode=moderngl.LINES):
+    """unique edges (LINES) or triangles (TRIANGLES) of tetrahedra, for drawing"""
+    tetrahedra = np.asarray(tetrahedra)
+    if mode == moderngl.TRIANGLES:
+        parts = tetrahedra[:, [[0, 1, 2], [0, 1, 3], [0, 2, 3], [1, 2, 3]]].reshape(-1, 3)
+    elif mode == moderngl.LINES:
+        parts = tetrahedra[:, [[0, 1], [0, 2], [0, 3], [1, 2], [1, 3], [2, 3]]].reshape(-1, 2)
+    else:
+        raise ValueError("tetrahedra are drawn as LINES or TRIANGLES, got mode {}".format(mode))
+    return np.unique(np.sort(parts, axis=1), axis=0).astype(np.uint32)
+
+
+class IsosurfaceStream:
+    """
+    isosurface extracted in a background thread and drawn as it grows: finished
+    chunks wait in a queue of at most `queued` entries (the thread blocks when it is
+    full) and are appended to the GPU buffers by upload(), from the thread that owns
+    the OpenGL context. the buffers double when they are full
+    """
+
+    def __init__(self, volume, level, chunk=(16, 16, 16, 16), spacing=None, origin=None, mode=moderngl.LINES,
+                 queued=4, capacity=1 << 16, name=None, attr_names=AttributeNames):
+        """
+        Args:
+            volume: 4D array (e.g. open_volume) or path of a .npy file
+            level (float): value of the isosurface
+        Keyword Args:
+            chunk: cells per chunk along every axis
+            mode: LINES (edges of the tetrahedra) or TRIANGLES (their faces)
+            queued (int): maximum number of finished chunks waiting for the upload
+            capacity (int): initial size of the buffers in vertices and indices
+        """
+        self.volume = open_volume(volume) if isinstance(volume, str) else volume
+        self.level = level
+        self.chunk = tuple(chunk)
+        if spacing is None or origin is None:
+            spacing, origin = default_placement(self.volume.shape)
+        self.spacing = spacing
+        self.origin = origin
+        self.mode = mode
+        self.name = name or "geometry:isosurface"
+        self.attr_names = attr_names
+        self.chunks = len(list(chunk_ranges(self.volume.shape, self.chunk)))
+        self.chunks_done = 0
+        self.vertex_count = 0
+        self.index_count = 0
+        self._capacity = (0, 0)
+        self.vao = None
+        self._initial_capacity = capacity
+        self._queue = queue.Queue(maxsize=queued)
+        self._stop = threading.Event()
+        self._thread = None
+        self._done = False
+        self._error = None
+
+    def start(self) -> "IsosurfaceStream":
+        """starts the extraction thread"""
+        self._thread = threading.Thread(target=self._work, name="isosurface", daemon=True)
+        self._thread.start()
+        return self
+
+    def _put(self, item) -> bool:
+        # blocks while the queue is full, gives up when stopped
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _work(self) -> None:
+        try:
+            for start, stop in chunk_ranges(self.volume.shape, self.chunk):
+                if self._stop.is_set():
+                    return
+                vertices, tetrahedra = extract_chunk(self.volume, self.level, start, stop, self.spacing, self.origin)
+                indices = tetrahedra_indices(tetrahedra, self.mode) if len(tetrahedra) else None
+                if not self._put((vertices, indices)):
+                    return
+        except Exception as error:
+            self._error = error
+        self._put(None)
+
+    @property
+    def finished(self) -> bool:
+        """True when all chunks are extracted and uploaded"""
+        return self._done
+
+    def _reserve(self, vertices, indices) -> None:
+        """grows the buffers (copying the contents) to hold this many vertices and indices"""
+        vertex_capacity, index_capacity = self._capacity
+        if vertices <= vertex_capacity and indices <= index_capacity:
+            return
+        vertex_capacity = max(vertex_capacity * 2, vertices, self._initial_capacity)
+        index_capacity = max(index_capacity * 2, indices, self._initial_capacity)
+        vao = VAO(self.name, mode=self.mode)
+        vertex_buffer = vao.ctx.buffer(reserve=vertex_capacity * 16, dynamic=True)
+        index_buffer = vao.ctx.buffer(reserve=index_capacity * 4, dynamic=True)
+        if self.vao is not None:
+            vao.ctx.copy_buffer(vertex_buffer, self._vertex_buffer, self.vertex_count * 16)
+            vao.ctx.copy_buffer(index_buffer, self._index_buffer, self.index_count * 4)
+            self.vao.release()
+        vao.buffer(vertex_buffer, "4f", [self.attr_names.POSITION])
+        vao.index_buffer(index_buffer, index_element_size=4)
+        self.vao = vao
+        self._vertex_buffer = vertex_buffer
+        self._index_buffer = index_buffer
+        self._capacity = (vertex_capacity, index_capacity)
+
+    def upload(self, max_chunks=None) -> int:
+        """
+        appends the finished chunks to the GPU buffers (OpenGL thread only)
+
+        Keyword Args:
+            max_chunks (int): upload at most this many chunks (frame time budget)
+        Returns:
+            int: number of chunks taken from the queue
+        """
+        count = 0
+        while max_chunks is None or count < max_chunks:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._done = True
+                if self._error is not None:
+                    raise self._error
+                break
+            count += 1
+            self.chunks_done += 1
+            vertices, indices = item
+            if indices is None:
+                continue
+            self._reserve(self.vertex_count + len(vertices), self.index_count + indices.size)
+            self._vertex_buffer.write(vertices, offset=self.vertex_count * 16)
+            self._index_buffer.write(indices + np.uint32(self.vertex_count), offset=self.index_count * 4)
+            self.vertex_count += len(vertices)
+            self.index_count += indices.size
+        return count
+
+    def render(self, program, max_chunks=None) -> None:
+        """uploads the finished chunks and draws everything uploaded so far"""
+        self.upload(max_chunks)
+        if self.index_count:
+            self.vao.render(program, vertices=self.index_count)
+
+    def stop(self) -> None:
+        """stops the extraction thread (the chunks uploaded so far stay)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def release(self) -> None:
+        self.stop()
+        if self.vao is not None:
+            self.vao.release()
+            self.vao = None
+
+
+if __name__ == "__main__":
+    import tracemalloc
+
+    parser = argparse.ArgumentParser(description="extract the isosurface of a 4D .npy volume chunk by chunk")
+    parser.add_argument("volume", help=".npy file with a 4D array")
+    parser.add_argument("--level", type=float, required=True, help="value of the isosurface")
+    parser.add_argument("--chunk", type=int, nargs=4, default=(16, 16, 16, 16), help="cells per chunk")
+    args = parser.parse_args()
+
+    volume = open_volume(args.volume)
+    tracemalloc.start()
+    start = time.perf_counter()
+    vertices = tetrahedra = chunks = 0
+    for chunk_vertices, chunk_tetrahedra in extract(volume, args.level, args.chunk):
+        vertices += len(chunk_vertices)
+        tetrahedra += len(chunk_tetrahedra)
+        chunks += 1
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    print("{} {} volume, {} chunks with surface, {} vertices, {} tetrahedra".format(
+        volume.shape, volume.dtype, chunks, vertices, tetrahedra))
+    print("{:.2f} s, {:.1f} MB peak (numpy allocations)".format(seconds, peak / 2 ** 20))
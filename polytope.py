@@ -0,0 +1,388 @@
+"""
+uniform polytopes by Wythoff construction: the vertices are the orbit of one point
+under the reflection group of a Coxeter–Dynkin diagram, the edges connect vertices
+at edge length (found with a grid hash, O(n log n)). the 2-faces are the orbits of
+the polygons the seed spans under pairs of mirrors.
+
+    vertices, edges = regular_polytope_geometry("120-cell") # 600 vertices, 1200 edges
+    vao = polytope("x5o3o3o") # 120-cell as indexed LINES VAO, like cube.hypercube
+    vao = polytope("x5o3o3o", mode=moderngl.TRIANGLES) # its 720 pentagons, triangulated
+    vao = polytope(schlafli=(3, 4, 3), rings=(0, 1, 0, 0)) # rectified 24-cell
+    vao = duoprism(5, 7)
+
+diagrams are linear: Schläfli symbol {p, q, r} and the ringed nodes (Wythoff seed on
+the mirrors of the unringed ones), or the compact notation with x = ringed node,
+o = node and the branch orders between them, e.g. "x4o3o3o" (tesseract),
+"o3x3o3o" (rectified 5-cell), a space separates unconnected parts: "x5o x3o"
+(5-3 duoprism)
+
+the topology (vertices at unit circumradius, edges, faces) is built once per diagram
+and cached, radius and center only scale and move a copy of the vertices.
+"""
+import itertools
+from functools import lru_cache
+
+import numpy as np
+
+from moderngl_window.geometry import AttributeNames
+import moderngl
+
+from cube import indexed_vao, triangulate
+
+# name -> Schläfli symbol of the regular 4-polytopes
+REGULAR_POLYTOPES = {
+    "5-cell": (3, 3, 3),
+    "tesseract": (4, 3, 3),
+    "16-cell": (3, 3, 4),
+    "24-cell": (3, 4, 3),
+    "120-cell": (5, 3, 3),
+    "600-cell": (3, 3, 5),
+}
+
+# coordinates closer than this (relative to the circumradius) are the same vertex
+_RESOLUTION = 1e-6
+
+
+def coxeter_matrix(schlafli):
+    """Coxeter matrix of a linear diagram: branch orders schlafli between neighbouring nodes
+    (2 = unconnected), 2 between all other nodes"""
+    rank = len(schlafli) + 1
+    matrix = np.full((rank, rank), 2, dtype=np.int64)
+    np.fill_diagonal(matrix, 1)
+    for i, order in enumerate(schlafli):
+        matrix[i, i + 1] = matrix[i + 1, i] = order
+    return matrix
+
+
+def parse_dynkin(diagram):
+    """
+    Schläfli symbol and rings of a linear diagram in compact notation,
+    e.g. "x4o3o3o" -> ((4, 3, 3), (1, 0, 0, 0)), "x5o x3o" -> ((5, 2, 3), (1, 0, 1, 0))
+    """
+    nodes = []
+    orders = []
+    order = ""
+    for char in diagram.strip():
+        if char in "xo":
+            if nodes:
+                if not order:
+                    raise ValueError("missing branch order before node {} of {!r}".format(len(nodes), diagram))
+                orders.append(int(order))
+            nodes.append(1 if char == "x" else 0)
+            order = ""
+        elif char.isdigit():
+            order += char
+        elif char.isspace():
+            order = "2"
+        else:
+            raise ValueError("unexpected {!r} in diagram {!r}".format(char, diagram))
+    if order or not nodes:
+        raise ValueError("diagram {!r} has to start and end with a node".format(diagram))
+    return tuple(orders), tuple(nodes)
+
+
+def mirrors(coxeter):
+    """
+    unit normals (rows) of the mirrors of a finite reflection group with the given
+    Coxeter matrix: the angle between mirror i and j is pi / coxeter[i, j]
+    """
+    coxeter = np.asarray(coxeter, dtype=np.float64)
+    gram = -np.cos(np.pi / coxeter)
+    try:
+        return np.linalg.cholesky(gram)
+    except np.linalg.LinAlgError:
+        raise ValueError("Coxeter matrix of an infinite group:\n{}".format(coxeter)) from None
+
+
+def _keys(points, scale):
+    """integer grid coordinates of the points, equal for points closer than the resolution"""
+    return np.round(points * scale).astype(np.int64)
+
+
+def _orbit(items, normals, scale):
+    """
+    orbit of the items (n, k, dim) (points, polygons, ...) under the group generated
+    by the reflections in the mirrors (rows of normals). items are the same if their
+    centroids are. all items of the frontier are reflected in all mirrors at once,
+    new ones become the next frontier, until nothing new is found
+
+    Returns:
+        numpy.ndarray: (m, k, dim) float64, the given items first
+    """
+    items = np.asarray(items, dtype=np.float64)
+    keys = _keys(items.mean(axis=1), scale)
+    _, first = np.unique(keys, axis=0, return_index=True)
+    items = items[np.sort(first)]
+    keys = keys[np.sort(first)]
+    frontier = items
+    while len(frontier):
+        # (f, m, k, dim): reflection of every frontier item in every mirror
+        images = frontier[:, None] - 2.0 * (frontier @ normals.T).transpose(0, 2, 1)[..., None] * normals[None, :, None]
+        images = images.reshape((-1,) + items.shape[1:])
+        _, first = np.unique(np.concatenate([keys, _keys(images.mean(axis=1), scale)]), axis=0, return_index=True)
+        new = np.sort(first[first >= len(items)]) - len(items)
+        frontier = images[new]
+        items = np.concatenate([items, frontier])
+        keys = np.concatenate([keys, _keys(frontier.mean(axis=1), scale)])
+    return items
+
+
+def wythoff_orbit(normals, seed, radius=1.0):
+    """
+    orbit of the seed point under the group generated by the reflections in the
+    mirrors (rows of normals), scaled to the circumradius
+
+    Returns:
+        numpy.ndarray: (n, dim) float64 vertices, seed first
+    """
+    seed = np.asarray(seed, dtype=np.float64)
+    seed = seed * (radius / np.linalg.norm(seed))
+    return _orbit(seed[None, None], normals, 1.0 / (radius * _RESOLUTION))[:, 0]
+
+
+def neighbour_edges(vertices, length, tolerance=1e-4):
+    """
+    pairs of vertices at distance length (within tolerance * length) with a grid
+    hash: vertices are sorted by their cell of edge length size, every vertex is
+    compared with the vertices of the 3^dim cells around it only
+
+    Returns:
+        numpy.ndarray: (m, 2) uint32 vertex indices, lower index first
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    count, dim = vertices.shape
+    cells = np.floor(vertices / length).astype(np.int64)
+    cells -= cells.min(axis=0) - 1
+    # mixed radix cell id, one more cell on each side for the neighbour offsets
+    radix = np.cumprod(np.concatenate([[1], cells.max(axis=0)[:-1] + 2]))
+    ids = cells @ radix
+    order = np.argsort(ids, kind="stable")
+    sorted_ids = ids[order]
+
+    pairs = []
+    for offset in itertools.product((-1, 0, 1), repeat=dim):
+        target = ids + np.asarray(offset) @ radix
+        start = np.searchsorted(sorted_ids, target, side="left")
+        counts = np.searchsorted(sorted_ids, target, side="right") - start
+        total = counts.sum()
+        if total == 0:
+            continue
+        # all (vertex, candidate) pairs of the ranges at once
+        first = np.repeat(np.arange(count), counts)
+        ends = np.cumsum(counts)
+        within = np.arange(total) - np.repeat(ends - counts, counts)
+        second = order[np.repeat(start, counts) + within]
+        keep = first < second
+        first, second = first[keep], second[keep]
+        distance = np.linalg.norm(vertices[first] - vertices[second], axis=1)
+        keep = np.abs(distance - length) <= tolerance * length
+        pairs.append(np.stack([first[keep], second[keep]], axis=1))
+    edges = np.concatenate(pairs) if pairs else np.zeros((0, 2), dtype=np.int64)
+    # sorted by first, then second vertex
+    edges = edges[np.lexsort((edges[:, 1], edges[:, 0]))]
+    return edges.astype(np.uint32)
+
+
+def _diagram(diagram=None, schlafli=None, rings=None, coxeter=None):
+    """Coxeter matrix and rings of the arguments of polytope_geometry as hashable tuples"""
+    if diagram is not None:
+        schlafli, rings = parse_dynkin(diagram)
+    if coxeter is None:
+        if schlafli is None:
+            raise ValueError("a polytope needs a diagram, a Schläfli symbol or a Coxeter matrix")
+        coxeter = coxeter_matrix(schlafli)
+    coxeter = np.asarray(coxeter)
+    rank = len(coxeter)
+    if rings is None:
+        rings = (1,) + (0,) * (rank - 1)
+    rings = tuple(int(bool(ring)) for ring in rings)
+    if len(rings) != rank or not any(rings):
+        raise ValueError("rings {} do not fit {} nodes".format(rings, rank))
+    return tuple(map(tuple, coxeter.tolist())), rings
+
+
+@lru_cache(maxsize=32)
+def _topology(coxeter, rings):
+    """
+    vertices at circumradius 1 and edges of the diagram (see _diagram), read-only
+
+    Returns:
+        numpy.ndarray: mirror normals (rank, dim) float64
+        numpy.ndarray: vertices (n, dim) float64
+        numpy.ndarray: edges (m, 2) uint32
+    """
+    normals = mirrors(coxeter)
+    # seed at distance 1 from the mirrors of the ringed nodes, on the others
+    seed = np.linalg.solve(normals, np.asarray(rings, dtype=np.float64))
+    vertices = wythoff_orbit(normals, seed)
+    # vertex transitive: the nearest neighbour of one vertex is at edge length
+    length = np.sqrt(np.sum((vertices[1:] - vertices[0]) ** 2, axis=1)).min()
+    edges = neighbour_edges(vertices, length)
+    for array in (normals, vertices, edges):
+        array.flags.writeable = False
+    return normals, vertices, edges
+
+
+def _generating_polygons(coxeter, rings, normals, seed):
+    """
+    one polygon per pair of nodes i, j whose parts all have a ring: the orbit of the
+    seed under the mirrors i and j (a 2m-gon, an m-gon if only one of them is ringed,
+    a square for unconnected nodes), corners in cyclic order
+
+    Returns:
+        list of (k, dim) float64 arrays
+    """
+    polygons = []
+    for i, j in itertools.combinations(range(len(rings)), 2):
+        if coxeter[i][j] > 2 and not (rings[i] or rings[j]):
+            continue
+        if coxeter[i][j] == 2 and not (rings[i] and rings[j]):
+            continue
+        corners = wythoff_orbit(normals[[i, j]], seed, np.linalg.norm(seed))
+        # sort by the angle around the center in the plane of the polygon
+        offsets = corners - corners.mean(axis=0)
+        _, _, basis = np.linalg.svd(offsets)
+        angles = np.arctan2(offsets @ basis[1], offsets @ basis[0])
+        polygons.append(corners[np.argsort(angles)])
+    return polygons
+
+
+@lru_cache(maxsize=32)
+def _faces(coxeter, rings):
+    """
+    2-faces of the diagram (see _diagram) as vertex indices of _topology, read-only
+
+    Returns:
+        list of (f, k) uint32 arrays, one per polygon size k (ascending)
+    """
+    normals, vertices, _ = _topology(coxeter, rings)
+    scale = 1.0 / _RESOLUTION
+    faces = {}
+    for polygon in _generating_polygons(coxeter, rings, normals, vertices[0]):
+        orbit = _orbit(polygon[None], normals, scale)
+        # vertex index of every corner: the unique keys of vertices and corners together
+        _, inverse = np.unique(np.concatenate([_keys(vertices, scale), _keys(orbit.reshape(-1, orbit.shape[2]), scale)]),
+                               axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        lookup = np.zeros(inverse.max() + 1, dtype=np.uint32)
+        lookup[inverse[:len(vertices)]] = np.arange(len(vertices), dtype=np.uint32)
+        faces.setdefault(len(polygon), []).append(lookup[inverse[len(vertices):]].reshape(len(orbit), -1))
+    result = []
+    for corners in sorted(faces):
+        array = np.concatenate(faces[corners])
+        array.flags.writeable = False
+        result.append(array)
+    return result
+
+
+def _placed(vertices, radius, center):
+    """vertices at unit circumradius scaled to radius and moved to center, float32"""
+    vertices = vertices * radius
+    if center is not None:
+        vertices = vertices + np.asarray(center, dtype=np.float64)
+    return vertices.astype(np.float32)
+
+
+def polytope_geometry(diagram=None, schlafli=None, rings=None, coxeter=None, radius=1.0, center=None):
+    """Vertices and edges of a uniform polytope
+
+    Keyword Args:
+        diagram (str): compact Coxeter–Dynkin notation, e.g. "x3o3o5o"
+        schlafli: branch orders of a linear diagram, e.g. (5, 3, 3)
+        rings: ringed nodes (1/0 per node), default first node only (regular polytope)
+        coxeter: Coxeter matrix instead of schlafli (any diagram, e.g. branched)
+        radius (float): circumradius
+        center: center (dim-component tuple), default origin
+    Returns:
+        numpy.ndarray: vertices (n, dim) float32
+        numpy.ndarray: edges (m, 2) uint32 vertex indices, read-only
+    """
+    _, vertices, edges = _topology(*_diagram(diagram, schlafli, rings, coxeter))
+    return _placed(vertices, radius, center), edges
+
+
+def polytope_faces(diagram=None, schlafli=None, rings=None, coxeter=None, radius=1.0, center=None):
+    """Vertices and 2-faces of a uniform polytope (arguments as polytope_geometry)
+
+    Returns:
+        numpy.ndarray: vertices (n, dim) float32
+        list: (f, k) uint32 vertex indices of the k-gons, corners in cyclic order,
+            one read-only array per polygon size (ascending)
+    """
+    key = _diagram(diagram, schlafli, rings, coxeter)
+    _, vertices, _ = _topology(*key)
+    return _placed(vertices, radius, center), _faces(*key)
+
+
+def polytope_mesh_geometry(diagram=None, schlafli=None, rings=None, coxeter=None, radius=1.0, center=None):
+    """Vertices and triangulated 2-faces of a uniform polytope (arguments as polytope_geometry)
+
+    Returns:
+        numpy.ndarray: vertices (n, dim) float32
+        numpy.ndarray: triangles (t, 3) uint32 vertex indices
+        numpy.ndarray: face ids (t,) uint32, index of the face of every triangle,
+            numbered through the arrays of polytope_faces in order
+    """
+    vertices, faces = polytope_faces(diagram, schlafli, rings, coxeter, radius, center)
+    triangles, face_ids = triangulate(faces)
+    return vertices, triangles, face_ids
+
+
+def regular_polytope_geometry(name, radius=1.0, center=None):
+    """vertices and edges of a regular 4-polytope of REGULAR_POLYTOPES, e.g. "24-cell" """
+    if name not in REGULAR_POLYTOPES:
+        raise ValueError("unknown regular polytope {!r}, expected one of {}".format(name, ", ".join(REGULAR_POLYTOPES)))
+    return polytope_geometry(schlafli=REGULAR_POLYTOPES[name], radius=radius, center=center)
+
+
+def duoprism_geometry(p, q, radius=1.0, center=None):
+    """vertices and edges of the p-q duoprism (product of a p-gon and a q-gon)"""
+    return polytope_geometry(schlafli=(p, 2, q), rings=(1, 0, 1, 0), radius=radius, center=center)
+
+
+def _vao(key, radius, center, name, attr_names, mode):
+    """indexed VAO of the edges (LINES) or the triangulated faces (TRIANGLES) of a diagram"""
+    if mode == moderngl.TRIANGLES:
+        _, vertices, _ = _topology(*key)
+        indices, _ = triangulate(_faces(*key))
+    else:
+        _, vertices, indices = _topology(*key)
+    return indexed_vao(_placed(vertices, radius, center), indices, name, attr_names=attr_names, mode=mode)
+
+
+def polytope(
+    diagram=None,
+    schlafli=None,
+    rings=None,
+    coxeter=None,
+    radius=1.0,
+    center=None,
+    name=None,
+    attr_names=AttributeNames,
+    mode=moderngl.LINES,
+):
+    """Creates an indexed VAO of a uniform polytope (see polytope_geometry)
+
+    Keyword Args:
+        mode: LINES for the wireframe, TRIANGLES for the 2-faces
+    Returns:
+        A :py:class:`moderngl_window.opengl.vao.VAO` instance
+    """
+    key = _diagram(diagram, schlafli, rings, coxeter)
+    if name is None:
+        name = "geometry:polytope:{}".format(diagram or "{}-{}".format(
+            tuple(schlafli) if schlafli is not None else "coxeter", tuple(rings) if rings is not None else "regular"))
+    return _vao(key, radius, center, name, attr_names, mode)
+
+
+def regular_polytope(name="24-cell", radius=1.0, center=None, attr_names=AttributeNames, mode=moderngl.LINES):
+    """indexed VAO (wireframe or faces) of a regular 4-polytope of REGULAR_POLYTOPES"""
+    if name not in REGULAR_POLYTOPES:
+        raise ValueError("unknown regular polytope {!r}, expected one of {}".format(name, ", ".join(REGULAR_POLYTOPES)))
+    return _vao(_diagram(schlafli=REGULAR_POLYTOPES[name]), radius, center, "geometry:{}".format(name), attr_names, mode)
+
+
+def duoprism(p=3, q=4, radius=1.0, center=None, attr_names=AttributeNames, mode=moderngl.LINES):
+    """indexed VAO (wireframe or faces) of the p-q duoprism"""
+    return _vao(_diagram(schlafli=(p, 2, q), rings=(1, 0, 1, 0)), radius, center,
+                "geometry:{}-{}-duoprism".format(p, q), attr_names, mode)
@@ -0,0 +1,211 @@
+"""
+per stage frame timing: cpu time of each stage is measured with a monotonic
+clock (time.perf_counter_ns), gpu time with moderngl timer queries. the last
+`capacity` frames are kept in ring buffers for rolling percentiles, shown in an
+optional overlay and dumped to csv/json.
+
+    profiler = FrameProfiler()
+    with profiler.stage("camera"):
+        ...
+    with profiler.gpu("draw", ctx):
+        vao.render(prog)
+    profiler.end_frame()
+    profiler.stats() # {"camera": {"p50": ..., "p95": ..., "p99": ...}, ...} in ms
+
+"""
+import csv
+import json
+from time import perf_counter_ns
+
+import numpy as np
+
+
+class _NullStage:
+    """does nothing, used when profiling is disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """cpu timer of one stage, times of all uses within a frame are summed up"""
+    __slots__ = ("total", "_start")
+
+    def __init__(self):
+        self.total = 0
+        self._start = 0
+
+    def __enter__(self):
+        self._start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.total += perf_counter_ns() - self._start
+        return False
+
+
+class _GpuStage:
+    """
+    gpu timer of one stage. two queries are used alternately, the result of the
+    previous frame is read at the end of the current one so reading does not stall
+    """
+    __slots__ = ("queries", "used", "total", "frame")
+
+    def __init__(self, ctx):
+        self.queries = [ctx.query(time=True), ctx.query(time=True)]
+        self.used = [False, False]
+        self.total = 0
+        self.frame = 0
+
+    def __enter__(self):
+        self.queries[self.frame].__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self.queries[self.frame].__exit__(*exc)
+        self.used[self.frame] = True
+        return False
+
+    def collect(self) -> int:
+        """elapsed ns of the previous frame, switches to the other query"""
+        previous = 1 - self.frame
+        elapsed = self.queries[previous].elapsed if self.used[previous] else 0
+        self.used[previous] = False
+        self.frame = previous
+        return elapsed
+
+
+class FrameProfiler:
+    """
+    rolling per stage timings of the last `capacity` frames.
+    cpu stages are named as given, gpu stages get a "gpu:" prefix,
+    "total" is the time between two end_frame calls
+    """
+
+    def __init__(self, capacity=600, enabled=True):
+        self.capacity = capacity
+        self.enabled = enabled
+        self.frames = 0
+        self._stages = {}
+        self._gpu = {}
+        self._history = {}  # name -> ring buffer of ms
+        self._frame_start = perf_counter_ns()
+
+    def stage(self, name):
+        """context manager timing the cpu part of a stage"""
+        if not self.enabled:
+            return _NULL_STAGE
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages[name] = _Stage()
+        return stage
+
+    def gpu(self, name, ctx):
+        """context manager timing the gpu work of a stage with a timer query"""
+        if not self.enabled:
+            return _NULL_STAGE
+        stage = self._gpu.get(name)
+        if stage is None:
+            stage = self._gpu[name] = _GpuStage(ctx)
+        return stage
+
+    def end_frame(self) -> None:
+        """stores the times of the finished frame and starts the next one"""
+        if not self.enabled:
+            return
+        now = perf_counter_ns()
+        index = self.frames % self.capacity
+        self._record("total", index, now - self._frame_start)
+        self._frame_start = now
+        for name, stage in self._stages.items():
+            self._record(name, index, stage.total)
+            stage.total = 0
+        for name, stage in self._gpu.items():
+            self._record("gpu:" + name, index, stage.collect())
+        self.frames += 1
+
+    def _record(self, name, index, ns) -> None:
+        history = self._history.get(name)
+        if history is None:
+            # nan for frames before the stage was first used
+            history = self._history[name] = np.full(self.capacity, np.nan)
+        history[index] = ns * 1e-6
+
+    def history(self, name) -> np.ndarray:
+        """times (ms) of a stage for the recorded frames, oldest first"""
+        history = self._history[name]
+        if self.frames < self.capacity:
+            return history[:self.frames]
+        return np.roll(history, -(self.frames % self.capacity))
+
+    def stats(self) -> dict:
+        """rolling p50, p95, p99 and mean (ms) of every stage"""
+        result = {}
+        for name in self._history:
+            values = self.history(name)
+            values = values[~np.isnan(values)]
+            if len(values) == 0:
+                continue
+            p50, p95, p99 = np.percentile(values, (50, 95, 99))
+            result[name] = {"p50": p50, "p95": p95, "p99": p99, "mean": values.mean(), "frames": len(values)}
+        return result
+
+    def summary(self) -> list:
+        """one line of text per stage for the overlay"""
+        return ["{:<14} p50 {:6.2f}  p95 {:6.2f}  p99 {:6.2f} ms".format(name, s["p50"], s["p95"], s["p99"])
+                for name, s in self.stats().items()]
+
+    def to_csv(self, path) -> None:
+        """one row per recorded frame, one column (ms) per stage"""
+        names = list(self._history)
+        columns = [self.history(name) for name in names]
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + names)
+            first = self.frames - len(columns[0]) if columns else 0
+            for row, values in enumerate(zip(*columns)):
+                writer.writerow([first + row] + ["" if np.isnan(v) else "{:.4f}".format(v) for v in values])
+
+    def to_json(self, path) -> None:
+        """rolling statistics of all stages"""
+        with open(path, "w") as f:
+            json.dump({"frames": self.frames, "stages": self.stats()}, f, indent=2)
+
+
+class ProfilerOverlay:
+    """draws the rolling percentiles of a FrameProfiler in the top left corner"""
+
+    def __init__(self, profiler, size=14.0, interval=30):
+        """
+        Keyword Args:
+            size (float): character height in pixels
+            interval (int): frames between updates of the text
+        """
+        # needs the moderngl_window resources (font), only imported when used
+        from moderngl_window.text.bitmapped import TextWriter2D
+
+        self.profiler = profiler
+        self.size = size
+        self.interval = interval
+        self._lines = []
+        self._writers = []
+        self._text_writer = TextWriter2D
+
+    def draw(self, ctx) -> None:
+        if self.profiler.frames % self.interval == 0 or not self._lines:
+            self._lines = self.profiler.summary()
+        while len(self._writers) < len(self._lines):
+            self._writers.append(self._text_writer())
+        height = ctx.fbo.viewport[3]
+        ctx.enable_only(ctx.BLEND)
+        for row, (writer, line) in enumerate(zip(self._writers, self._lines)):
+            if writer.text != line:
+                writer.text = line
+            writer.draw((self.size, height - (row + 1.5) * self.size), size=self.size)
@@ -0,0 +1,137 @@
+"""
+cache for geometry VAOs so that identical primitives (same generator and
+same arguments) share one set of GPU buffers
+
+    registry = GeometryRegistry()
+    a = registry.acquire(hypercube, size=(0.5, 0.5, 0.5, 0.5), mode=moderngl.LINES)
+    b = registry.acquire(hypercube, size=(0.5, 0.5, 0.5, 0.5), mode=moderngl.LINES)
+    assert a is b
+    registry.release(a)
+
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+
+def _freeze(value):
+    """turns lists/arrays (size, center, ...) into hashable tuples"""
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def vao_nbytes(vao) -> int:
+    """bytes of GPU memory held by the buffers of a VAO (vertex + index buffers)
+
+    the only place that reads private attributes of moderngl_window: VAO keeps its
+    buffers in _buffers (BufferInfo list) and _index_buffer, with no public accessor
+    (moderngl-window 2.x and 3.x). this is version dependent, a VAO without them
+    raises instead of being counted with 0 bytes
+    """
+    try:
+        buffers, index_buffer = vao._buffers, vao._index_buffer
+    except AttributeError:
+        raise RuntimeError("this moderngl_window version does not expose the VAO buffers, "
+                           "GeometryRegistry can not count GPU memory") from None
+    nbytes = sum(info.buffer.size for info in buffers)
+    if index_buffer is not None:
+        nbytes += index_buffer.size
+    return nbytes
+
+
+class _Entry:
+    __slots__ = ("vao", "refs", "nbytes")
+
+    def __init__(self, vao, nbytes):
+        self.vao = vao
+        self.refs = 0
+        self.nbytes = nbytes
+
+
+class GeometryRegistry:
+    """
+    reference counted LRU cache of VAOs keyed by (generator, arguments).
+    entries nobody holds anymore stay cached until they are evicted, either
+    because more than max_entries are cached or because the cache holds more
+    than max_bytes. entries in use are never evicted.
+    """
+
+    def __init__(self, max_entries=64, max_bytes=None):
+        """
+        Keyword Args:
+            max_entries (int): maximum number of cached VAOs
+            max_bytes (int): maximum GPU memory of all cached VAOs, None = unlimited
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> _Entry, least recently used first
+        self._keys = {}  # id(vao) -> key
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(generator, **kwargs):
+        """cache key, e.g. (hypercube, (("center", (0, 0, 0, 0)), ("mode", 1), ("size", (2, 2, 2, 2))))"""
+        return (generator, tuple(sorted((name, _freeze(value)) for name, value in kwargs.items())))
+
+    def acquire(self, generator, **kwargs):
+        """returns the shared VAO for generator(**kwargs), creating it on first use.
+        every acquire has to be paired with a release"""
+        key = self.key(generator, **kwargs)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            vao = generator(**kwargs)
+            entry = _Entry(vao, vao_nbytes(vao))
+            self._entries[key] = entry
+            self._keys[id(vao)] = key
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        entry.refs += 1
+        self._evict()
+        return entry.vao
+
+    def release(self, vao) -> None:
+        """gives back a VAO obtained with acquire"""
+        entry = self._entries[self._keys[id(vao)]]
+        if entry.refs <= 0:
+            raise ValueError("VAO {} released more often than acquired".format(vao.name))
+        entry.refs -= 1
+        self._evict()
+
+    def refcount(self, vao) -> int:
+        return self._entries[self._keys[id(vao)]].refs
+
+    @property
+    def nbytes(self) -> int:
+        """GPU memory held by all cached VAOs"""
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self) -> None:
+        """drop unused entries, least recently used first, until the limits hold"""
+        def over_limit():
+            if len(self._entries) > self.max_entries:
+                return True
+            return self.max_bytes is not None and self.nbytes > self.max_bytes
+
+        for key in [key for key, entry in self._entries.items() if entry.refs == 0]:
+            if not over_limit():
+                break
+            self._drop(key)
+
+    def _drop(self, key) -> None:
+        entry = self._entries.pop(key)
+        del self._keys[id(entry.vao)]
+        entry.vao.release()
+
+    def clear(self) -> None:
+        """releases all cached VAOs, also the ones still in use"""
+        for key in list(self._entries):
+            self._drop(key)
@@ -0,0 +1,317 @@
+"""
+recording and deterministic replay of the window input (keys, mouse) for
+reproducible benchmarks.
+
+the recorder logs every input event and every frame with its timestamp to a
+compact binary file. the replay feeds the events back through the same entry
+points of CameraWindow (key_event, mouse_*_event) while the cameras read a
+virtual clock that returns the recorded timestamps, so a replay navigates exactly
+like the recorded session, independent of the frame rate of the machine.
+
+    python main.py --record session.rec # record while navigating
+    python main.py --replay session.rec # replay in a window
+    python replay.py session.rec --profile # replay headless, print frame statistics
+
+file format (little endian):
+    header: magic b"CG4DREC\\0", version (u4), window width, height (u4),
+            length of the key name table (u4), key names (utf-8, "\\n" separated)
+    events: EVENT_DTYPE records (33 bytes) until the end of the file, keys are
+            stored as index into the name table so the file works with every
+            window backend
+"""
+import argparse
+import struct
+import time
+
+import numpy as np
+from moderngl_window.context.base.keys import BaseKeys, KeyModifiers
+
+MAGIC = b"CG4DREC\0"
+VERSION = 1
+
+# event types
+KEY = 0
+MOUSE_POSITION = 1
+MOUSE_DRAG = 2
+MOUSE_SCROLL = 3
+MOUSE_PRESS = 4
+MOUSE_RELEASE = 5
+FRAME = 6
+
+# key actions
+PRESS = 0
+RELEASE = 1
+OTHER = 2
+
+# modifier bits
+SHIFT = 1
+CTRL = 2
+ALT = 4
+
+# time: clock of the recording (seconds), the meaning of i and f depends on the type:
+#   KEY: i = (key name index or -1, action, modifier bits, key code), f unused
+#   MOUSE_POSITION, MOUSE_DRAG: i = (x, y, 0, 0), f = (dx, dy)
+#   MOUSE_SCROLL: f = (x_offset, y_offset)
+#   MOUSE_PRESS, MOUSE_RELEASE: i = (x, y, button, 0)
+#   FRAME: f = (frametime, 0)
+EVENT_DTYPE = np.dtype([("time", "<f8"), ("type", "u1"), ("i", "<i4", 4), ("f", "<f4", 2)])
+
+
+def key_names(keys) -> list:
+    """names of all keys of a keys class (e.g. "W", "F1", "LEFT")"""
+    return sorted(name for name in dir(keys) if name.isupper() and not name.startswith("ACTION_"))
+
+
+class ReplayKeys(BaseKeys):
+    """
+    keys with a distinct code for every name. the headless window of moderngl_window
+    defines no key codes (all keys are "undefined"), replays there use these instead
+    """
+    ACTION_PRESS = "ACTION_PRESS"
+    ACTION_RELEASE = "ACTION_RELEASE"
+
+
+for _code, _name in enumerate(key_names(BaseKeys), 1000):
+    setattr(ReplayKeys, _name, _code)
+
+
+def distinct_keys(keys):
+    """keys if every key has its own code, else ReplayKeys"""
+    names = key_names(keys)
+    if len({getattr(keys, name) for name in names}) < len(names):
+        return ReplayKeys
+    return keys
+
+
+class VirtualClock:
+    """clock that returns the time it was set to"""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class InputRecorder:
+    """writes the input events of a window to a file"""
+
+    def __init__(self, path, keys, size=(0, 0), buffer_size=4096):
+        """
+        Args:
+            path: file to write
+            keys: keys class of the window
+        Keyword Args:
+            size: (width, height) of the window
+            buffer_size (int): events kept in memory before they are written
+        """
+        self.keys = keys
+        # time of the last event. the cameras read this clock while recording, so
+        # they see exactly the times a replay will give them
+        self.clock = VirtualClock(time.perf_counter())
+        self._names = key_names(keys)
+        self._index = {getattr(keys, name): index for index, name in enumerate(self._names)}
+        self._events = np.zeros(buffer_size, dtype=EVENT_DTYPE)
+        self._count = 0
+        self.file = open(path, "wb")
+        table = "\n".join(self._names).encode("utf-8")
+        self.file.write(MAGIC + struct.pack("<IIII", VERSION, size[0], size[1], len(table)) + table)
+
+    def _add(self, kind, i=(0, 0, 0, 0), f=(0.0, 0.0)) -> None:
+        self.clock.now = time.perf_counter()
+        event = self._events[self._count]
+        event["time"] = self.clock.now
+        event["type"] = kind
+        event["i"] = i
+        event["f"] = f
+        self._count += 1
+        if self._count == len(self._events):
+            self.flush()
+
+    def key(self, key, action, modifiers) -> None:
+        if action == self.keys.ACTION_PRESS:
+            action = PRESS
+        elif action == self.keys.ACTION_RELEASE:
+            action = RELEASE
+        else:
+            action = OTHER
+        bits = (SHIFT if getattr(modifiers, "shift", False) else 0) \
+            | (CTRL if getattr(modifiers, "ctrl", False) else 0) \
+            | (ALT if getattr(modifiers, "alt", False) else 0)
+        code = key if isinstance(key, int) else 0
+        self._add(KEY, (self._index.get(key, -1), action, bits, code))
+
+    def mouse_position(self, x, y, dx, dy) -> None:
+        self._add(MOUSE_POSITION, (x, y, 0, 0), (dx, dy))
+
+    def mouse_drag(self, x, y, dx, dy) -> None:
+        self._add(MOUSE_DRAG, (x, y, 0, 0), (dx, dy))
+
+    def mouse_scroll(self, x_offset, y_offset) -> None:
+        self._add(MOUSE_SCROLL, f=(x_offset, y_offset))
+
+    def mouse_press(self, x, y, button) -> None:
+        self._add(MOUSE_PRESS, (x, y, button, 0))
+
+    def mouse_release(self, x, y, button) -> None:
+        self._add(MOUSE_RELEASE, (x, y, button, 0))
+
+    def frame(self, frametime) -> None:
+        self._add(FRAME, f=(frametime, 0.0))
+
+    def attach(self, window) -> None:
+        """let the cameras of the window use the clock of the recording"""
+        window.camera_clock = self.clock
+        for camera in window.cameras:
+            camera.clock = self.clock
+
+    def flush(self) -> None:
+        self.file.write(self._events[:self._count].tobytes())
+        self._count = 0
+
+    def close(self) -> None:
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+def read_recording(path):
+    """
+    Returns:
+        names (list): key name table
+        size (tuple): window size of the recording
+        events (np.ndarray): EVENT_DTYPE records
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("{} is not an input recording".format(path))
+    offset = len(MAGIC)
+    version, width, height, length = struct.unpack_from("<IIII", data, offset)
+    if version != VERSION:
+        raise ValueError("unsupported recording version {}".format(version))
+    offset += 16
+    names = data[offset:offset + length].decode("utf-8").split("\n")
+    offset += length
+    count = (len(data) - offset) // EVENT_DTYPE.itemsize
+    events = np.frombuffer(data, dtype=EVENT_DTYPE, count=count, offset=offset)
+    return names, (width, height), events
+
+
+class InputReplay:
+    """
+    feeds a recording frame by frame into a CameraWindow
+
+        replay = InputReplay("session.rec")
+        replay.attach(window) # cameras read replay.clock
+        while not replay.finished:
+            time, frametime = replay.feed(window) # events up to the next frame
+            window.render(time, frametime)
+    """
+
+    def __init__(self, path):
+        self.names, self.size, self.events = read_recording(path)
+        self.clock = VirtualClock(float(self.events["time"][0]) if len(self.events) else 0.0)
+        self.position = 0
+        self.frames = int(np.count_nonzero(self.events["type"] == FRAME))
+        self.feeding = False
+        self._start = self.clock.now
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= len(self.events)
+
+    def attach(self, window) -> None:
+        """let the cameras of the window use the virtual clock"""
+        window.camera_clock = self.clock
+        for camera in window.cameras:
+            camera.clock = self.clock
+
+    def feed(self, window):
+        """
+        dispatches the events up to the next recorded frame to the window
+
+        Returns:
+            (time, frametime) of the frame, time since the start of the recording
+        """
+        keys = window.wnd.keys
+        actions = {PRESS: keys.ACTION_PRESS, RELEASE: keys.ACTION_RELEASE}
+        self.feeding = True
+        try:
+            while self.position < len(self.events):
+                event = self.events[self.position]
+                self.position += 1
+                self.clock.now = float(event["time"])
+                kind = event["type"]
+                i = [int(v) for v in event["i"]]
+                f = [float(v) for v in event["f"]]
+                if kind == FRAME:
+                    return self.clock.now - self._start, f[0]
+                if kind == KEY:
+                    key = getattr(keys, self.names[i[0]]) if i[0] >= 0 else i[3]
+                    modifiers = KeyModifiers()
+                    modifiers.shift = bool(i[2] & SHIFT)
+                    modifiers.ctrl = bool(i[2] & CTRL)
+                    modifiers.alt = bool(i[2] & ALT)
+                    window.key_event(key, actions.get(i[1]), modifiers)
+                elif kind == MOUSE_POSITION:
+                    window.mouse_position_event(i[0], i[1], f[0], f[1])
+                elif kind == MOUSE_DRAG:
+                    window.mouse_drag_event(i[0], i[1], f[0], f[1])
+                elif kind == MOUSE_SCROLL:
+                    window.mouse_scroll_event(f[0], f[1])
+                elif kind == MOUSE_PRESS:
+                    window.mouse_press_event(i[0], i[1], i[2])
+                elif kind == MOUSE_RELEASE:
+                    window.mouse_release_event(i[0], i[1], i[2])
+        finally:
+            self.feeding = False
+        return self.clock.now - self._start, 0.0
+
+
+def replay_headless(path, config_cls, size=None, backend="egl", profile=False):
+    """
+    replays a recording with a CameraWindow on a headless (offscreen) window
+
+    Returns:
+        (config, frames, seconds): the config_cls instance that replayed it,
+        rendered frames and wall time
+    """
+    import moderngl_window as mglw
+    from moderngl_window.context.headless import Window
+
+    _, recorded_size, _ = read_recording(path)
+    size = tuple(size or recorded_size)
+    window = Window(size=size, gl_version=config_cls.gl_version, backend=backend)
+    window.keys = distinct_keys(window.keys)
+    mglw.activate_context(window=window)
+
+    # the settings of a subclass, config_cls itself is left as it is
+    replay_cls = type(config_cls.__name__, (config_cls,), {"replay_input": path, "profile": profile})
+    config = replay_cls(ctx=window.ctx, wnd=window, timer=None)
+    frames = 0
+    start = time.perf_counter()
+    while not config.replay.finished:
+        window.use()
+        config.render(0.0, 0.0)
+        frames += 1
+    seconds = time.perf_counter() - start
+    config.close()
+    return config, frames, seconds
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="replay an input recording headless")
+    parser.add_argument("recording", help="file written with main.py --record")
+    parser.add_argument("--size", type=int, nargs=2, default=None, metavar=("WIDTH", "HEIGHT"),
+                        help="window size, default: size of the recording")
+    parser.add_argument("--backend", default="egl", help="moderngl backend of the offscreen context")
+    parser.add_argument("--profile", action="store_true", help="print per stage frame statistics")
+    args = parser.parse_args()
+
+    from main import CubeSimple
+
+    config, frames, seconds = replay_headless(args.recording, CubeSimple, args.size, args.backend, args.profile)
+    print("{} frames in {:.2f} s: {:.1f} fps".format(frames, seconds, frames / seconds))
+    if args.profile:
+        print("\n".join(config.profiler.summary()))
@@ -0,0 +1,199 @@
+"""
+4D rotations as rotors: a pair of unit quaternions (left, right). a point p,
+read as quaternion p[0] + p[1] i + p[2] j + p[3] k, is rotated to left * p * right.
+every rotation of SO(4) has this form (unique up to the sign of both quaternions).
+
+compared to a 4x4 matrix a rotor has 8 instead of 16 numbers, composing two rotors
+is two quaternion products and renormalizing (two vector norms) removes any drift,
+so a rotor can be composed with small rotations for ever without shearing.
+
+    rotor = Rotor4.from_angles((0.1, 0.2), (PLANES["xw"], PLANES["yw"]))
+    rotor = rotor @ Rotor4.plane(0.3, PLANES["zw"]) # same order as matrix products
+    rotor.matrix() # 4x4 matrix, equal to rotate_plane(0.1, xw) . rotate_plane(0.2, yw) . rotate_plane(0.3, zw)
+
+"""
+from math import cos, sin, sqrt
+
+import numpy as np
+
+from utils import PLANES
+
+
+def qmul(a, b) -> np.ndarray:
+    """hamilton product of quaternions (w, x, y, z), also for (..., 4) stacks"""
+    a = np.asarray(a)
+    b = np.asarray(b)
+    w1, x1, y1, z1 = np.moveaxis(a, -1, 0)
+    w2, x2, y2, z2 = np.moveaxis(b, -1, 0)
+    return np.stack([w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+                     w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+                     w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+                     w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2], axis=-1)
+
+
+def left_matrix(q) -> np.ndarray:
+    """4x4 matrix of p -> q * p"""
+    w, x, y, z = q
+    return np.array([[w, -x, -y, -z],
+                     [x, w, -z, y],
+                     [y, z, w, -x],
+                     [z, -y, x, w]])
+
+
+def right_matrix(q) -> np.ndarray:
+    """4x4 matrix of p -> p * q"""
+    w, x, y, z = q
+    return np.array([[w, -x, -y, -z],
+                     [x, w, z, -y],
+                     [y, -z, w, x],
+                     [z, y, -x, w]])
+
+
+_UNIT = np.eye(4)
+# left_matrix(e_c) . right_matrix(e_d) for all 16 pairs of basis quaternions, an
+# orthogonal basis of the 4x4 matrices (each with squared norm 4)
+_BASIS = np.array([[left_matrix(_UNIT[c]) @ right_matrix(_UNIT[d]) for d in range(4)] for c in range(4)])
+
+
+def _plane_generator(plane):
+    """
+    the rotation in a plane is exp(angle * G) with G = left_matrix(u) + right_matrix(v),
+    u, v pure quaternions of length 1/2. returns (2u, 2v) as tuples
+    """
+    i, j, sign = plane
+    generator = np.zeros((4, 4))
+    generator[i, j] = sign
+    generator[j, i] = -sign
+    u = np.array([np.sum(generator * left_matrix(_UNIT[c])) / 4 for c in range(4)])
+    v = np.array([np.sum(generator * right_matrix(_UNIT[c])) / 4 for c in range(4)])
+    return tuple(2 * u), tuple(2 * v)
+
+
+_GENERATORS = {plane: _plane_generator(plane) for plane in PLANES.values()}
+
+
+def matrices(left, right) -> np.ndarray:
+    """4x4 rotation matrices of stacks of rotors, left and right (n, 4) -> (n, 4, 4) float32"""
+    return np.einsum("nc,nd,cdab->nab", left, right, _BASIS, optimize=True).astype("f4")
+
+
+def slerp(q0, q1, t) -> np.ndarray:
+    """
+    spherical linear interpolation of unit quaternions (n, 4) with t (n) in [0, 1].
+    q0 and q1 are not flipped to the same hemisphere, for rotors the sign of both
+    quaternions has to be chosen together (see camera_path.CameraPath)
+    """
+    t = np.asarray(t)[:, None]
+    dot = np.clip(np.sum(q0 * q1, axis=-1, keepdims=True), -1.0, 1.0)
+    angle = np.arccos(dot)
+    s = np.sin(angle)
+    # (almost) equal quaternions: linear interpolation
+    small = s < 1e-6
+    s = np.where(small, 1.0, s)
+    w0 = np.where(small, 1.0 - t, np.sin((1.0 - t) * angle) / s)
+    w1 = np.where(small, t, np.sin(t * angle) / s)
+    return w0 * q0 + w1 * q1
+
+
+def _qmul(a, b) -> tuple:
+    """hamilton product of two single quaternions as tuples, faster than qmul for one pair"""
+    w1, x1, y1, z1 = a
+    w2, x2, y2, z2 = b
+    return (w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+            w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+            w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+            w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2)
+
+
+def _normalized(q) -> tuple:
+    length = sqrt(q[0] * q[0] + q[1] * q[1] + q[2] * q[2] + q[3] * q[3])
+    return (q[0] / length, q[1] / length, q[2] / length, q[3] / length)
+
+
+def _exp(v) -> tuple:
+    """exponential of the pure quaternion (0, v)"""
+    angle = sqrt(v[0] * v[0] + v[1] * v[1] + v[2] * v[2])
+    if angle == 0:
+        return (1.0, 0.0, 0.0, 0.0)
+    s = sin(angle) / angle
+    return (cos(angle), s * v[0], s * v[1], s * v[2])
+
+
+class Rotor4:
+    """
+    SO(4) rotation as pair of unit quaternions (tuples of 4 floats), composed like
+    matrices: (a @ b).matrix() == a.matrix() @ b.matrix()
+    """
+    __slots__ = ("left", "right")
+
+    def __init__(self, left=(1.0, 0.0, 0.0, 0.0), right=(1.0, 0.0, 0.0, 0.0)):
+        self.left = tuple(map(float, left))
+        self.right = tuple(map(float, right))
+
+    @classmethod
+    def plane(cls, angle, plane) -> "Rotor4":
+        """
+        rotation with angle (radians) in a plane of utils.PLANES,
+        same as utils.rotate_plane
+        """
+        u, v = _GENERATORS[plane]
+        c = cos(angle / 2)
+        s = sin(angle / 2)
+        return cls((c, s * u[1], s * u[2], s * u[3]), (c, s * v[1], s * v[2], s * v[3]))
+
+    @classmethod
+    def from_angles(cls, angles, planes) -> "Rotor4":
+        """product of plane rotations (as utils.compose_rotation), planes with angle 0 are skipped"""
+        rotor = cls()
+        for angle, plane in zip(angles, planes):
+            if angle != 0:
+                rotor = rotor @ cls.plane(angle, plane)
+        return rotor
+
+    @classmethod
+    def from_bivector(cls, angles, planes) -> "Rotor4":
+        """
+        rotation in all planes at the same time (exponential of the summed generators),
+        the limit of alternating many small rotations in the planes. unlike
+        from_angles the result does not depend on the order of the planes
+        """
+        left = [0.0, 0.0, 0.0]
+        right = [0.0, 0.0, 0.0]
+        for angle, plane in zip(angles, planes):
+            if angle != 0:
+                u, v = _GENERATORS[plane]
+                for k in range(3):
+                    left[k] += angle / 2 * u[k + 1]
+                    right[k] += angle / 2 * v[k + 1]
+        return cls(_exp(left), _exp(right))
+
+    @classmethod
+    def from_matrix(cls, matrix) -> "Rotor4":
+        """rotor of a 4x4 rotation matrix (orthonormal, determinant 1)"""
+        # coefficients of the matrix in _BASIS are left[c] * right[d], a matrix of rank 1
+        outer = np.einsum("ab,cdab->cd", np.asarray(matrix, dtype="f8"), _BASIS) / 4
+        row = np.argmax(np.sum(outer * outer, axis=1))
+        right = outer[row] / np.linalg.norm(outer[row])
+        left = outer @ right
+        return cls(left, right).normalize()
+
+    def __matmul__(self, other) -> "Rotor4":
+        # a.matrix() @ b.matrix() rotates p to a.left * b.left * p * b.right * a.right
+        return Rotor4(_qmul(self.left, other.left), _qmul(other.right, self.right))
+
+    def inverse(self) -> "Rotor4":
+        (lw, lx, ly, lz), (rw, rx, ry, rz) = self.left, self.right
+        return Rotor4((lw, -lx, -ly, -lz), (rw, -rx, -ry, -rz))
+
+    def normalize(self) -> "Rotor4":
+        """rescales both quaternions to unit length (in place), returns self"""
+        self.left = _normalized(self.left)
+        self.right = _normalized(self.right)
+        return self
+
+    def matrix(self) -> np.ndarray:
+        """4x4 float32 rotation matrix"""
+        return (left_matrix(self.left) @ right_matrix(self.right)).astype("f4")
+
+    def copy(self) -> "Rotor4":
+        return Rotor4(self.left, self.right)
@@ -0,0 +1,325 @@
+"""
+the scene (shader programs, geometry and draw calls) independent of the window,
+shared by the interactive window (main.py) and offscreen rendering (headless.py)
+
+"""
+
+import numpy as np
+from pyrr import matrix33
+
+import moderngl
+
+from cube import cube, hypercube, ncube_geometry, ncube_mesh_geometry
+from utils import axes_coordinate_system, rotate
+from registry import GeometryRegistry
+from instancing import InstancedMesh4D
+from uniforms import CameraBlock, CAMERA_BLOCK
+from profiler import FrameProfiler
+from slicing import CrossSection, Slicer, merge_meshes, ncube_tetrahedra_geometry
+
+
+class Scene:
+    """
+    hypercubes + coordinate axes (4D scene) and a cube (3D scene), or the 3D
+    cross-section of the hypercubes with the hyperplane section_distance in front
+    of the 4D camera (see slicing.CrossSection).
+    the camera passed to the draw functions needs projection, fov4 and version
+    attributes (see camera.Camera), the 4D camera matrices are uploaded from its
+    uniform_block if it has one
+    """
+
+    def __init__(self, ctx, mode=moderngl.LINES, profiler=None):
+        self.ctx = ctx
+        self.mode = mode
+        # stages "uniforms" and "draw" (cpu and gpu) are timed
+        self.profiler = profiler or FrameProfiler(enabled=False)
+        # identical primitives share one VAO
+        self.geometry = GeometryRegistry()
+        self.cube = self.geometry.acquire(cube, size=(2, 2, 2), mode=self.mode)
+        self.hypercube = self.geometry.acquire(hypercube, size=(2,2,2,2), mode=self.mode)
+        # small cubes are drawn instanced: one draw call for all of them, edges or the 24 squares
+        if self.mode == moderngl.TRIANGLES:
+            vertices, indices, _ = ncube_mesh_geometry(4, size=(0.5,0.5,0.5,0.5))
+        else:
+            vertices, indices = ncube_geometry(4, size=(0.5,0.5,0.5,0.5))
+        self.small_cubes = InstancedMesh4D(vertices, indices, capacity=2, mode=self.mode)
+        self.small_cube_centers = np.array([[-0.5, 1, 0, 0], [0.5, 1, 0, 0]], dtype='f4')
+        self.small_cubes.set([rotate(np.array([0,0,0, 0,0,0])), rotate(np.array([0,0,0, 0,0,0]))],
+                             self.small_cube_centers)
+        # cross-section of the hypercubes, created on first use
+        self.section = None
+        self.section_distance = 3.0
+        self._section_version = None
+        self.axes4 = axes_coordinate_system(4, 2)
+        
+        self.prog4d = self.ctx.program(
+            vertex_shader='''
+                #version 450''' + CAMERA_BLOCK + '''
+                in vec4 in_position;
+                // in vec3 in_normal;
+                
+                uniform mat4 m_modelview4; // model to 4d camera rotation (view * model), composed on the cpu
+                uniform vec4 m_model_t4; // model translation in 4d camera orientation (view * translation)
+                
+                out vec3 pos;
+                out vec3 color;
+                
+                void main() {
+                    float min = -abs(in_position.w);
+                    float max = abs(in_position.w);
+                    // 4d->3d
+                    vec4 p_cam_or = m_modelview4 * in_position + m_model_t4;
+                    
+                    // depth coloring depending on w coordinate in camera coordinates
+                    float c = (p_cam_or.w - min) / max;
+                    color = vec3(1-c,c,0);
+                    
+                    vec4 p_cam = p_cam_or + m_position4;
+                    
+                    // perspective devide
+                    vec3 p = p_cam.xyz * (m_fov4 / p_cam.w);
+                    
+                    // 3d->2d
+                    p = m_orientation3 * p + m_position3; // to camera that projects from 3d to 2d
+                    gl_Position = m_proj * vec4(p, 1.0);
+                    
+                    pos = p;
+                }
+            ''',
+            fragment_shader='''
+                #version 330
+                out vec4 fragColor;
+                
+                in vec3 pos;
+                in vec3 color;
+                
+                void main() {
+                    fragColor = vec4(color, 1.0); // vec4(0.1, 0.1, 0.1, 1.0);
+                }
+            ''',
+        )
+        # same as prog4d, model rotation and translation come per instance from InstancedMesh4D
+        self.prog4d_instanced = self.ctx.program(
+            vertex_shader='''
+                #version 450''' + CAMERA_BLOCK + '''
+                in vec4 in_position;
+                in mat4 in_model_r; // model to world coordinates, per instance
+                in vec4 in_model_t; // per instance
+                
+                out vec3 pos;
+                out vec3 color;
+                
+                void main() {
+                    float min = -abs(in_position.w);
+                    float max = abs(in_position.w);
+                    // 4d->3d
+                    vec4 p_cam_or = m_orientation4 * (in_model_r * in_position + in_model_t);
+                    
+                    // depth coloring depending on w coordinate in camera coordinates
+                    float c = (p_cam_or.w - min) / max;
+                    color = vec3(1-c,c,0);
+                    
+                    vec4 p_cam = p_cam_or + m_position4;
+                    
+                    // perspective devide
+                    vec3 p = p_cam.xyz * (m_fov4 / p_cam.w);
+                    
+                    // 3d->2d
+                    p = m_orientation3 * p + m_position3; // to camera that projects from 3d to 2d
+                    gl_Position = m_proj * vec4(p, 1.0);
+                    pos = p;
+                }
+            ''',
+            fragment_shader='''
+                #version 330
+                out vec4 fragColor;
+                
+                in vec3 pos;
+                in vec3 color;
+                
+                void main() {
+                    fragColor = vec4(color, 1.0);
+                }
+            ''',
+        )
+        # simple shader for axes of coordinate system
+        self.axes4d = self.ctx.program(
+            vertex_shader='''
+                #version 450''' + CAMERA_BLOCK + '''
+                in vec4 in_position;
+                // in vec3 in_normal;
+                
+                out vec3 pos;
+                out vec4 color;
+                
+                void main() {
+                    // 4d->3d
+                    vec4 p_cam = m_orientation4 * in_position + m_position4;
+                    // perspective devide
+                    vec3 p = p_cam.xyz * (m_fov4 / p_cam.w);
+                    
+                    // 3d->2d
+                    p = m_orientation3 * p + m_position3; // to camera that projects from 3d to 2d
+                    gl_Position = m_proj * vec4(p, 1.0);
+                    
+                    color = vec4(in_position.z+in_position.y+in_position.x, in_position.y+in_position.w+in_position.x, in_position.z+in_position.w+in_position.x, 0.5);
+                    pos = p;
+                }
+            ''',
+            fragment_shader='''
+                #version 330
+                out vec4 fragColor;
+                
+                in vec3 pos;
+                in vec4 color;
+                
+                void main() {
+                    fragColor = color; // vec4(0.1, 0.1, 0.1, 1.0);
+                }
+            ''',
+        )
+        self.prog3d = self.ctx.program(
+            vertex_shader='''
+                #version 330
+                in vec3 in_position;
+                
+                uniform mat3 m_model_orient; // model to world coordinates
+                uniform mat3 orientation; // world 2 camera coordinate rotation
+                uniform vec3 position; // world 2 camera coordinate translation
+                uniform mat4 m_proj; // perspective projection
+                
+                out vec3 pos;
+                out vec3 normal;
+                
+                void main() {
+                    mat3 m_view = transpose(orientation) * m_model_orient;
+                    vec3 p = m_view * in_position + position;
+                    float fov = tan(1.0471975511965976);
+                    gl_Position =  m_proj * vec4(p, 1.0); 
+                    pos = p.xyz;
+                    
+                }
+            ''',
+            fragment_shader='''
+                #version 330
+                out vec4 fragColor;
+                uniform vec4 color;
+                
+                in vec3 pos;
+                
+                void main() {
+                    fragColor = color; // vec4(0.1, 0.1, 0.1, 1.0);
+                }
+            ''',
+        )
+        self.prog3d['color'].value = 0.0, 0.0, 1.0, 1.0
+        
+        # camera matrices of all 4D programs, uploaded once per frame
+        self.camera_block = CameraBlock(self.ctx)
+        self.camera_block.bind(self.prog4d, self.prog4d_instanced, self.axes4d)
+        # camera state the uniforms of prog3d were last written for
+        self._prog3d_version = None
+
+    def write_prog3d(self, camera, camera3):
+        """uploads the 3D camera to prog3d (skipped if the camera did not change)"""
+        orientation, position = camera3
+        if self._prog3d_version != (id(camera), camera.version):
+            with self.profiler.stage("uniforms"):
+                self._prog3d_version = (id(camera), camera.version)
+                rotation = matrix33.create_from_eulers((0.0, 0.0, 0.0), dtype='f4')
+                modelview = rotation
+
+                self.prog3d['m_proj'].write(camera.projection.matrix) # near, far, aspect, max, min in x and y dir
+                self.prog3d['m_model_orient'].write(modelview) 
+                
+                #print(orientation, position)
+                self.prog3d['orientation'].write(orientation) # position and orientation of camera, transforms from world to camera coordinates
+                self.prog3d['position'].write(position) # position and orientation of camera, transforms from world to camera coordinates
+
+    def render3d(self, camera, camera3):
+        self.write_prog3d(camera, camera3)
+        with self.profiler.stage("draw"), self.profiler.gpu("draw", self.ctx):
+            self.cube.render(self.prog3d, mode=self.mode)
+
+    def render_section(self, camera, camera4, camera3):
+        """draws the cross-section of the hypercubes with prog3d, re-sliced when the 4D camera moved"""
+        if self.section is None:
+            meshes = [ncube_tetrahedra_geometry(4, size=(2, 2, 2, 2))]
+            meshes += [ncube_tetrahedra_geometry(4, size=(0.5, 0.5, 0.5, 0.5), center=center)
+                       for center in self.small_cube_centers]
+            self.section = CrossSection(Slicer(*merge_meshes(meshes)))
+        self.write_prog3d(camera, camera3)
+        version = (id(camera), camera.version, self.section_distance)
+        if self._section_version != version:
+            with self.profiler.stage("uniforms"):
+                self._section_version = version
+                orientation4, position4 = camera4
+                self.section.update(orientation4, position4, camera.fov4, self.section_distance)
+        with self.profiler.stage("draw"), self.profiler.gpu("draw", self.ctx):
+            # wireframe of the section triangles in LINES mode
+            self.ctx.wireframe = self.mode == moderngl.LINES
+            self.section.render(self.prog3d)
+            self.ctx.wireframe = False
+        
+    def write_model4d(self, orientation4, rotation, translation):
+        """uploads model rotation and translation of the next object drawn with prog4d,
+        premultiplied with the camera orientation so the shader only needs one mat4 multiply"""
+        modelview = np.dot(orientation4, rotation)
+        # GLSL reads matrices column by column -> write the transpose
+        self.prog4d['m_modelview4'].write(np.ascontiguousarray(modelview.T, dtype='f4'))
+        self.prog4d['m_model_t4'].write(np.dot(orientation4, translation).astype('f4'))
+        
+    def render4d(self, camera, camera4, camera3, show_axes=False):
+        # position and orientation of camera, transforms from world to camera coordinates
+        orientation4, position4 = camera4
+        # result of the perspective devide of the 4D camera is the world coordinate system of 3D camera
+        orientation, position = camera3
+        # near, far, aspect, max, min in x and y dir for 3D camera, 4D projection with simple perspective devide
+        # (upload skipped if the camera did not change since the last frame)
+        with self.profiler.stage("uniforms"):
+            block = getattr(camera, "uniform_block", None)
+            if block is not None:
+                # the camera keeps its pose packed in the block layout
+                self.camera_block.write(block, version=(id(camera), camera.version))
+            else:
+                self.camera_block.update(camera.projection.matrix, orientation4, position4, orientation, position,
+                                         camera.fov4, version=(id(camera), camera.version))
+            self.camera_block.use()
+        
+        with self.profiler.gpu("draw", self.ctx):
+            # first cube in center
+            rotation = rotate(np.array([0,0,0, 0,0,0]))
+            translation = np.array([0.0, 0.0, 0.0, 0.0], dtype='f4')
+            # rotate and move model in world coordinate system, composed with the camera rotation
+            with self.profiler.stage("uniforms"):
+                self.write_model4d(orientation4, rotation, translation)
+            with self.profiler.stage("draw"):
+                self.hypercube.render(self.prog4d, mode=self.mode)
+            
+                # second and third cube, one instanced draw call
+                self.small_cubes.render(self.prog4d_instanced, mode=self.mode)
+                
+                if show_axes:
+                    self.axes4.render(self.axes4d, mode=self.mode)
+
+    def draw(self, camera, camera3, camera4=None, show_axes=False, section=False):
+        """clears the bound framebuffer and draws the 4D scene, or the 3D scene if camera4 is None
+
+        Args:
+            camera: the camera (projection, fov4, version)
+            camera3: orientation and position of the 3D camera (camera.matrix)
+            camera4: orientation and position of the 4D camera (camera.matrix4d)
+            section (bool): draw the cross-section of the 4D scene instead of its projection
+        """
+        if camera4 is not None and (section or self.mode == moderngl.TRIANGLES):
+            # the projected faces and the sections of 4D meshes have no consistent winding, draw both sides
+            self.ctx.enable_only(moderngl.DEPTH_TEST)
+        else:
+            self.ctx.enable_only(moderngl.CULL_FACE | moderngl.DEPTH_TEST)
+        self.ctx.clear(0.0, 0.0, 0.0) # make background white -> 1.0,1.0,1.0
+        if camera4 is None:
+            self.render3d(camera, camera3)
+        elif section:
+            self.render_section(camera, camera4, camera3)
+        else:
+            self.render4d(camera, camera4, camera3, show_axes)
@@ -0,0 +1,228 @@
+"""
+3D cross-sections of 4D meshes: the tetrahedra (3-cells) of a 4D mesh are cut with a
+hyperplane by marching tetrahedra, vectorized over all cells. the edge table (unique
+edges, 6 per tetrahedron) and the case table (16 sign patterns of the 4 corners) are
+built once, moving the plane along its normal only re-slices the cells it crosses.
+
+    slicer = Slicer(*ncube_tetrahedra_geometry(4, size=(2, 2, 2, 2)))
+    points, triangles = slicer.slice(normal=(0, 0, 0, 1), offset=0.5) # (m, 4), (k, 3)
+    section = CrossSection(slicer) # GPU buffers of the largest possible section
+    section.update(*camera.matrix4d, fov4=camera.fov4, distance=3.0)
+    section.render(prog3d)
+
+CrossSection cuts with the hyperplane orthogonal to dir4 of the 4D camera at distance
+in front of it, q/e (translation along w) move the plane, rotations in the xw, yw, zw
+planes turn it. the section is shown in the x, y, z axes of the 4D camera, scaled like
+the perspective devide of prog4d scales points at that distance.
+"""
+import itertools
+from functools import lru_cache
+from math import radians, tan
+
+import numpy as np
+
+from moderngl_window.opengl.vao import VAO
+from moderngl_window.geometry import AttributeNames
+import moderngl
+
+from cube import ncube_geometry
+
+# corners of the 6 edges of a tetrahedron
+TETRAHEDRON_EDGES = np.array([(0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3)], dtype=np.int64)
+
+
+def _case_table():
+    """
+    triangles (as edges of TETRAHEDRON_EDGES) of the section for every case: bit i
+    set = corner i above the plane. one corner apart -> the triangle of its 3 edges,
+    two against two -> the quad of the 4 crossing edges as 2 triangles
+    """
+    edge_of = {frozenset(edge): index for index, edge in enumerate(TETRAHEDRON_EDGES.tolist())}
+    cases = np.zeros((16, 2, 3), dtype=np.int64)
+    counts = np.zeros(16, dtype=np.int64)
+    for case in range(16):
+        above = [corner for corner in range(4) if case >> corner & 1]
+        below = [corner for corner in range(4) if not case >> corner & 1]
+        if len(above) in (1, 3):
+            single, others = (above, below) if len(above) == 1 else (below, above)
+            cases[case, 0] = [edge_of[frozenset((single[0], other))] for other in others]
+            counts[case] = 1
+        elif len(above) == 2:
+            (a, b), (c, d) = above, below
+            quad = [edge_of[frozenset(pair)] for pair in ((a, c), (a, d), (b, d), (b, c))]
+            cases[case] = [quad[:3], [quad[0], quad[2], quad[3]]]
+            counts[case] = 2
+    return cases, counts
+
+
+# (16, 2, 3) edges of the section triangles per case, (16,) number of triangles
+CASES, CASE_COUNTS = _case_table()
+
+
+@lru_cache(maxsize=None)
+def ncube_tetrahedra(dim=4):
+    """
+    tetrahedra of the boundary of an n-cube (vertex ids as in cube.ncube_geometry):
+    every 3-dimensional cell (cube) is split into 6 tetrahedra along its diagonal from
+    the lowest to the highest corner (Kuhn triangulation, conforming between cells).
+    built once per dimension (cached, read-only)
+
+    Returns:
+        numpy.ndarray: (C(dim, 3) * 2^(dim-3) * 6, 4) uint32
+    """
+    ids = np.arange(2 ** dim, dtype=np.uint32)
+    tetrahedra = []
+    for axes in itertools.combinations(range(dim), 3):
+        bits = [np.uint32(1 << axis) for axis in axes]
+        base = ids[(ids & (bits[0] | bits[1] | bits[2])) == 0]
+        for first, second, third in itertools.permutations(bits):
+            tetrahedra.append(np.stack([base, base | first, base | first | second, base | first | second | third], axis=1))
+    tetrahedra = np.concatenate(tetrahedra)
+    tetrahedra.flags.writeable = False
+    return tetrahedra
+
+
+def ncube_tetrahedra_geometry(dim=4, size=None, center=None):
+    """vertices (2^dim, dim) float32 and boundary tetrahedra (see ncube_tetrahedra) of an n-cube"""
+    vertices, _ = ncube_geometry(dim, size, center)
+    return vertices, ncube_tetrahedra(dim)
+
+
+def edge_table(cells):
+    """
+    unique edges of tetrahedra and the edges of every tetrahedron
+
+    Returns:
+        numpy.ndarray: edges (e, 2) int64 vertex indices, lower index first
+        numpy.ndarray: (t, 6) int64 edge of every edge of TETRAHEDRON_EDGES per tetrahedron
+    """
+    cells = np.asarray(cells, dtype=np.int64)
+    pairs = np.sort(cells[:, TETRAHEDRON_EDGES].reshape(-1, 2), axis=1)
+    edges, inverse = np.unique(pairs, axis=0, return_inverse=True)
+    return edges, inverse.reshape(len(cells), 6)
+
+
+def merge_meshes(meshes):
+    """one mesh of several (vertices, cells) meshes, cell indices shifted"""
+    vertices = []
+    cells = []
+    first = 0
+    for mesh_vertices, mesh_cells in meshes:
+        vertices.append(np.asarray(mesh_vertices))
+        cells.append(np.asarray(mesh_cells, dtype=np.int64) + first)
+        first += len(mesh_vertices)
+    return np.concatenate(vertices), np.concatenate(cells)
+
+
+class Slicer:
+    """
+    marching tetrahedra of one 4D mesh. the heights of the vertices over the plane
+    and the cells sorted by their lowest corner are kept for the last normal: moving
+    the plane along the normal (a new offset) only finds the cells around it with a
+    binary search and cuts those, a new normal costs one matrix vector product and a sort
+    """
+
+    def __init__(self, vertices, cells):
+        """
+        Args:
+            vertices: (n, 4) positions
+            cells: (t, 4) vertex indices of the tetrahedra
+        """
+        self.vertices = np.asarray(vertices, dtype=np.float64)
+        self.cells = np.asarray(cells, dtype=np.int64)
+        self.edges, self.cell_edges = edge_table(self.cells)
+        self._normal = None
+        self._heights = None
+        self._order = None
+        self._low = None
+        self._high = None
+
+    def _project(self, normal) -> None:
+        self._normal = normal
+        self._heights = self.vertices @ normal
+        corners = self._heights[self.cells]
+        low = corners.min(axis=1)
+        self._order = np.argsort(low, kind="stable")
+        self._low = low[self._order]
+        self._high = corners.max(axis=1)
+
+    def active(self, normal, offset) -> np.ndarray:
+        """indices of the cells with corners on both sides of the plane normal . p = offset"""
+        normal = np.asarray(normal, dtype=np.float64)
+        if self._normal is None or not np.array_equal(normal, self._normal):
+            self._project(normal)
+        # lowest corner at or below the plane (binary search), highest one above
+        candidates = self._order[:np.searchsorted(self._low, offset, side="right")]
+        return candidates[self._high[candidates] > offset]
+
+    def slice(self, normal, offset=0.0):
+        """
+        section with the hyperplane normal . p = offset (normal of unit length for
+        offset in world units)
+
+        Returns:
+            numpy.ndarray: points (m, 4) float64 on the edges crossing the plane
+            numpy.ndarray: triangles (k, 3) uint32 indices of the points
+        """
+        active = self.active(normal, offset)
+        above = self._heights[self.cells[active]] > offset
+        cases = above @ np.array([1, 2, 4, 8])
+        counts = CASE_COUNTS[cases]
+        # global edges of the section triangles, the second triangle of quads appended
+        cell_edges = self.cell_edges[active]
+        rows = np.arange(len(active))[:, None]
+        first = cell_edges[rows, CASES[cases, 0]]
+        quads = counts == 2
+        second = cell_edges[rows[quads], CASES[cases[quads], 1]]
+        triangle_edges = np.concatenate([first, second])
+        if not len(triangle_edges):
+            return np.zeros((0, 4)), np.zeros((0, 3), dtype=np.uint32)
+        used, inverse = np.unique(triangle_edges, return_inverse=True)
+        start, end = self.edges[used, 0], self.edges[used, 1]
+        h0 = self._heights[start] - offset
+        h1 = self._heights[end] - offset
+        t = (h0 / (h0 - h1))[:, None]
+        points = self.vertices[start] + t * (self.vertices[end] - self.vertices[start])
+        return points, inverse.reshape(-1, 3).astype(np.uint32)
+
+
+class CrossSection:
+    """
+    section of a Slicer in GPU buffers of the largest possible size (every edge a
+    point, two triangles per cell), rewritten in place when the plane moves. drawn
+    with a 3D program (in_position, e.g. Scene.prog3d)
+    """
+
+    def __init__(self, slicer, name=None, attr_names=AttributeNames):
+        self.slicer = slicer
+        self.count = 0
+        self.vao = VAO(name or "geometry:cross_section", mode=moderngl.TRIANGLES)
+        ctx = self.vao.ctx
+        self.vertex_buffer = ctx.buffer(reserve=max(len(slicer.edges), 1) * 12, dynamic=True)
+        self.index_buffer = ctx.buffer(reserve=max(len(slicer.cells), 1) * 24, dynamic=True)
+        self.vao.buffer(self.vertex_buffer, "3f", [attr_names.POSITION])
+        self.vao.index_buffer(self.index_buffer, index_element_size=4)
+
+    def update(self, orientation4, position4, fov4=90.0, distance=3.0) -> None:
+        """
+        cuts with the hyperplane at distance along dir4 of the 4D camera
+        (orientation4, position4 as Camera.matrix4d) and uploads the section
+        """
+        orientation4 = np.asarray(orientation4, dtype=np.float64)
+        position4 = np.asarray(position4, dtype=np.float64)
+        # w of the camera coordinates orientation4 @ p + position4 is distance
+        points, triangles = self.slicer.slice(orientation4[3], distance - position4[3])
+        # camera x, y, z with the scale of the perspective devide at w = distance
+        scale = 1.0 / tan(radians(fov4) / 2.0) / distance
+        points = (points @ orientation4[:3].T + position4[:3]) * scale
+        self.count = triangles.size
+        if self.count:
+            self.vertex_buffer.write(points.astype("f4"))
+            self.index_buffer.write(triangles)
+
+    def render(self, program) -> None:
+        if self.count:
+            self.vao.render(program, vertices=self.count)
+
+    def release(self) -> None:
+        self.vao.release()
@@ -0,0 +1,282 @@
+"""
+smooth 4D manifolds as indexed grids: the vertices of a parametric function are
+computed on a sparse numpy meshgrid in one pass, the index buffer of a grid only
+depends on its shape and is cached.
+
+    vertices, indices = hypersphere_geometry((100, 100, 100)) # 1M vertices of the 3-sphere
+    vao = clifford_torus(resolution=(128, 128), mode=moderngl.TRIANGLES)
+    vao = hopf_fibres(fibres=(6, 16)) # LINES, 96 great circles
+    vao = parametric(function=lambda u, v: (cos(u), sin(u), v, 0 * v), resolution=(64, 16),
+                     ranges=((0, 2 * pi), (-1, 1)), wrap=(True, False))
+
+    lod = SurfaceLOD(hypersphere, [(6, 6, 12), (16, 16, 32), (48, 48, 96)], radius=2.0)
+    lod.select(camera, window.buffer_size[1]).render(prog4d) # level from the projected size
+
+grids are C ordered (last parameter fastest). LINES connect neighbours along every
+parameter, TRIANGLES split the quads of the last two parameters, e.g. the 2-sphere
+shells of the 3-sphere or the tori of the Hopf fibration. parameters with wrap are
+sampled without the end of their range and their last row is joined to the first.
+"""
+from functools import lru_cache
+from math import pi
+
+import numpy as np
+
+from moderngl_window.geometry import AttributeNames
+import moderngl
+
+from cube import indexed_vao
+from registry import GeometryRegistry
+
+TAU = 2.0 * pi
+
+
+@lru_cache(maxsize=8)
+def grid_indices(shape, wrap=None, mode=moderngl.LINES, axes=None):
+    """
+    index buffer of a grid of vertices (C order), built once per shape (cached, read-only)
+
+    Args:
+        shape: number of samples per parameter
+    Keyword Args:
+        wrap: per parameter, join the last row to the first (closed parameter)
+        mode: LINES (edges along the axes) or TRIANGLES (quads of the last two axes)
+        axes: parameters to connect with LINES, default all. the two parameters
+            to triangulate with TRIANGLES, default the last two
+    Returns:
+        numpy.ndarray: (m, 2) or (m, 3) uint32 vertex indices
+    """
+    shape = tuple(shape)
+    wrap = (False,) * len(shape) if wrap is None else tuple(wrap)
+    ids = np.arange(int(np.prod(shape)), dtype=np.uint32).reshape(shape)
+
+    def ahead(array, axis):
+        # neighbour one step along axis, rows without one are dropped
+        return np.roll(array, -1, axis=axis) if wrap[axis] else array.take(range(1, shape[axis]), axis=axis)
+
+    def behind(array, axis):
+        return array if wrap[axis] else array.take(range(shape[axis] - 1), axis=axis)
+
+    if mode == moderngl.TRIANGLES:
+        if len(shape) < 2:
+            raise ValueError("triangles need a grid of at least 2 parameters, got shape {}".format(shape))
+        u, v = (len(shape) - 2, len(shape) - 1) if axes is None else axes
+        a = behind(behind(ids, u), v)
+        b = ahead(behind(ids, v), u)
+        c = ahead(ahead(ids, u), v)
+        d = behind(ahead(ids, v), u)
+        indices = np.stack([a, b, c, a, c, d], axis=-1).reshape(-1, 3)
+    elif mode == moderngl.LINES:
+        edges = [np.stack([behind(ids, axis), ahead(ids, axis)], axis=-1).reshape(-1, 2)
+                 for axis in (range(len(shape)) if axes is None else axes) if shape[axis] > 1]
+        indices = np.concatenate(edges) if edges else np.zeros((0, 2), dtype=np.uint32)
+    else:
+        raise ValueError("grids are drawn as LINES or TRIANGLES, got mode {}".format(mode))
+    indices.flags.writeable = False
+    return indices
+
+
+def parametric_geometry(function, resolution, ranges=None, wrap=None, mode=moderngl.LINES, axes=None):
+    """Vertices and indices of a parametric 4D manifold
+
+    Args:
+        function: maps the parameters (one broadcastable array per parameter, sparse
+            meshgrid) to the 4 coordinates, a sequence of 4 arrays or one (..., 4) array
+        resolution: number of samples per parameter (1 to 3 parameters)
+    Keyword Args:
+        ranges: (start, end) per parameter, default (0, 2 pi)
+        wrap: per parameter, closed (end = start, see grid_indices), default all open
+        mode: LINES/TRIANGLES, axes: see grid_indices
+    Returns:
+        numpy.ndarray: vertices (n, 4) float32
+        numpy.ndarray: indices (m, 2) or (m, 3) uint32, read-only
+    """
+    resolution = tuple(int(n) for n in resolution)
+    ranges = ((0.0, TAU),) * len(resolution) if ranges is None else tuple(ranges)
+    wrap = (False,) * len(resolution) if wrap is None else tuple(bool(closed) for closed in wrap)
+    if not len(resolution) == len(ranges) == len(wrap):
+        raise ValueError("resolution {}, ranges {} and wrap {} do not fit".format(resolution, ranges, wrap))
+    samples = [np.linspace(start, end, n, endpoint=not closed)
+               for n, (start, end), closed in zip(resolution, ranges, wrap)]
+    coordinates = function(*np.meshgrid(*samples, indexing="ij", sparse=True))
+    if isinstance(coordinates, np.ndarray) and coordinates.shape[-1:] == (4,):
+        coordinates = np.moveaxis(coordinates, -1, 0)
+    if len(coordinates) != 4:
+        raise ValueError("a 4D manifold needs 4 coordinates, the function returned {}".format(len(coordinates)))
+    # every coordinate is broadcast into the vertex array, no full size temporaries
+    vertices = np.empty(resolution + (4,), dtype=np.float32)
+    for axis, coordinate in enumerate(coordinates):
+        vertices[..., axis] = coordinate
+    return vertices.reshape(-1, 4), grid_indices(resolution, wrap, mode, None if axes is None else tuple(axes))
+
+
+def _placed(vertices, radius, center):
+    """scales and moves unit vertices in place"""
+    if radius != 1.0:
+        vertices *= radius
+    if center is not None:
+        vertices += np.asarray(center, dtype=np.float32)
+    return vertices
+
+
+def clifford_torus_geometry(resolution=(64, 64), radius=1.0, eta=pi / 4, center=None, mode=moderngl.LINES):
+    """
+    flat torus (cos eta cos u, cos eta sin u, sin eta cos v, sin eta sin v) on the
+    3-sphere of the radius, the Clifford torus for eta = pi / 4
+    """
+    ce, se = np.cos(eta), np.sin(eta)
+    vertices, indices = parametric_geometry(
+        lambda u, v: (ce * np.cos(u), ce * np.sin(u), se * np.cos(v), se * np.sin(v)),
+        resolution, wrap=(True, True), mode=mode)
+    return _placed(vertices, radius, center), indices
+
+
+def hopf_fibres_geometry(fibres=(4, 12), segments=64, radius=1.0, center=None, mode=moderngl.LINES):
+    """
+    fibres of the Hopf fibration: the great circle over every point of fibres[0]
+    circles of latitude times fibres[1] longitudes of the 2-sphere.
+    LINES draws the circles, TRIANGLES the tori they form over each latitude
+
+    Returns:
+        numpy.ndarray: vertices (fibres[0] * fibres[1] * segments, 4) float32
+        numpy.ndarray: indices uint32, read-only
+    """
+    latitudes, longitudes = fibres
+    # eta in (0, pi / 2) without the poles of the 2-sphere (their fibres are the 2 core circles)
+    margin = pi / (4 * latitudes)
+    etas = (margin, pi / 2 - margin)
+    vertices, indices = parametric_geometry(
+        lambda eta, xi, t: (np.sin(eta) * np.cos(xi + t), np.sin(eta) * np.sin(xi + t),
+                            np.cos(eta) * np.cos(t), np.cos(eta) * np.sin(t)),
+        (latitudes, longitudes, segments), ranges=(etas, (0.0, TAU), (0.0, TAU)), wrap=(False, True, True),
+        mode=mode, axes=(2,) if mode == moderngl.LINES else (1, 2))
+    return _placed(vertices, radius, center), indices
+
+
+def hypersphere_geometry(resolution=(16, 16, 32), radius=1.0, center=None, mode=moderngl.LINES):
+    """
+    3-sphere in hyperspherical coordinates psi, theta in [0, pi], phi in [0, 2 pi).
+    LINES draws the coordinate lines, TRIANGLES the 2-spheres of constant psi
+    (resolution (100, 100, 100) = 1M vertices)
+    """
+    vertices, indices = parametric_geometry(
+        lambda psi, theta, phi: (np.sin(psi) * np.sin(theta) * np.cos(phi), np.sin(psi) * np.sin(theta) * np.sin(phi),
+                                 np.sin(psi) * np.cos(theta), np.cos(psi)),
+        resolution, ranges=((0.0, pi), (0.0, pi), (0.0, TAU)), wrap=(False, False, True), mode=mode)
+    return _placed(vertices, radius, center), indices
+
+
+def parametric(function=None, resolution=(32, 32), ranges=None, wrap=None, name=None,
+               attr_names=AttributeNames, mode=moderngl.LINES, axes=None):
+    """Creates an indexed VAO of a parametric 4D manifold (see parametric_geometry)"""
+    vertices, indices = parametric_geometry(function, resolution, ranges, wrap, mode, axes)
+    return indexed_vao(vertices, indices, name or "geometry:parametric", attr_names=attr_names, mode=mode)
+
+
+def clifford_torus(resolution=(64, 64), radius=1.0, eta=pi / 4, center=None, name=None,
+                   attr_names=AttributeNames, mode=moderngl.LINES):
+    """Creates an indexed VAO of the Clifford torus (see clifford_torus_geometry)"""
+    vertices, indices = clifford_torus_geometry(resolution, radius, eta, center, mode)
+    return indexed_vao(vertices, indices, name or "geometry:clifford_torus", attr_names=attr_names, mode=mode)
+
+
+def hopf_fibres(fibres=(4, 12), segments=64, radius=1.0, center=None, name=None,
+                attr_names=AttributeNames, mode=moderngl.LINES):
+    """Creates an indexed VAO of Hopf fibres (see hopf_fibres_geometry)"""
+    vertices, indices = hopf_fibres_geometry(fibres, segments, radius, center, mode)
+    return indexed_vao(vertices, indices, name or "geometry:hopf_fibres", attr_names=attr_names, mode=mode)
+
+
+def hypersphere(resolution=(16, 16, 32), radius=1.0, center=None, name=None,
+                attr_names=AttributeNames, mode=moderngl.LINES):
+    """Creates an indexed VAO of the 3-sphere (see hypersphere_geometry)"""
+    vertices, indices = hypersphere_geometry(resolution, radius, center, mode)
+    return indexed_vao(vertices, indices, name or "geometry:hypersphere", attr_names=attr_names, mode=mode)
+
+
+def projected_size(camera, center, radius, screen_height):
+    """
+    height in pixels of a 3-sphere (bounding sphere of a manifold) on the screen, with
+    the 4D pose of camera.matrix4d, the perspective devide of fov4 and the 3D pose and
+    projection of the camera (as the 4D shader programs). inf if the sphere reaches
+    the 4D or 3D camera, 0 if it is completely behind one of them
+    """
+    orientation4, position4 = camera.matrix4d
+    p = np.dot(orientation4, np.asarray(center, dtype="f8")) + position4
+    if p[3] + radius <= 0.0:
+        return 0.0
+    if p[3] - radius <= 0.0:
+        return float("inf")
+    # the perspective devide of the center, the sphere scales with its w
+    scale = 1.0 / np.tan(np.radians(camera.fov4) / 2.0) / p[3]
+    orientation3, position3 = camera.matrix
+    q = np.dot(orientation3, p[:3] * scale) + position3
+    radius3 = radius * scale
+    depth = -q[2]
+    if depth + radius3 <= 0.0:
+        return 0.0
+    if depth - radius3 <= 0.0:
+        return float("inf")
+    # m_proj[1][1] is on the diagonal, the same in row and column major memory
+    focal = float(np.asarray(camera.projection.matrix, dtype="f8").ravel(order="K")[5])
+    return radius3 * focal * screen_height / depth
+
+
+class SurfaceLOD:
+    """
+    levels of detail of one manifold: VAOs of the generator (e.g. hypersphere) for
+    increasing resolutions, created on first use (shared through a GeometryRegistry).
+    select() takes the coarsest level whose segments are at most pixels_per_segment
+    long on the screen, measured on a great circle of the bounding 3-sphere
+    (center, radius) with the largest resolution of the level as its segments
+    """
+
+    def __init__(self, generator, resolutions, radius=1.0, center=(0.0, 0.0, 0.0, 0.0),
+                 pixels_per_segment=8.0, registry=None, **kwargs):
+        """
+        Args:
+            generator: VAO function with resolution, radius and center arguments
+            resolutions: resolution of every level, coarsest first
+        Keyword Args:
+            registry (GeometryRegistry): shared VAO cache, default a private one
+            kwargs: further arguments of the generator (mode, eta, ...)
+        """
+        if not resolutions:
+            raise ValueError("a SurfaceLOD needs at least one resolution")
+        self.generator = generator
+        self.resolutions = [tuple(resolution) for resolution in resolutions]
+        self.radius = radius
+        self.center = tuple(center)
+        self.pixels_per_segment = pixels_per_segment
+        self.registry = registry or GeometryRegistry()
+        self.kwargs = kwargs
+        self.level = None
+        self._vaos = {}
+
+    def level_for(self, camera, screen_height) -> int:
+        """index of the level for the camera and the screen height in pixels"""
+        circumference = pi * projected_size(camera, self.center, self.radius, screen_height)
+        for level, resolution in enumerate(self.resolutions):
+            if circumference <= self.pixels_per_segment * max(resolution):
+                return level
+        return len(self.resolutions) - 1
+
+    def vao(self, level):
+        """VAO of a level, created on first use"""
+        vao = self._vaos.get(level)
+        if vao is None:
+            vao = self.registry.acquire(self.generator, resolution=self.resolutions[level],
+                                        radius=self.radius, center=self.center, **self.kwargs)
+            self._vaos[level] = vao
+        return vao
+
+    def select(self, camera, screen_height):
+        """VAO of the level for the camera (see level_for), also kept in self.level"""
+        self.level = self.level_for(camera, screen_height)
+        return self.vao(self.level)
+
+    def release(self) -> None:
+        """gives back the VAOs of all levels to the registry"""
+        for vao in self._vaos.values():
+            self.registry.release(vao)
+        self._vaos.clear()
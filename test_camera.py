@@ -0,0 +1,31 @@
+"""
+switching cameras right after mouse input (no window or GL context needed)
+
+    python -m pytest test_camera.py
+
+"""
+import numpy as np
+import pytest
+from moderngl_window.context.base import BaseKeys
+
+from camera import CameraCoordinateCamera, Orbit4DCamera, WorldCoordinateCamera
+
+
+@pytest.mark.parametrize("coalesce", [False, True])
+@pytest.mark.parametrize("source_cls", [Orbit4DCamera, CameraCoordinateCamera])
+def test_take_pose_after_mouse_event(source_cls, coalesce):
+    source = source_cls(BaseKeys)
+    source.coalesce_mouse = coalesce
+    source.matrix4d
+    # left and right drag, then switch before the next frame
+    source.rot_state(30, 0, 0, 1)
+    source.rot_state(0, 20, 0, 2)
+    target = WorldCoordinateCamera(BaseKeys)
+    target.take_pose(source)
+
+    assert source._mouse_pending == {}
+    # the pose the source renders from now on
+    expected3, expected4 = source.matrix, source.matrix4d
+    np.testing.assert_allclose(target.matrix[0], expected3[0], atol=1e-5)
+    np.testing.assert_allclose(target.matrix4d[0], expected4[0], atol=1e-5)
+    np.testing.assert_allclose(target.matrix4d[1], expected4[1], atol=1e-5)
@@ -0,0 +1,105 @@
+"""
+uniform buffer object with the camera matrices shared by all 4D shader programs.
+the block is uploaded once per frame and bound to every program that declares it,
+so the uniform traffic does not grow with the number of programs.
+
+"""
+from math import radians, tan
+
+import numpy as np
+
+# GLSL declaration of the block, insert into the vertex shaders after #version.
+# std140: mat3 columns are padded to vec4, m_fov4 fills the gap after m_position3.
+# orientations are stored ready to use (m_orientation4 * p), no transpose needed
+CAMERA_BLOCK = '''
+                layout(std140) uniform Camera {
+                    mat4 m_proj; // perspective projection
+                    mat4 m_orientation4; // world to 3d camera coordinate transformation
+                    vec4 m_position4; // world to 3d camera coordinate transformation
+                    mat3 m_orientation3; // 3d to 2d camera
+                    vec3 m_position3; // 3d to 2d camera
+                    float m_fov4; // 1 / tan(fov / 2) of the 4d perspective devide
+                };
+'''
+
+
+class CameraBlock:
+    """
+    std140 "Camera" uniform block: m_proj, m_orientation4, m_position4,
+    m_orientation3, m_position3, m_fov4 in one buffer (52 floats)
+    """
+    NAME = "Camera"
+
+    # offsets in floats
+    PROJ = slice(0, 16)
+    ORIENTATION4 = slice(16, 32)
+    POSITION4 = slice(32, 36)
+    ORIENTATION3 = slice(36, 48)
+    POSITION3 = slice(48, 51)
+    FOV4 = 51
+    SIZE = 52
+
+    def __init__(self, ctx, binding=0):
+        """
+        Args:
+            ctx: moderngl context
+        Keyword Args:
+            binding (int): uniform buffer binding point
+        """
+        self.binding = binding
+        self.data = np.zeros(self.SIZE, dtype="f4")
+        # matrices are stored column by column, mat3 columns are padded to vec4
+        self._orientation4 = self.data[self.ORIENTATION4].reshape(4, 4)
+        self._orientation3 = self.data[self.ORIENTATION3].reshape(3, 4)
+        self.buffer = ctx.buffer(reserve=self.data.nbytes, dynamic=True)
+        self._version = None
+
+    def bind(self, *programs) -> None:
+        """let the Camera block of the programs read from this buffer"""
+        for program in programs:
+            program[self.NAME].binding = self.binding
+
+    def update(self, proj, orientation4, position4, orientation3, position3, fov4=90.0, version=None) -> bool:
+        """packs the camera matrices and uploads them with one write.
+        orientations are the (row major) numpy matrices of the camera, they are
+        stored transposed so the shader can multiply with them directly
+
+        Args:
+            fov4 (float): field of view (degrees) of the 4d perspective devide
+        Keyword Args:
+            version: identifies the camera state (e.g. (id(camera), camera.version)),
+                the upload is skipped if it is the same as for the last upload
+        Returns:
+            bool: True if the buffer was written
+        """
+        if version is not None and version == self._version:
+            return False
+        self._version = version
+        # memory order: the projection may be a (column-major) glm or a numpy matrix
+        self.data[self.PROJ] = np.asarray(proj, dtype="f4").ravel(order="K")
+        self._orientation4[:] = np.transpose(orientation4)
+        self.data[self.POSITION4] = position4
+        self._orientation3[:, :3] = np.transpose(orientation3)
+        self.data[self.POSITION3] = position3
+        self.data[self.FOV4] = 1.0 / tan(radians(fov4) / 2.0)
+        self.buffer.write(self.data)
+        return True
+
+    def write(self, data, version=None) -> bool:
+        """uploads a block that is already packed in this layout (SIZE float32, e.g.
+        Camera.uniform_block) directly from its memory, without packing or copying
+
+        Keyword Args:
+            version: as in update
+        Returns:
+            bool: True if the buffer was written
+        """
+        if version is not None and version == self._version:
+            return False
+        self._version = version
+        self.buffer.write(data)
+        return True
+
+    def use(self) -> None:
+        """binds the buffer to the binding point of the block"""
+        self.buffer.bind_to_uniform_block(self.binding)
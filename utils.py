@@ -4,24 +4,51 @@ and function for rendering coordinate system axes
 
 """
 import numpy as np
-from moderngl_window.opengl.vao import VAO
-from moderngl_window.geometry import AttributeNames
 
 
 def cross(A, B, C):
     """Returns vector that is orthogonal to three given 4-dimensional vectors
     according to http://hollasch.github.io/ray4/Four-Space_Visualization_of_4D_Objects.html#chapter2
     """
-    u = (B[0] * C[1]) - (B[1] * C[0])
-    v = (B[0] * C[2]) - (B[2] * C[0])
-    w = (B[0] * C[3]) - (B[3] * C[0])
-    x = (B[1] * C[2]) - (B[2] * C[1])
-    y = (B[1] * C[3]) - (B[3] * C[1])
-    z = (B[2] * C[3]) - (B[3] * C[2])
-    return np.array([ (A[1] * z) - (A[2] * y) + (A[3] * x),
-                     -(A[0] * z) + (A[2] * w) - (A[3] * v),
-                      (A[0] * y) - (A[1] * x) + (A[3] * u),
-                      (A[0] * x) + (A[1] * v) - (A[2] * u)])
+    return cross_batch(A, B, C)
+
+def cross_batch(A, B, C):
+    """
+    vectorized cross(): A, B, C (..., 4) arrays (broadcast against each other),
+    returns (..., 4) vectors orthogonal to A, B and C, cross_batch(A, B, C)[k] == cross(A[k], B[k], C[k])
+    """
+    A = np.asarray(A)
+    B = np.asarray(B)
+    C = np.asarray(C)
+    # 2x2 minors of B and C
+    u = (B[..., 0] * C[..., 1]) - (B[..., 1] * C[..., 0])
+    v = (B[..., 0] * C[..., 2]) - (B[..., 2] * C[..., 0])
+    w = (B[..., 0] * C[..., 3]) - (B[..., 3] * C[..., 0])
+    x = (B[..., 1] * C[..., 2]) - (B[..., 2] * C[..., 1])
+    y = (B[..., 1] * C[..., 3]) - (B[..., 3] * C[..., 1])
+    z = (B[..., 2] * C[..., 3]) - (B[..., 3] * C[..., 2])
+    return np.stack([ (A[..., 1] * z) - (A[..., 2] * y) + (A[..., 3] * x),
+                     -(A[..., 0] * z) + (A[..., 2] * w) - (A[..., 3] * v),
+                      (A[..., 0] * y) - (A[..., 1] * w) + (A[..., 3] * u),
+                     -(A[..., 0] * x) + (A[..., 1] * v) - (A[..., 2] * u)], axis=-1)
+
+def normalize_batch(vectors):
+    """(..., n) vectors scaled to unit length along the last axis"""
+    vectors = np.asarray(vectors)
+    return vectors / np.sqrt(np.sum(vectors * vectors, axis=-1, keepdims=True))
+
+def look_at4d_batch(positions, targets, up, right):
+    """
+    vectorized 4D look at for many viewpoints: positions and targets (..., 4),
+    up and right (4) or (..., 4) (world up and "right" direction)
+    returns (..., 4, 4) orientations, rows in, up, right, dir (as Camera.orientation4)
+    """
+    w = normalize_batch(np.asarray(targets) - np.asarray(positions)) # front/dir
+    right = normalize_batch(right)
+    x = normalize_batch(cross_batch(normalize_batch(up), right, w)) # in
+    y = normalize_batch(cross_batch(right, x, w)) # up
+    z = normalize_batch(cross_batch(w, x, y)) # right
+    return np.stack([x, y, z, w], axis=-2)
     
 def rotate_plane(angle: float, plane: np.array):
     """
@@ -84,7 +111,69 @@ def rotate(angles: np.array):
     rot = np.dot(rot, rotate_plane(angles[5], np.array([0,0,1,1]))) # zw plane
     return rot
     
+# rotation planes as (first axis, second axis, sign of the sine at [first, second]
+# in rotate_plane)
+PLANES = {"xy": (0, 1, -1), "xz": (0, 2, 1), "yz": (1, 2, -1),
+          "xw": (0, 3, 1), "yw": (1, 3, 1), "zw": (2, 3, -1)}
+# planes in the order rotate() composes them
+ROTATION_PLANES = tuple(PLANES[p] for p in ("xy", "xz", "yz", "xw", "yw", "zw"))
+
+def rotate_batch(angles: np.array, out: np.array = None):
+    """
+    vectorized rotate() for many angle sets at once
+    angles (n, 6) in planes xy, xz, yz, xw, yw, zw
+    out optional preallocated (n, 4, 4) float32 array that is filled and returned
+    returns (n, 4, 4) float32 stack of rotation matrices, out[k] == rotate(angles[k])
+    """
+    angles = np.asarray(angles, dtype='f4').reshape(-1, 6)
+    n = len(angles)
+    if out is None:
+        out = np.empty((n, 4, 4), dtype='f4')
+    elif out.shape != (n, 4, 4):
+        raise ValueError("out has shape {}, expected {}".format(out.shape, (n, 4, 4)))
+    s = np.sin(angles)
+    c = np.cos(angles)
+    out[:] = np.eye(4, dtype='f4')
+    # multiplying with a plane rotation from the right only mixes two columns:
+    # col_i' = c * col_i - sign * s * col_j, col_j' = sign * s * col_i + c * col_j
+    for k, (i, j, sign) in enumerate(ROTATION_PLANES):
+        ck = c[:, k, None]
+        sk = s[:, k, None] if sign > 0 else -s[:, k, None]
+        col_i = out[:, :, i].copy()
+        col_j = out[:, :, j]
+        out[:, :, i] = ck * col_i - sk * col_j
+        out[:, :, j] = sk * col_i + ck * col_j
+    return out
+
+def compose_rotation(angles, planes=ROTATION_PLANES, out: np.array = None):
+    """
+    product of plane rotations rotate_plane(angles[0], planes[0]) . rotate_plane(angles[1], planes[1]) ...
+    without building the single matrices, planes with angle 0 are skipped
+    angles in radians, planes as in PLANES
+    out optional preallocated 4x4 matrix (overwritten)
+    returns 4x4 rotation matrix (out if given)
+    """
+    if out is None:
+        out = np.empty((4, 4), dtype='f4')
+    out[:] = np.eye(4, dtype='f4')
+    for angle, (i, j, sign) in zip(angles, planes):
+        if angle == 0:
+            continue
+        s = sign * np.sin(angle)
+        c = np.cos(angle)
+        # right multiplication only mixes columns i and j
+        col_i = out[:, i].copy()
+        col_j = out[:, j]
+        out[:, i] = c * col_i - s * col_j
+        out[:, j] = s * col_i + c * col_j
+    return out
+
 def axes_coordinate_system(dim, leng):
+    # the rotation math above is used without a window (camera_core), the
+    # windowing stack is only imported for rendering
+    from moderngl_window.opengl.vao import VAO
+    from moderngl_window.geometry import AttributeNames
+
     vao = VAO("geometry:axes")
     # Add buffers
     if dim == 4: